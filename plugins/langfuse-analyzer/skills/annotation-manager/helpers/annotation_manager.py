@@ -11,6 +11,7 @@ USAGE:
     python annotation_manager.py list-scores --trace-id "abc"
     python annotation_manager.py pending --score-name "review" --days 7
     python annotation_manager.py export --score-name "quality" --days 30 --format json
+    python annotation_manager.py export --score-name "quality" --days 90 --workers 8
     python annotation_manager.py configs
 """
 
@@ -25,7 +26,8 @@ from typing import Optional, List, Dict, Any
 
 # Add parent directories to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "data-retrieval" / "helpers"))
-from langfuse_client import get_langfuse_client
+from fetch_planner import DEFAULT_WORKERS, PAGE_SIZE, fetch_window
+from langfuse_client import call_with_retry, get_langfuse_client
 
 
 def get_time_range(days: int) -> tuple:
@@ -158,7 +160,7 @@ def list_scores(
         if name:
             kwargs["name"] = name
 
-        scores = client.api.scores.get_many(**kwargs)
+        scores = call_with_retry(client.api.scores.get_many, **kwargs)
 
         result = []
         if hasattr(scores, 'data'):
@@ -210,11 +212,12 @@ def find_pending_traces(
         if trace_name:
             kwargs["name"] = trace_name
 
-        traces = client.api.trace.list(**kwargs)
+        traces = call_with_retry(client.api.trace.list, **kwargs)
 
         # Get traces that already have this score
         scored_traces = set()
-        scores = client.api.scores.get_many(
+        scores = call_with_retry(
+            client.api.scores.get_many,
             name=score_name,
             from_timestamp=from_time,
             to_timestamp=to_time,
@@ -245,37 +248,54 @@ def find_pending_traces(
         return []
 
 
+def _export_row(score: Any) -> Dict[str, Any]:
+    return {
+        "id": score.id,
+        "name": score.name,
+        "trace_id": getattr(score, 'trace_id', None),
+        "value": getattr(score, 'value', None),
+        "string_value": getattr(score, 'string_value', None),
+        "comment": getattr(score, 'comment', None),
+        "data_type": getattr(score, 'data_type', None),
+        "timestamp": str(score.timestamp) if hasattr(score, 'timestamp') else None
+    }
+
+
 def export_scores(
     score_name: str,
     days: int,
-    format: str = "json"
+    format: str = "json",
+    workers: int = DEFAULT_WORKERS
 ) -> str:
-    """Export scores to JSON or CSV format."""
+    """
+    Export scores to JSON or CSV format.
+
+    The window is fetched in `workers` parallel time slices (see
+    fetch_planner.py), so exports are complete however many scores it holds.
+    """
     client = get_langfuse_client()
     from_time, to_time = get_time_range(days)
 
-    try:
-        scores = client.api.scores.get_many(
+    def fetch_page(start: datetime, end: datetime, page: int) -> tuple:
+        response = call_with_retry(
+            client.api.scores.get_many,
             name=score_name,
-            from_timestamp=from_time,
-            to_timestamp=to_time,
-            limit=10000
+            from_timestamp=start,
+            to_timestamp=end,
+            limit=PAGE_SIZE,
+            page=page
         )
+        data = response.data if hasattr(response, 'data') and response.data else []
+        return list(data), getattr(getattr(response, 'meta', None), 'total_items', None)
+
+    def to_rows(scores: List[Any]) -> List[Dict[str, Any]]:
+        return [_export_row(score) for score in scores]
 
+    try:
         data = []
-        if hasattr(scores, 'data'):
-            for score in scores.data:
-                row = {
-                    "id": score.id,
-                    "name": score.name,
-                    "trace_id": getattr(score, 'trace_id', None),
-                    "value": getattr(score, 'value', None),
-                    "string_value": getattr(score, 'string_value', None),
-                    "comment": getattr(score, 'comment', None),
-                    "data_type": getattr(score, 'data_type', None),
-                    "timestamp": str(score.timestamp) if hasattr(score, 'timestamp') else None
-                }
-                data.append(row)
+        for rows in fetch_window(fetch_page, from_time, to_time, workers, PAGE_SIZE,
+                                 transform=to_rows, sort_key=lambda row: row["timestamp"] or ""):
+            data.extend(rows)
 
         if format == "json":
             return json.dumps(data, indent=2)
@@ -303,7 +323,7 @@ def list_score_configs() -> List[Dict[str, Any]]:
     try:
         # Try to get score configs if the API supports it
         if hasattr(client.api, 'score_configs'):
-            configs = client.api.score_configs.list()
+            configs = call_with_retry(client.api.score_configs.list)
             result = []
             if hasattr(configs, 'data'):
                 for config in configs.data:
@@ -318,7 +338,7 @@ def list_score_configs() -> List[Dict[str, Any]]:
             return result
         else:
             # Fall back to listing unique score names
-            scores = client.api.scores.get_many(limit=1000)
+            scores = call_with_retry(client.api.scores.get_many, limit=1000)
             seen_names = {}
             if hasattr(scores, 'data'):
                 for score in scores.data:
@@ -484,6 +504,8 @@ def main():
     export_parser.add_argument("--format", default="json",
                                choices=["json", "csv"], help="Output format")
     export_parser.add_argument("--output", help="Output file (prints to stdout if not set)")
+    export_parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                               help=f"Time slices fetched in parallel (default: {DEFAULT_WORKERS})")
 
     # Configs command
     subparsers.add_parser("configs", help="List score configurations")
@@ -536,7 +558,8 @@ def main():
         output = export_scores(
             score_name=args.score_name,
             days=args.days,
-            format=args.format
+            format=args.format,
+            workers=args.workers
         )
         if args.output:
             with open(args.output, 'w') as f:
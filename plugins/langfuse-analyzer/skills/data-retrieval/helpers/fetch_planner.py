@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Fetch Planner
+
+Parallel, time-sliced fetching for Langfuse list endpoints (traces, scores).
+
+Paging sequentially through a wide window is slow, and deep page offsets can
+skip or repeat items while new data arrives. The planner splits the window
+into time slices and fetches them concurrently instead:
+
+1. The window is split into `workers` equal slices.
+2. A slice whose first page comes back short is complete.
+3. A slice whose first page is full is split and the parts are fetched, so
+   dense periods are narrowed down instead of paged through. When the page
+   reports the slice's total item count, the slice is split into enough parts
+   for each to fill about SPLIT_FILL of a page; otherwise it is bisected. Slices that
+   cannot be split further (MIN_SLICE) are paged through to the end.
+4. Completed slices are yielded in timestamp order (oldest first, or newest
+   first) as soon as every slice before them is done, so callers can stream
+   the results and stop early; pending fetches are then cancelled.
+
+Slice boundaries are whole seconds, and the API treats from_timestamp as
+inclusive and to_timestamp as exclusive, so adjacent slices sharing a
+boundary neither overlap nor leave gaps.
+
+USAGE (from other helpers):
+    def fetch_page(start, end, page):
+        response = client.api.scores.get_many(from_timestamp=start, to_timestamp=end,
+                                              limit=100, page=page)
+        return response.data, response.meta.total_items   # or just response.data
+
+    for items in fetch_window(fetch_page, from_time, to_time, workers=8):
+        ...
+"""
+
+import math
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterator, List, Optional, Tuple, Union
+
+# Parallel time slices per window
+DEFAULT_WORKERS = 4
+
+# Page size of the list endpoints (API maximum)
+PAGE_SIZE = 100
+
+# Slices this short are paged through instead of split
+MIN_SLICE = timedelta(seconds=1)
+
+# Target page fill when splitting by total count (headroom for uneven density)
+SPLIT_FILL = 0.75
+
+# Most parts a full slice is split into at once
+MAX_SPLIT = 512
+
+
+def to_datetime(value: Union[str, datetime]) -> datetime:
+    """Parse an ISO string (or pass through a datetime); naive values are kept naive."""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return value
+
+
+def _floor_second(value: datetime) -> datetime:
+    return value.replace(microsecond=0)
+
+
+def split_window(from_time: datetime, to_time: datetime, slices: int) -> List[Tuple[datetime, datetime]]:
+    """Split a window into up to `slices` adjacent slices with whole-second inner boundaries."""
+    step = (to_time - from_time) / max(slices, 1)
+    edges = [from_time]
+    for i in range(1, max(slices, 1)):
+        edge = _floor_second(from_time + step * i)
+        if edges[-1] < edge < to_time:
+            edges.append(edge)
+    edges.append(to_time)
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def _split_slice(
+    start: datetime,
+    end: datetime,
+    total: Optional[int],
+    page_size: int,
+    min_slice: timedelta
+) -> Optional[List[Tuple[datetime, datetime]]]:
+    """Parts to fetch for a full slice, or None if it is too short to split."""
+    if end - start <= min_slice:
+        return None
+    parts = 2
+    if total:
+        parts = min(MAX_SPLIT, max(2, math.ceil(total / (page_size * SPLIT_FILL))))
+    parts = min(parts, max(2, int((end - start) / min_slice)))
+    bounds = split_window(start, end, parts)
+    return bounds if len(bounds) > 1 else None
+
+
+def _page_items(result: Any) -> Tuple[List[Any], Optional[int]]:
+    """Normalize a fetch_page result: a list, or (list, total item count)."""
+    if isinstance(result, tuple):
+        items, total = result
+        return list(items or []), total
+    return list(result or []), None
+
+
+def fetch_window(
+    fetch_page: Callable[[datetime, datetime, int], List[Any]],
+    from_time: Union[str, datetime],
+    to_time: Union[str, datetime],
+    workers: int = DEFAULT_WORKERS,
+    page_size: int = PAGE_SIZE,
+    transform: Optional[Callable[[List[Any]], List[Any]]] = None,
+    sort_key: Optional[Callable[[Any], Any]] = None,
+    newest_first: bool = False,
+    min_slice: timedelta = MIN_SLICE
+) -> Iterator[List[Any]]:
+    """
+    Fetch everything in a time window with concurrent, adaptively split slices.
+
+    Args:
+        fetch_page: fn(start, end, page) -> items of one page (1-based), or
+            (items, total item count in [start, end)) when the API reports it;
+            should retry transient errors itself and raise on failure
+        from_time: Window start (datetime or ISO string)
+        to_time: Window end (datetime or ISO string)
+        workers: Slices fetched in parallel
+        page_size: Page size fetch_page requests; a page this long is "full"
+        transform: Optional fn(items) -> rows, applied in the worker thread
+            (e.g. to drop SDK objects early)
+        sort_key: Optional key to order rows within a slice
+        newest_first: Yield slices (and sorted rows) newest first
+        min_slice: Slices this short are paged through instead of split
+
+    Yields:
+        list: rows of one completed slice (empty slices are skipped)
+
+    Raises:
+        Exception: The first error raised by fetch_page
+    """
+    from_time, to_time = to_datetime(from_time), to_datetime(to_time)
+    if to_time <= from_time:
+        return
+
+    def run(start: datetime, end: datetime) -> Tuple[Optional[List[Any]], Optional[List[Tuple[datetime, datetime]]]]:
+        """Return (rows, None) for a completed slice or (None, parts) to split it."""
+        items, total = _page_items(fetch_page(start, end, 1))
+        if len(items) >= page_size:
+            parts = _split_slice(start, end, total, page_size, min_slice)
+            if parts:
+                return None, parts
+            page = 2
+            while True:
+                data, _ = _page_items(fetch_page(start, end, page))
+                items.extend(data)
+                if len(data) < page_size:
+                    break
+                page += 1
+        rows = transform(items) if transform else items
+        if sort_key:
+            rows.sort(key=sort_key, reverse=newest_first)
+        return rows, None
+
+    executor = ThreadPoolExecutor(max_workers=max(workers, 1))
+    pending = {}
+    ends = {}      # slice start -> end
+    starts = {}    # slice end -> start
+    results = {}   # slice start -> rows of completed slices
+
+    def submit(start: datetime, end: datetime) -> None:
+        ends[start] = end
+        starts[end] = start
+        pending[executor.submit(run, start, end)] = (start, end)
+
+    try:
+        for start, end in split_window(from_time, to_time, workers):
+            submit(start, end)
+
+        cursor = to_time if newest_first else from_time
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                start, end = pending.pop(future)
+                rows, parts = future.result()
+                if parts:
+                    for part_start, part_end in parts:
+                        submit(part_start, part_end)
+                else:
+                    results[start] = rows
+
+            # Yield the completed prefix in timestamp order
+            while True:
+                start = starts.get(cursor) if newest_first else cursor
+                if start is None or start not in results:
+                    break
+                rows = results.pop(start)
+                end = ends.pop(start)
+                starts.pop(end)
+                cursor = start if newest_first else end
+                if rows:
+                    yield rows
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -5,25 +5,123 @@ Unified Langfuse Client
 Single source of truth for Langfuse API authentication and connection.
 Consolidates previously scattered client code across multiple skills.
 
+Also provides the shared HTTP transport used by all helpers: one pooled
+keep-alive httpx client (HTTP/2 when the `h2` package is installed) with
+per-request deadlines and retry with jittered backoff. Deadlines are enforced
+by the transport rather than by signals, so helpers can call the API from
+worker threads.
+
 Environment Variables:
     LANGFUSE_PUBLIC_KEY: Your Langfuse public API key (required)
     LANGFUSE_SECRET_KEY: Your Langfuse secret API key (required)
     LANGFUSE_HOST: Langfuse host URL (default: https://cloud.langfuse.com)
+    LANGFUSE_SDK_TIMEOUT: Per-request deadline for SDK calls in seconds (default: 30)
+    LANGFUSE_HTTP_TIMEOUT: Per-request deadline for direct HTTP calls in seconds (default: 60)
+    LANGFUSE_MAX_RETRIES: Retries for transient failures (default: 3)
+    LANGFUSE_POOL_SIZE: Maximum pooled connections (default: 32)
 """
 
+import importlib.util
 import os
+import random
 import sys
-from typing import Optional
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Per-request deadlines (seconds)
+SDK_TIMEOUT = float(os.getenv("LANGFUSE_SDK_TIMEOUT", "30"))
+HTTP_TIMEOUT = float(os.getenv("LANGFUSE_HTTP_TIMEOUT", "60"))
+
+# Retry and pooling settings
+MAX_RETRIES = int(os.getenv("LANGFUSE_MAX_RETRIES", "3"))
+POOL_SIZE = int(os.getenv("LANGFUSE_POOL_SIZE", "32"))
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 10.0
 
-# Singleton client instance
+# HTTP status codes worth retrying
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+# Singleton instances (shared across threads)
 _client = None
+_http_client = None
+_lock = threading.RLock()
+
+
+def _get_credentials() -> tuple:
+    """
+    Read Langfuse credentials from the environment.
+
+    Returns:
+        tuple: (public_key, secret_key, host)
+
+    Raises:
+        SystemExit: If credentials are missing
+    """
+    public_key = os.getenv("LANGFUSE_PUBLIC_KEY")
+    secret_key = os.getenv("LANGFUSE_SECRET_KEY")
+    host = os.getenv("LANGFUSE_HOST", "https://cloud.langfuse.com")
+
+    if not public_key or not secret_key:
+        print("ERROR: Missing Langfuse credentials", file=sys.stderr)
+        print("Required environment variables:", file=sys.stderr)
+        print("  LANGFUSE_PUBLIC_KEY", file=sys.stderr)
+        print("  LANGFUSE_SECRET_KEY", file=sys.stderr)
+        sys.exit(1)
+
+    return public_key, secret_key, host
+
+
+def get_http_client():
+    """
+    Get or create the shared pooled httpx client.
+
+    The client keeps connections alive across calls and threads, so repeated
+    requests skip the TCP+TLS handshake. HTTP/2 is enabled when `h2` is installed.
+
+    Returns:
+        httpx.Client: Authenticated client with base_url set to LANGFUSE_HOST
+
+    Raises:
+        SystemExit: If httpx is not installed or credentials are missing
+    """
+    global _http_client
+
+    with _lock:
+        if _http_client is not None:
+            return _http_client
+
+        try:
+            import httpx
+        except ImportError:
+            print("ERROR: httpx package not installed", file=sys.stderr)
+            print("Install with: pip install httpx", file=sys.stderr)
+            sys.exit(1)
+
+        public_key, secret_key, host = _get_credentials()
+
+        _http_client = httpx.Client(
+            base_url=host,
+            auth=(public_key, secret_key),
+            http2=importlib.util.find_spec("h2") is not None,
+            timeout=httpx.Timeout(HTTP_TIMEOUT, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=POOL_SIZE,
+                max_keepalive_connections=POOL_SIZE,
+                keepalive_expiry=60.0
+            ),
+            headers={"Content-Type": "application/json"}
+        )
+        return _http_client
 
 
 def get_langfuse_client():
     """
     Get or create a Langfuse client instance.
 
-    Uses singleton pattern to avoid creating multiple clients.
+    Uses singleton pattern to avoid creating multiple clients. The SDK shares
+    the pooled HTTP client from get_http_client() and applies SDK_TIMEOUT as a
+    per-request deadline.
 
     Returns:
         Langfuse: Configured client instance
@@ -33,37 +131,179 @@ def get_langfuse_client():
     """
     global _client
 
-    if _client is not None:
-        return _client
+    with _lock:
+        if _client is not None:
+            return _client
+
+        try:
+            from langfuse import Langfuse
+        except ImportError:
+            print("ERROR: langfuse package not installed", file=sys.stderr)
+            print("Install with: pip install langfuse", file=sys.stderr)
+            sys.exit(1)
+
+        public_key, secret_key, host = _get_credentials()
+
+        try:
+            _client = Langfuse(
+                public_key=public_key,
+                secret_key=secret_key,
+                host=host,
+                timeout=SDK_TIMEOUT,
+                httpx_client=get_http_client()
+            )
+            return _client
+        except Exception as e:
+            print(f"ERROR: Failed to create Langfuse client: {e}", file=sys.stderr)
+            sys.exit(1)
+
+
+# =============================================================================
+# RETRY HELPERS
+# =============================================================================
+
+def _status_code(error: Exception) -> Optional[int]:
+    """Extract an HTTP status code from SDK or httpx errors, if any."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_timeout_error(error: Exception) -> bool:
+    """Check whether an error is a request deadline being exceeded."""
+    if isinstance(error, TimeoutError):
+        return True
+    if "Timeout" in type(error).__name__:
+        return True
+    return "timeout" in str(error).lower() or "timed out" in str(error).lower()
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """Check whether an error is transient (throttling, 5xx, dropped connection, timeout)."""
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS
 
     try:
-        from langfuse import Langfuse
+        import httpx
+        if isinstance(error, httpx.TransportError):
+            return True
     except ImportError:
-        print("ERROR: langfuse package not installed", file=sys.stderr)
-        print("Install with: pip install langfuse", file=sys.stderr)
-        sys.exit(1)
+        pass
 
-    public_key = os.getenv("LANGFUSE_PUBLIC_KEY")
-    secret_key = os.getenv("LANGFUSE_SECRET_KEY")
-    host = os.getenv("LANGFUSE_HOST", "https://cloud.langfuse.com")
+    return is_timeout_error(error) or isinstance(error, ConnectionError)
 
-    if not public_key or not secret_key:
-        print("ERROR: Missing Langfuse credentials", file=sys.stderr)
-        print("Required environment variables:", file=sys.stderr)
-        print("  LANGFUSE_PUBLIC_KEY", file=sys.stderr)
-        print("  LANGFUSE_SECRET_KEY", file=sys.stderr)
-        sys.exit(1)
 
-    try:
-        _client = Langfuse(
-            public_key=public_key,
-            secret_key=secret_key,
-            host=host
-        )
-        return _client
-    except Exception as e:
-        print(f"ERROR: Failed to create Langfuse client: {e}", file=sys.stderr)
-        sys.exit(1)
+def _backoff_delay(attempt: int, error: Optional[Exception] = None) -> float:
+    """Full-jitter exponential backoff, honouring Retry-After on 429/503."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or getattr(error, "headers", None) or {}
+    retry_after = headers.get("retry-after") if hasattr(headers, "get") else None
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_CAP)
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+
+def call_with_retry(
+    fn: Callable[..., Any],
+    *args,
+    retries: int = MAX_RETRIES,
+    retry_timeouts: bool = True,
+    **kwargs
+) -> Any:
+    """
+    Call fn(*args, **kwargs), retrying transient failures with jittered backoff.
+
+    Args:
+        fn: SDK method or other callable performing one API request
+        retries: Maximum number of retries after the first attempt
+        retry_timeouts: Set False when the caller has its own timeout fallback
+
+    Returns:
+        Whatever fn returns
+
+    Raises:
+        The last error once retries are exhausted or the error is not transient
+    """
+    attempt = 0
+    while True:
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            if attempt >= retries or not is_retryable_error(e):
+                raise
+            if not retry_timeouts and is_timeout_error(e):
+                raise
+            time.sleep(_backoff_delay(attempt, e))
+            attempt += 1
+
+
+def http_get(path: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    GET a Langfuse public API path over the shared pooled client.
+
+    Args:
+        path: API path, e.g. "/api/public/traces"
+        params: Query parameters
+        timeout: Per-request deadline in seconds (default: HTTP_TIMEOUT)
+
+    Returns:
+        dict: Parsed JSON response body
+
+    Raises:
+        httpx.HTTPError: If the request fails after retries
+    """
+    client = get_http_client()
+
+    def _request():
+        response = client.get(path, params=params, timeout=timeout or HTTP_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+
+    return call_with_retry(_request)
+
+
+def http_get_conditional(
+    path: str,
+    params: Optional[Dict[str, Any]] = None,
+    etag: Optional[str] = None,
+    timeout: Optional[float] = None
+) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    GET a Langfuse public API path, revalidating with an ETag when one is known.
+
+    Sends If-None-Match with the ETag of the previous identical request; a
+    304 Not Modified answer costs no response body. Servers that do not
+    send ETags simply return the full body every time.
+
+    Args:
+        path: API path, e.g. "/api/public/traces"
+        params: Query parameters
+        etag: ETag returned by the previous call with the same path and params
+        timeout: Per-request deadline in seconds (default: HTTP_TIMEOUT)
+
+    Returns:
+        tuple: (parsed JSON body, or None if not modified; ETag to send next time)
+
+    Raises:
+        httpx.HTTPError: If the request fails after retries
+    """
+    client = get_http_client()
+    headers = {"If-None-Match": etag} if etag else None
+
+    def _request():
+        response = client.get(path, params=params, headers=headers, timeout=timeout or HTTP_TIMEOUT)
+        if response.status_code == 304:
+            return None, etag
+        response.raise_for_status()
+        return response.json(), response.headers.get("etag")
+
+    return call_with_retry(_request)
 
 
 def test_connection() -> bool:
@@ -75,7 +315,7 @@ def test_connection() -> bool:
     """
     try:
         client = get_langfuse_client()
-        client.api.trace.list(limit=1)
+        call_with_retry(client.api.trace.list, limit=1)
         return True
     except Exception as e:
         print(f"Connection test failed: {e}", file=sys.stderr)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Live Tail
+
+Follow a Langfuse list endpoint (traces, sessions) and stream only new items,
+instead of re-running a list command in a loop and re-fetching the same data:
+
+1. Each poll asks for items at or after a high-water mark (the newest
+   timestamp seen) minus TAIL_OVERLAP, so items ingested a little late are
+   still picked up. Items already seen are dropped by ID; IDs older than the
+   overlap are forgotten, so memory stays flat.
+2. The first page is revalidated with its ETag (If-None-Match) when the
+   server sends one; an unchanged window costs a 304 without a body. Pages
+   are newest first, and paging stops at the first page with nothing new.
+3. The poll interval drops to the minimum when new items arrive and backs
+   off (x1.5) up to the maximum while the stream is idle or the API fails.
+
+USAGE (from other helpers):
+    for items in tail_endpoint("/api/public/traces", "timestamp"):
+        for trace in items:     # oldest first, raw API records (camelCase keys)
+            ...
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+from fetch_planner import PAGE_SIZE, to_datetime
+from langfuse_client import http_get_conditional
+
+# Poll interval bounds in seconds (adaptive between them)
+DEFAULT_MIN_INTERVAL = 2.0
+DEFAULT_MAX_INTERVAL = 30.0
+
+# Interval growth per idle poll
+BACKOFF_FACTOR = 1.5
+
+# Re-read window behind the high-water mark for late-ingested items
+TAIL_OVERLAP = timedelta(minutes=2)
+
+
+def next_interval(current: float, found: bool, min_interval: float, max_interval: float) -> float:
+    """Poll again soon after new items, back off while idle."""
+    if found:
+        return min_interval
+    return min(max_interval, max(current, min_interval) * BACKOFF_FACTOR)
+
+
+def _record_time(record: Dict[str, Any], timestamp_key: str) -> Optional[datetime]:
+    value = record.get(timestamp_key)
+    if not value:
+        return None
+    value = to_datetime(value)
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def tail_endpoint(
+    path: str,
+    timestamp_key: str,
+    params: Optional[Dict[str, Any]] = None,
+    since: Optional[datetime] = None,
+    min_interval: float = DEFAULT_MIN_INTERVAL,
+    max_interval: float = DEFAULT_MAX_INTERVAL,
+    max_polls: Optional[int] = None,
+    sleep: Callable[[float], None] = time.sleep
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Poll a list endpoint and yield batches of items not seen before.
+
+    Args:
+        path: API list path, e.g. "/api/public/sessions"
+        timestamp_key: Record field the endpoint's fromTimestamp filters on
+            (e.g. "timestamp" for traces, "createdAt" for sessions)
+        params: Extra query parameters (e.g. {"tags": [...]})
+        since: Only items at or after this time (default: now)
+        min_interval: Shortest poll interval in seconds
+        max_interval: Longest poll interval in seconds
+        max_polls: Stop after this many polls (default: follow forever)
+        sleep: Sleep function (between polls)
+
+    Yields:
+        list: new records (oldest first) of one poll; polls without new
+        items yield nothing
+
+    Failed polls are reported on stderr and retried after max_interval.
+    """
+    since = since or datetime.now(timezone.utc)
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    high_water = since
+    seen = {}      # id -> timestamp, for items inside the overlap window
+    etag = None    # ETag of the last first page, and the fromTimestamp it was for
+    etag_from = None
+    interval = min_interval
+    polls = 0
+
+    while max_polls is None or polls < max_polls:
+        if polls:
+            sleep(interval)
+        polls += 1
+
+        from_ts = (high_water - TAIL_OVERLAP).isoformat()
+        batch = {}     # id -> (timestamp, record) of items new in this poll
+        sent_etag = etag if etag_from == from_ts else None
+        try:
+            page = 1
+            while True:
+                query = dict(params or {}, fromTimestamp=from_ts, limit=PAGE_SIZE, page=page)
+                if page == 1:
+                    body, new_etag = http_get_conditional(path, query, sent_etag)
+                    if body is None:
+                        break
+                else:
+                    body, _ = http_get_conditional(path, query)
+
+                data = body.get("data", []) or []
+                new = [record for record in data if record.get("id") not in seen and record.get("id") not in batch]
+                for record in new:
+                    batch[record.get("id")] = (_record_time(record, timestamp_key) or high_water, record)
+                # Newest first: a page with nothing new means the rest was seen too
+                if not new or len(data) < PAGE_SIZE:
+                    break
+                page += 1
+        except Exception as e:
+            print(f"Tail poll failed ({e}); retrying in {max_interval:.0f}s", file=sys.stderr)
+            interval = max_interval
+            continue
+
+        etag, etag_from = new_etag, from_ts
+
+        # Items from before `since` are only marked as seen
+        fresh = sorted((item for item in batch.values() if item[0] >= since), key=lambda item: item[0])
+        for item_id, (ts, _) in batch.items():
+            seen[item_id] = ts
+        if fresh:
+            high_water = max(high_water, fresh[-1][0])
+            cutoff = high_water - TAIL_OVERLAP
+            seen = {item_id: ts for item_id, ts in seen.items() if ts >= cutoff}
+            yield [record for _, record in fresh]
+
+        interval = next_interval(interval, bool(fresh), min_interval, max_interval)
@@ -0,0 +1,617 @@
+#!/usr/bin/env python3
+"""
+Streaming Statistics
+
+Bounded-memory summaries for large populations of values (latencies, scores).
+
+Accumulators combine Welford's running mean/variance, exact min/max/sum and a
+quantile sketch, so count, mean, std dev, percentiles and histograms all come
+out of one O(n) pass with memory independent of n. Accumulators merge (Chan's
+parallel variance formula), so time slices can be summarized in parallel.
+Low-cardinality data (binary or 1-10 ratings) is also counted exactly per value
+up to EXACT_MAX_DISTINCT values, giving exact percentiles and histograms.
+
+Category counts are the accumulator for categorical and boolean values: labels
+are dictionary-encoded to integer codes on first sight and counted in a flat
+list, so frequency tables, share trends and chi-square tests never touch
+per-row strings after encoding. They merge by remapping codes.
+
+Change detectors track a bucketed series online (EWMA baseline, rolling
+z-score anomalies and a two-sided CUSUM for level shifts) with O(1) work and
+state per new bucket, so they can be persisted and resumed as buckets arrive.
+
+Quantile sketches use logarithmic buckets (the DDSketch scheme): every value is
+counted in bucket ceil(log_gamma(v)), so any quantile is returned within a fixed
+relative error (SKETCH_RELATIVE_ACCURACY, 1% by default) regardless of how many
+values were added. Memory is bounded by SKETCH_MAX_BUCKETS; when exceeded, the
+lowest buckets are collapsed, which only degrades accuracy of the smallest values.
+
+Quantiles use the nearest-rank convention: the q-quantile of n values is the
+value at 1-based rank ceil(q * n), so p95/p99 of small samples report an
+observed tail value (p99 of [10, 20, 30, 40, 1000] is 1000) instead of being
+biased low. Sketches apply the same rank to their buckets.
+
+Sketches are plain dicts so they can be merged across threads, stored as JSON
+and combined later without re-reading the raw values.
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+SKETCH_RELATIVE_ACCURACY = 0.01
+SKETCH_MAX_BUCKETS = 2048
+
+# Distinct values counted exactly before accumulators fall back to the sketch
+EXACT_MAX_DISTINCT = 1024
+
+# Change-detector std dev floor: a fraction of |baseline|, and an absolute minimum
+DETECTOR_MIN_SD_RELATIVE = 0.01
+DETECTOR_MIN_SD = 1e-6
+
+# Values at or below this are counted in the zero bucket
+_MIN_INDEXABLE = 1e-9
+
+
+# =============================================================================
+# QUANTILE SKETCH
+# =============================================================================
+
+def new_sketch(relative_accuracy: float = SKETCH_RELATIVE_ACCURACY) -> Dict[str, Any]:
+    """
+    Create an empty quantile sketch.
+
+    Args:
+        relative_accuracy: Maximum relative error of returned quantiles
+
+    Returns:
+        dict: Sketch state (gamma, bucket counts, zero/negative counts, total)
+    """
+    return {
+        "gamma": (1 + relative_accuracy) / (1 - relative_accuracy),
+        "bins": {},       # bucket index -> count (positive values)
+        "neg_bins": {},   # bucket index -> count (absolute value of negative values)
+        "zero": 0,
+        "count": 0,
+        "min": None,
+        "max": None,
+    }
+
+
+def _bucket(sketch: Dict[str, Any], value: float) -> int:
+    return int(math.ceil(math.log(value) / math.log(sketch["gamma"])))
+
+
+def _collapse(bins: Dict[int, int], max_buckets: int) -> None:
+    """Merge the lowest buckets into one so at most max_buckets remain."""
+    if len(bins) <= max_buckets:
+        return
+    keys = sorted(bins)
+    excess = keys[:len(keys) - max_buckets + 1]
+    target = excess[-1]
+    for key in excess[:-1]:
+        bins[target] += bins.pop(key)
+
+
+def sketch_add(sketch: Dict[str, Any], value: Optional[float], weight: int = 1) -> None:
+    """Add a value to the sketch (None and NaN are ignored)."""
+    if value is None or value != value:
+        return
+    if abs(value) <= _MIN_INDEXABLE:
+        sketch["zero"] += weight
+    else:
+        bins = sketch["bins"] if value > 0 else sketch["neg_bins"]
+        key = _bucket(sketch, abs(value))
+        bins[key] = bins.get(key, 0) + weight
+        _collapse(bins, SKETCH_MAX_BUCKETS)
+    sketch["count"] += weight
+    if sketch["min"] is None or value < sketch["min"]:
+        sketch["min"] = value
+    if sketch["max"] is None or value > sketch["max"]:
+        sketch["max"] = value
+
+
+def sketch_extend(sketch: Dict[str, Any], values: Iterable[Optional[float]]) -> Dict[str, Any]:
+    """Add many values to the sketch and return it."""
+    for value in values:
+        sketch_add(sketch, value)
+    return sketch
+
+
+def merge_sketches(target: Dict[str, Any], other: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge other into target (in place) and return target.
+
+    Both sketches must have been created with the same relative accuracy.
+    """
+    if not math.isclose(target["gamma"], other["gamma"]):
+        raise ValueError("Cannot merge sketches with different relative accuracy")
+    for name in ("bins", "neg_bins"):
+        bins = target[name]
+        for key, count in other[name].items():
+            bins[key] = bins.get(key, 0) + count
+        _collapse(bins, SKETCH_MAX_BUCKETS)
+    target["zero"] += other["zero"]
+    target["count"] += other["count"]
+    for name, pick in (("min", min), ("max", max)):
+        values = [v for v in (target[name], other[name]) if v is not None]
+        target[name] = pick(values) if values else None
+    return target
+
+
+def _bucket_value(sketch: Dict[str, Any], key: int) -> float:
+    """Representative value of a bucket (relative error <= accuracy)."""
+    gamma = sketch["gamma"]
+    return 2 * gamma ** key / (gamma + 1)
+
+
+def sketch_quantile(sketch: Dict[str, Any], q: float) -> Optional[float]:
+    """
+    Estimate the q-quantile (0 <= q <= 1).
+
+    Estimates are clamped to the exact min/max seen, so q=0 and q=1 are exact.
+
+    Returns:
+        float, or None if the sketch is empty
+    """
+    if sketch["count"] == 0:
+        return None
+    value = _rank_value(sketch, _nearest_rank(q, sketch["count"]))
+    if sketch["min"] is not None:
+        value = min(max(value, sketch["min"]), sketch["max"])
+    return value
+
+
+def _nearest_rank(q: float, count: int) -> int:
+    """0-based index of the q-quantile among count sorted values (nearest rank)."""
+    # The epsilon keeps float noise (0.95 * 20 = 19.000000000000004) from skipping a rank
+    return min(max(math.ceil(q * count - 1e-9) - 1, 0), count - 1)
+
+
+def _rank_value(sketch: Dict[str, Any], rank: float) -> float:
+    """Representative value of the bucket holding the given rank."""
+    seen = 0
+    for key in sorted(sketch["neg_bins"], reverse=True):
+        seen += sketch["neg_bins"][key]
+        if seen > rank:
+            return -_bucket_value(sketch, key)
+    seen += sketch["zero"]
+    if seen > rank:
+        return 0.0
+    for key in sorted(sketch["bins"]):
+        seen += sketch["bins"][key]
+        if seen > rank:
+            return _bucket_value(sketch, key)
+    return _bucket_value(sketch, max(sketch["bins"])) if sketch["bins"] else 0.0
+
+
+def sketch_to_dict(sketch: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a JSON-serializable copy of a sketch (bucket keys become strings)."""
+    return {
+        "gamma": sketch["gamma"],
+        "bins": {str(k): v for k, v in sketch["bins"].items()},
+        "neg_bins": {str(k): v for k, v in sketch["neg_bins"].items()},
+        "zero": sketch["zero"],
+        "count": sketch["count"],
+        "min": sketch["min"],
+        "max": sketch["max"],
+    }
+
+
+def sketch_from_dict(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild a sketch from sketch_to_dict() output."""
+    return {
+        "gamma": data["gamma"],
+        "bins": {int(k): v for k, v in data.get("bins", {}).items()},
+        "neg_bins": {int(k): v for k, v in data.get("neg_bins", {}).items()},
+        "zero": data.get("zero", 0),
+        "count": data.get("count", 0),
+        "min": data.get("min"),
+        "max": data.get("max"),
+    }
+
+
+# =============================================================================
+# ACCUMULATOR
+# =============================================================================
+
+def new_accumulator() -> Dict[str, Any]:
+    """Create an empty accumulator (count, Welford mean/M2, sum, min, max, sketch, exact counts)."""
+    return {
+        "count": 0,
+        "mean": 0.0,
+        "m2": 0.0,
+        "sum": 0.0,
+        "min": None,
+        "max": None,
+        "sketch": new_sketch(),
+        "exact": {},  # value -> count; None once EXACT_MAX_DISTINCT is exceeded
+    }
+
+
+def _add_exact(acc: Dict[str, Any], value: float, count: int) -> None:
+    exact = acc["exact"]
+    if exact is None:
+        return
+    exact[value] = exact.get(value, 0) + count
+    if len(exact) > EXACT_MAX_DISTINCT:
+        acc["exact"] = None
+
+
+def accumulate(acc: Dict[str, Any], value: Optional[float]) -> None:
+    """Add one value (None and NaN are ignored)."""
+    if value is None or value != value:
+        return
+    acc["count"] += 1
+    delta = value - acc["mean"]
+    acc["mean"] += delta / acc["count"]
+    acc["m2"] += delta * (value - acc["mean"])
+    acc["sum"] += value
+    if acc["min"] is None or value < acc["min"]:
+        acc["min"] = value
+    if acc["max"] is None or value > acc["max"]:
+        acc["max"] = value
+    sketch_add(acc["sketch"], value)
+    _add_exact(acc, value, 1)
+
+
+def merge_accumulators(target: Dict[str, Any], other: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge other into target (in place) and return target."""
+    if other["count"] == 0:
+        return target
+    if target["count"] == 0:
+        target.update({k: v for k, v in other.items() if k not in ("sketch", "exact")})
+        merge_sketches(target["sketch"], other["sketch"])
+        target["exact"] = dict(other["exact"]) if other["exact"] is not None else None
+        return target
+
+    count = target["count"] + other["count"]
+    delta = other["mean"] - target["mean"]
+    target["m2"] += other["m2"] + delta * delta * target["count"] * other["count"] / count
+    target["mean"] += delta * other["count"] / count
+    target["count"] = count
+    target["sum"] += other["sum"]
+    target["min"] = min(target["min"], other["min"])
+    target["max"] = max(target["max"], other["max"])
+    merge_sketches(target["sketch"], other["sketch"])
+    if other["exact"] is None:
+        target["exact"] = None
+    else:
+        for value, value_count in other["exact"].items():
+            _add_exact(target, value, value_count)
+    return target
+
+
+def _exact_quantile(exact: Dict[float, int], count: int, q: float) -> float:
+    rank = _nearest_rank(q, count)
+    seen = 0
+    for value in sorted(exact):
+        seen += exact[value]
+        if seen > rank:
+            return value
+    return max(exact)
+
+
+def summarize(acc: Dict[str, Any], quantiles: Sequence[float] = (0.5, 0.95)) -> Dict[str, Any]:
+    """
+    Summary statistics of an accumulator.
+
+    Returns:
+        dict: count, mean, std_dev (population), min, max, sum and one
+        "pNN" entry per requested quantile (e.g. p50, p95)
+    """
+    count = acc["count"]
+    summary = {
+        "count": count,
+        "mean": acc["mean"] if count else None,
+        "std_dev": (acc["m2"] / count) ** 0.5 if count else None,
+        "min": acc["min"],
+        "max": acc["max"],
+        "sum": acc["sum"],
+    }
+    for q in quantiles:
+        if count and acc["exact"] is not None:
+            summary[f"p{q * 100:g}"] = _exact_quantile(acc["exact"], count, q)
+        else:
+            summary[f"p{q * 100:g}"] = sketch_quantile(acc["sketch"], q)
+    return summary
+
+
+def histogram(acc: Dict[str, Any], bins: int) -> List[Dict[str, Any]]:
+    """
+    Fixed-width histogram over [min, max].
+
+    Exact when the accumulator still holds per-value counts; otherwise each
+    sketch bucket is assigned to the bin holding its representative value, so
+    counts are exact up to the sketch's relative accuracy near bin edges.
+
+    Returns:
+        list of {"start", "end", "count"}
+    """
+    low, high = acc["min"], acc["max"]
+    if acc["count"] == 0:
+        return []
+    if low == high:
+        return [{"start": low, "end": high, "count": acc["count"]}]
+
+    width = (high - low) / bins
+    counts = [0] * bins
+    sketch = acc["sketch"]
+
+    def add(value, count):
+        value = min(max(value, low), high)
+        counts[min(int((value - low) / width), bins - 1)] += count
+
+    if acc["exact"] is not None:
+        for value, count in acc["exact"].items():
+            add(value, count)
+    else:
+        for key, count in sketch["bins"].items():
+            add(_bucket_value(sketch, key), count)
+        for key, count in sketch["neg_bins"].items():
+            add(-_bucket_value(sketch, key), count)
+        if sketch["zero"]:
+            add(0.0, sketch["zero"])
+
+    return [
+        {"start": low + i * width, "end": low + (i + 1) * width, "count": count}
+        for i, count in enumerate(counts)
+    ]
+
+
+def accumulator_to_dict(acc: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a JSON-serializable copy of an accumulator."""
+    data = dict(acc)
+    data["sketch"] = sketch_to_dict(acc["sketch"])
+    if acc["exact"] is not None:
+        data["exact"] = [[value, count] for value, count in acc["exact"].items()]
+    return data
+
+
+def accumulator_from_dict(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild an accumulator from accumulator_to_dict() output."""
+    acc = dict(data)
+    acc["sketch"] = sketch_from_dict(data["sketch"])
+    if data.get("exact") is not None:
+        acc["exact"] = {value: count for value, count in data["exact"]}
+    return acc
+
+
+# =============================================================================
+# CATEGORY COUNTS
+# =============================================================================
+
+def new_category_counts() -> Dict[str, Any]:
+    """Create empty category counts (labels, label -> code index, counts by code)."""
+    return {"labels": [], "index": {}, "counts": []}
+
+
+def count_category(counts: Dict[str, Any], label: Optional[str], weight: int = 1) -> None:
+    """Count one label (None is ignored)."""
+    if label is None:
+        return
+    code = counts["index"].get(label)
+    if code is None:
+        code = counts["index"][label] = len(counts["labels"])
+        counts["labels"].append(label)
+        counts["counts"].append(0)
+    counts["counts"][code] += weight
+
+
+def merge_category_counts(target: Dict[str, Any], other: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge other into target (in place) and return target."""
+    for label, count in zip(other["labels"], other["counts"]):
+        count_category(target, label, count)
+    return target
+
+
+def category_total(counts: Dict[str, Any]) -> int:
+    return sum(counts["counts"])
+
+
+def category_table(counts: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Frequency table, most frequent first.
+
+    Returns:
+        list of {"value", "count", "share"}
+    """
+    total = category_total(counts)
+    rows = [
+        {"value": label, "count": count, "share": count / total if total else 0.0}
+        for label, count in zip(counts["labels"], counts["counts"])
+    ]
+    rows.sort(key=lambda row: (-row["count"], row["value"]))
+    return rows
+
+
+def category_matrix(groups: Sequence[Dict[str, Any]]) -> Tuple[List[str], List[List[int]]]:
+    """
+    Align several category counts on a shared code space.
+
+    Returns:
+        tuple: (labels, one row of counts per group in label order)
+    """
+    union = new_category_counts()
+    for counts in groups:
+        merge_category_counts(union, counts)
+    labels = union["labels"]
+    rows = []
+    for counts in groups:
+        row = [0] * len(labels)
+        for label, count in zip(counts["labels"], counts["counts"]):
+            row[union["index"][label]] = count
+        rows.append(row)
+    return labels, rows
+
+
+def chi_square_test(table: Sequence[Sequence[int]]) -> Dict[str, Any]:
+    """
+    Pearson chi-square test of independence on a contingency table.
+
+    Empty rows and columns are ignored.
+
+    Returns:
+        dict: chi2, dof and p_value (None when fewer than 2 non-empty rows or columns)
+    """
+    rows = [list(row) for row in table if sum(row)]
+    col_totals = [sum(col) for col in zip(*rows)] if rows else []
+    keep = [j for j, total in enumerate(col_totals) if total]
+    rows = [[row[j] for j in keep] for row in rows]
+    col_totals = [col_totals[j] for j in keep]
+    n = sum(col_totals)
+    dof = (len(rows) - 1) * (len(col_totals) - 1)
+    if dof <= 0:
+        return {"chi2": 0.0, "dof": 0, "p_value": None}
+
+    chi2 = 0.0
+    for row in rows:
+        row_total = sum(row)
+        for observed, col_total in zip(row, col_totals):
+            expected = row_total * col_total / n
+            chi2 += (observed - expected) ** 2 / expected
+    return {"chi2": chi2, "dof": dof, "p_value": chi_square_sf(chi2, dof)}
+
+
+def chi_square_sf(x: float, dof: int) -> float:
+    """Survival function of the chi-square distribution (regularized upper incomplete gamma)."""
+    if x <= 0:
+        return 1.0
+    a, z = dof / 2.0, x / 2.0
+    log_prefix = a * math.log(z) - z - math.lgamma(a)
+    if z < a + 1:
+        # Series expansion of the lower incomplete gamma
+        term = total = 1.0 / a
+        k = a
+        for _ in range(1000):
+            k += 1
+            term *= z / k
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return max(0.0, 1.0 - total * math.exp(log_prefix))
+    # Continued fraction (modified Lentz) for the upper incomplete gamma
+    tiny = 1e-300
+    b = z + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 1000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return min(1.0, h * math.exp(log_prefix))
+
+
+def category_counts_to_dict(counts: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a JSON-serializable copy of category counts."""
+    return {"labels": list(counts["labels"]), "counts": list(counts["counts"])}
+
+
+def category_counts_from_dict(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild category counts from category_counts_to_dict() output."""
+    return merge_category_counts(new_category_counts(), data)
+
+
+# =============================================================================
+# CHANGE DETECTION
+# =============================================================================
+
+def new_change_detector(
+    alpha: float = 0.05,
+    slack: float = 0.5,
+    threshold: float = 5.0,
+    z_threshold: float = 3.5,
+    warmup: int = 24
+) -> Dict[str, Any]:
+    """
+    Create an online change detector for a series of bucket values.
+
+    Args:
+        alpha: EWMA smoothing factor for the baseline mean and variance
+        slack: CUSUM allowance in standard deviations (shifts smaller than this are ignored)
+        threshold: CUSUM decision threshold in standard deviations
+        z_threshold: |z| at which a single bucket is flagged as an anomaly
+        warmup: Buckets used to learn the baseline before anything is flagged
+            (and again after each detected change)
+
+    Returns:
+        dict: JSON-serializable detector state
+    """
+    return {
+        "params": {"alpha": alpha, "slack": slack, "threshold": threshold,
+                   "z_threshold": z_threshold, "warmup": warmup},
+        "n": 0,
+        "mean": 0.0,
+        "m2": 0.0,
+        "var": 0.0,
+        "cusum_pos": 0.0,
+        "cusum_neg": 0.0,
+    }
+
+
+def _restart_detector(state: Dict[str, Any], value: float) -> None:
+    """Re-learn the baseline from the new level, starting with this value."""
+    state.update({"n": 1, "mean": value, "m2": 0.0, "var": 0.0, "cusum_pos": 0.0, "cusum_neg": 0.0})
+
+
+def update_change_detector(state: Dict[str, Any], value: float) -> List[Dict[str, Any]]:
+    """
+    Feed one bucket value; O(1) time and state.
+
+    During warmup the baseline is the exact running mean/variance (Welford);
+    afterwards it is an EWMA. Anomalies are single buckets with
+    |z| >= z_threshold against the baseline. A change is signalled when the
+    CUSUM of standardized residuals exceeds the threshold; the baseline is
+    then re-learned from the new level (a fresh warmup). Residuals are clipped at z_threshold, so a
+    single outlier is an anomaly but never a change on its own, and it does
+    not drag the baseline. The baseline std dev is floored (DETECTOR_MIN_SD_RELATIVE
+    of |baseline|, at least DETECTOR_MIN_SD), so series that were constant
+    through warmup (e.g. pass rates at 1.0) follow the same rules.
+
+    Returns:
+        list of signals: {"kind": "anomaly"|"change", "direction": "up"|"down",
+        "value", "baseline", "z"}
+    """
+    p = state["params"]
+    signals = []
+    state["n"] += 1
+    n = state["n"]
+
+    if n <= p["warmup"]:
+        diff = value - state["mean"]
+        state["mean"] += diff / n
+        state["m2"] = state.get("m2", 0.0) + diff * (value - state["mean"])
+        state["var"] = state["m2"] / (n - 1) if n > 1 else 0.0
+        return signals
+
+    mean = state["mean"]
+    sd = max(math.sqrt(state["var"]), DETECTOR_MIN_SD_RELATIVE * abs(mean), DETECTOR_MIN_SD)
+    z = (value - mean) / sd
+    clipped = max(-p["z_threshold"], min(p["z_threshold"], z))
+    if abs(z) >= p["z_threshold"]:
+        signals.append({"kind": "anomaly", "direction": "up" if z > 0 else "down",
+                        "value": value, "baseline": mean, "z": z})
+
+    state["cusum_pos"] = max(0.0, state["cusum_pos"] + clipped - p["slack"])
+    state["cusum_neg"] = max(0.0, state["cusum_neg"] - clipped - p["slack"])
+    if state["cusum_pos"] > p["threshold"] or state["cusum_neg"] > p["threshold"]:
+        shift = "up" if state["cusum_pos"] > p["threshold"] else "down"
+        signals.append({"kind": "change", "direction": shift, "value": value, "baseline": mean, "z": z})
+        _restart_detector(state, value)
+        return signals
+
+    # Freeze the baseline while an excursion is building, otherwise it would
+    # chase a genuine shift and the CUSUM would never reach the threshold
+    if max(state["cusum_pos"], state["cusum_neg"]) < p["threshold"] / 2:
+        diff = clipped * sd
+        state["mean"] = mean + p["alpha"] * diff
+        state["var"] = (1 - p["alpha"]) * (state["var"] + p["alpha"] * diff * diff)
+    return signals
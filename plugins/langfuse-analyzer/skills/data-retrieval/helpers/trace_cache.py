@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Local Trace Cache
+
+Persistent SQLite store for Langfuse traces and observations, keyed by trace ID.
+Finished traces are immutable, so repeated debugging sessions can be served
+from disk without any network calls.
+
+A trace is only served from the cache once it has "settled": it was fetched at
+least CACHE_SETTLE_SECONDS after its own timestamp. Traces fetched while still
+running are re-fetched on the next read.
+
+Environment Variables:
+    LANGFUSE_CACHE_DIR: Cache directory (default: ~/.cache/langfuse-analyzer)
+    LANGFUSE_CACHE_SETTLE_SECONDS: Age after which a trace is treated as final (default: 600)
+
+USAGE:
+    python trace_cache.py stats
+    python trace_cache.py clear
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+CACHE_DIR = Path(os.getenv("LANGFUSE_CACHE_DIR", str(Path.home() / ".cache" / "langfuse-analyzer")))
+CACHE_SETTLE_SECONDS = int(os.getenv("LANGFUSE_CACHE_SETTLE_SECONDS", "600"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS traces (
+    id TEXT PRIMARY KEY,
+    timestamp TEXT,
+    fetched_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS traces_timestamp ON traces (timestamp);
+CREATE TABLE IF NOT EXISTS observations (
+    trace_id TEXT PRIMARY KEY,
+    trace_timestamp TEXT,
+    fetched_at TEXT NOT NULL,
+    projection TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Singleton connection (shared across threads, serialized by _lock)
+_conn = None
+_lock = threading.RLock()
+
+
+def get_cache_connection() -> sqlite3.Connection:
+    """Get or create the cache database connection."""
+    global _conn
+
+    with _lock:
+        if _conn is not None:
+            return _conn
+
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _conn = sqlite3.connect(str(CACHE_DIR / "traces.sqlite3"), check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.executescript(_SCHEMA)
+        # Caches created before observation projections were stored
+        columns = {row[1] for row in _conn.execute("PRAGMA table_info(observations)")}
+        if "projection" not in columns:
+            _conn.execute("ALTER TABLE observations ADD COLUMN projection TEXT")
+        return _conn
+
+
+# =============================================================================
+# SERIALIZATION
+# =============================================================================
+
+def json_default(value: Any) -> Any:
+    """JSON encoder for datetimes and other SDK values."""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def to_utc_iso(value: Any) -> Optional[str]:
+    """Normalize a datetime or ISO string to a sortable UTC ISO string."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return value
+    if isinstance(value, datetime):
+        # Naive datetimes are interpreted as local time
+        return value.astimezone(timezone.utc).isoformat()
+    return str(value)
+
+
+def _is_settled(timestamp: Optional[str], fetched_at: str) -> bool:
+    """Check whether a trace was fetched long enough after it started to be final."""
+    if not timestamp:
+        return False
+    try:
+        started = datetime.fromisoformat(timestamp)
+        fetched = datetime.fromisoformat(fetched_at)
+        return (fetched - started).total_seconds() >= CACHE_SETTLE_SECONDS
+    except ValueError:
+        return False
+
+
+def _trace_timestamp(trace: Dict) -> Optional[str]:
+    return to_utc_iso(trace.get("timestamp"))
+
+
+# =============================================================================
+# TRACES
+# =============================================================================
+
+def get_cached_trace(trace_id: str, allow_unsettled: bool = False) -> Optional[Dict]:
+    """Return a settled trace from the cache, or None if missing or possibly stale."""
+    with _lock:
+        row = get_cache_connection().execute(
+            "SELECT timestamp, fetched_at, data FROM traces WHERE id = ?", (trace_id,)
+        ).fetchone()
+
+    if not row:
+        return None
+    if not allow_unsettled and not _is_settled(row[0], row[1]):
+        return None
+    return json.loads(row[2])
+
+
+def put_traces(traces: List[Dict]) -> None:
+    """Insert or replace traces in the cache."""
+    fetched_at = datetime.now(timezone.utc).isoformat()
+    rows = [
+        (t["id"], _trace_timestamp(t), fetched_at, json.dumps(t, default=json_default))
+        for t in traces if t.get("id")
+    ]
+    with _lock:
+        conn = get_cache_connection()
+        conn.executemany(
+            "INSERT OR REPLACE INTO traces (id, timestamp, fetched_at, data) VALUES (?, ?, ?, ?)", rows
+        )
+        conn.commit()
+
+
+def query_cached_traces(
+    from_timestamp: Optional[datetime] = None,
+    to_timestamp: Optional[datetime] = None,
+    tags: Optional[List[str]] = None
+) -> Iterator[Dict]:
+    """
+    Yield cached traces in a time window, newest first.
+
+    Args:
+        from_timestamp: Only traces at or after this time
+        to_timestamp: Only traces at or before this time
+        tags: Only traces carrying all of these tags
+    """
+    clauses = []
+    params = []
+    if from_timestamp is not None:
+        clauses.append("timestamp >= ?")
+        params.append(to_utc_iso(from_timestamp))
+    if to_timestamp is not None:
+        clauses.append("timestamp <= ?")
+        params.append(to_utc_iso(to_timestamp))
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    with _lock:
+        rows = get_cache_connection().execute(
+            f"SELECT data FROM traces {where} ORDER BY timestamp DESC", params
+        ).fetchall()
+
+    required_tags = set(tags or [])
+    for (data,) in rows:
+        trace = json.loads(data)
+        if required_tags and not required_tags.issubset(trace.get("tags") or []):
+            continue
+        yield trace
+
+
+# =============================================================================
+# OBSERVATIONS
+# =============================================================================
+
+def get_cached_observations(
+    trace_id: str,
+    allow_unsettled: bool = False,
+    projection: Optional[str] = None
+) -> Optional[List[Dict]]:
+    """
+    Return settled observations for a trace, or None if missing or possibly stale.
+
+    Args:
+        trace_id: Trace ID
+        allow_unsettled: Return observations even if the trace may still change
+        projection: Requested field projection name (None = full observations).
+            A cached full fetch satisfies any projection; a cached projection
+            only satisfies the same projection.
+    """
+    with _lock:
+        row = get_cache_connection().execute(
+            "SELECT trace_timestamp, fetched_at, data, projection FROM observations WHERE trace_id = ?", (trace_id,)
+        ).fetchone()
+
+    if not row:
+        return None
+    if row[3] is not None and row[3] != projection:
+        return None
+
+    observations = json.loads(row[2])
+    if not allow_unsettled and not _observations_settled(row[0], row[1], observations):
+        return None
+    return observations
+
+
+def _observations_settled(trace_timestamp: Optional[str], fetched_at: str, observations: List[Dict]) -> bool:
+    """
+    Check whether cached observations are final: the trace had settled when
+    they were fetched. Falls back to the latest observation start when the
+    trace timestamp is unknown.
+    """
+    timestamp = trace_timestamp or max((to_utc_iso(o.get("start_time")) or "" for o in observations), default=None)
+    return _is_settled(timestamp, fetched_at)
+
+
+def put_observations(
+    trace_id: str,
+    observations: List[Dict],
+    trace_timestamp: Any = None,
+    projection: Optional[str] = None
+) -> None:
+    """
+    Insert or replace all observations for a trace.
+
+    A projected fetch never overwrites a settled full fetch. It does replace
+    an unsettled one, which would never be served again, so projected reads
+    of recent traces can be cached once the trace settles.
+    """
+    fetched_at = datetime.now(timezone.utc).isoformat()
+    with _lock:
+        conn = get_cache_connection()
+        if projection is not None:
+            existing = conn.execute(
+                "SELECT trace_timestamp, fetched_at, data FROM observations WHERE trace_id = ? AND projection IS NULL",
+                (trace_id,)
+            ).fetchone()
+            if existing and _observations_settled(existing[0], existing[1], json.loads(existing[2])):
+                return
+        conn.execute(
+            "INSERT OR REPLACE INTO observations (trace_id, trace_timestamp, fetched_at, projection, data) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (trace_id, to_utc_iso(trace_timestamp), fetched_at, projection,
+             json.dumps(observations, default=json_default))
+        )
+        conn.commit()
+
+
+# =============================================================================
+# SYNC STATE
+# =============================================================================
+
+def get_sync_mark(key: str) -> Optional[str]:
+    """
+    Return a sync watermark (UTC ISO string), if recorded.
+
+    Keys used by trace_retriever --sync:
+        traces_high_water: end of the newest window synced
+        traces_low_water: start of the oldest window synced
+    """
+    with _lock:
+        row = get_cache_connection().execute(
+            "SELECT value FROM sync_state WHERE key = ?", (key,)
+        ).fetchone()
+    return row[0] if row else None
+
+
+def set_sync_mark(key: str, timestamp: str) -> None:
+    """Record a sync watermark."""
+    with _lock:
+        conn = get_cache_connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, timestamp)
+        )
+        conn.commit()
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Summarize cache contents."""
+    with _lock:
+        conn = get_cache_connection()
+        traces, oldest, newest = conn.execute("SELECT COUNT(*), MIN(timestamp), MAX(timestamp) FROM traces").fetchone()
+        observed = conn.execute("SELECT COUNT(*) FROM observations").fetchone()[0]
+    return {
+        "path": str(CACHE_DIR / "traces.sqlite3"),
+        "traces": traces,
+        "traces_with_observations": observed,
+        "oldest": oldest,
+        "newest": newest,
+        "high_water_mark": get_sync_mark("traces_high_water"),
+        "low_water_mark": get_sync_mark("traces_low_water"),
+    }
+
+
+def clear_cache() -> None:
+    """Delete all cached traces, observations and sync state."""
+    with _lock:
+        conn = get_cache_connection()
+        conn.executescript("DELETE FROM traces; DELETE FROM observations; DELETE FROM sync_state;")
+        conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Langfuse trace cache maintenance")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("stats", help="Show cache statistics")
+    subparsers.add_parser("clear", help="Delete all cached data")
+
+    args = parser.parse_args()
+
+    if args.command == "stats":
+        stats = get_cache_stats()
+        print("# Trace Cache\n")
+        print("| Field | Value |")
+        print("|-------|-------|")
+        for key, value in stats.items():
+            print(f"| {key} | {value if value is not None else '-'} |")
+
+    elif args.command == "clear":
+        clear_cache()
+        print(f"Cleared cache at {CACHE_DIR}")
+
+
+if __name__ == "__main__":
+    main()
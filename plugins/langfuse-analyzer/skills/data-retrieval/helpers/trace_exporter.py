@@ -0,0 +1,676 @@
+#!/usr/bin/env python3
+"""
+Bulk Trace Exporter
+
+Exports every trace (and optionally every observation) in an arbitrary time
+window to compressed JSONL shards. Long windows are split into time slices that
+are fetched in parallel; each slice walks all result pages and is written to
+its own shard, e.g. traces-0001.jsonl.gz.
+
+A checkpoint file records finished slices, so an interrupted export resumes
+where it stopped when re-run with the same arguments (or with just --out-dir).
+Without --to, a resumed export keeps the checkpoint's window end; flags that
+contradict the checkpoint are rejected rather than silently replaced.
+
+The to-parquet command flattens exported shards into columnar Parquet files
+(one row per trace / observation) for vectorized offline analytics with
+pandas, polars, DuckDB or Arrow. Requires `pyarrow`.
+
+COMMANDS:
+    export      Export traces/observations to JSONL.gz shards
+    to-parquet  Convert exported shards to flattened Parquet files
+
+EXAMPLES:
+    python trace_exporter.py export --from 2026-10-01 --to 2026-10-02 --out-dir ./export
+    python trace_exporter.py export --days 7 --slice-hours 6 --workers 8 --observations --out-dir ./week
+    python trace_exporter.py to-parquet --input-dir ./week --out-dir ./week-parquet --partition-by day
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+from langfuse_client import call_with_retry, get_langfuse_client
+from trace_cache import json_default
+
+
+PAGE_SIZE = 100
+CHECKPOINT_FILE = "checkpoint.json"
+
+# Serializes checkpoint updates from worker threads
+_checkpoint_lock = threading.Lock()
+
+
+# =============================================================================
+# TIME WINDOWS
+# =============================================================================
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse an ISO date or datetime; naive values are treated as UTC."""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def plan_slices(from_time: datetime, to_time: datetime, slice_hours: float) -> List[Dict[str, Any]]:
+    """Split [from_time, to_time) into consecutive, numbered slices."""
+    slices = []
+    step = timedelta(hours=slice_hours)
+    start = from_time
+    index = 1
+    while start < to_time:
+        end = min(start + step, to_time)
+        slices.append({"index": index, "from": start, "to": end})
+        start = end
+        index += 1
+    return slices
+
+
+# =============================================================================
+# PAGINATION
+# =============================================================================
+
+def iter_pages(fetch: Callable[..., Any], **params) -> Iterator[List[Any]]:
+    """
+    Walk every page of a Langfuse list endpoint.
+
+    Raises on errors (after transport retries) so an incomplete slice is never
+    checkpointed as finished.
+    """
+    page = 1
+    while True:
+        response = call_with_retry(fetch, limit=PAGE_SIZE, page=page, **params)
+        data = response.data if hasattr(response, "data") and response.data else []
+        if data:
+            yield data
+
+        total_pages = getattr(getattr(response, "meta", None), "total_pages", None)
+        if len(data) < PAGE_SIZE or (total_pages is not None and page >= total_pages):
+            return
+        page += 1
+
+
+def _to_dict(item: Any) -> Dict:
+    return item.dict() if hasattr(item, "dict") else dict(item)
+
+
+def _collect_ids(pages: Iterator[List[Any]], ids: List[str]) -> Iterator[List[Any]]:
+    """Pass pages through, appending each item's id to `ids`."""
+    for page in pages:
+        ids.extend(_to_dict(item).get("id") for item in page)
+        yield page
+
+
+def _iter_trace_observations(fetch: Callable[..., Any], trace_ids: List[str]) -> Iterator[List[Any]]:
+    """Walk the observations of each trace in turn."""
+    for trace_id in trace_ids:
+        yield from iter_pages(fetch, trace_id=trace_id)
+
+
+def _write_shard(path: Path, pages: Iterator[List[Any]]) -> int:
+    """Stream pages into a gzip JSONL shard atomically. Returns row count."""
+    part = path.with_name(path.name + ".part")
+    count = 0
+    with gzip.open(part, "wt", encoding="utf-8") as f:
+        for page in pages:
+            for item in page:
+                f.write(json.dumps(_to_dict(item), default=json_default, ensure_ascii=False))
+                f.write("\n")
+                count += 1
+    os.replace(part, path)
+    return count
+
+
+# =============================================================================
+# CHECKPOINTING
+# =============================================================================
+
+def load_checkpoint(out_dir: Path, settings: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Load the checkpoint for an export directory, or start a new one.
+
+    Raises:
+        ValueError: If the directory holds an export with different settings
+    """
+    path = out_dir / CHECKPOINT_FILE
+    if not path.exists():
+        return {"settings": settings, "completed": {}}
+
+    with open(path) as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("settings") != settings:
+        raise ValueError(
+            f"{out_dir} contains an export with different settings; "
+            "use a new --out-dir or delete the checkpoint to start over"
+        )
+    return checkpoint
+
+
+def resume_conflicts(
+    saved: Dict[str, Any],
+    slice_hours: Optional[float],
+    observations: Optional[bool],
+    tags: Optional[List[str]]
+) -> List[str]:
+    """
+    Compare explicitly passed flags with a checkpoint's settings.
+
+    Flags left unset (None) take the checkpoint's value and never conflict.
+
+    Returns:
+        Descriptions of the saved settings that the flags contradict
+    """
+    conflicts = []
+    if slice_hours is not None and slice_hours != saved["slice_hours"]:
+        conflicts.append(f"--slice-hours {saved['slice_hours']:g}")
+    if observations and not saved["observations"]:
+        conflicts.append("no --observations")
+    if tags is not None and sorted(tags) != (saved["tags"] or []):
+        conflicts.append(f"--tags {' '.join(saved['tags'])}" if saved["tags"] else "no --tags")
+    return conflicts
+
+
+def mark_slice_complete(out_dir: Path, checkpoint: Dict[str, Any], index: int, counts: Dict[str, int]) -> None:
+    """Record a finished slice and atomically rewrite the checkpoint file."""
+    with _checkpoint_lock:
+        checkpoint["completed"][str(index)] = counts
+        tmp = out_dir / (CHECKPOINT_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(checkpoint, f, indent=2)
+        os.replace(tmp, out_dir / CHECKPOINT_FILE)
+
+
+# =============================================================================
+# EXPORT
+# =============================================================================
+
+def export_slice(
+    slice_info: Dict[str, Any],
+    out_dir: Path,
+    include_observations: bool,
+    tags: Optional[List[str]] = None
+) -> Dict[str, int]:
+    """
+    Export all traces (and observations) of one time slice to its shards.
+
+    Without tags, observations are swept by start time over the slice. With
+    tags, the sweep would include observations of untagged traces, so the
+    observations of each exported trace are fetched instead and the
+    observation shard matches the trace shard exactly.
+    """
+    client = get_langfuse_client()
+    index = slice_info["index"]
+    counts = {}
+
+    trace_params = {"from_timestamp": slice_info["from"], "to_timestamp": slice_info["to"]}
+    if tags:
+        trace_params["tags"] = tags
+    trace_ids = []
+    counts["traces"] = _write_shard(
+        out_dir / f"traces-{index:04d}.jsonl.gz",
+        _collect_ids(iter_pages(client.api.trace.list, **trace_params), trace_ids)
+    )
+
+    if include_observations:
+        if tags:
+            pages = _iter_trace_observations(client.api.observations.get_many, trace_ids)
+        else:
+            pages = iter_pages(
+                client.api.observations.get_many,
+                from_start_time=slice_info["from"],
+                to_start_time=slice_info["to"]
+            )
+        counts["observations"] = _write_shard(out_dir / f"observations-{index:04d}.jsonl.gz", pages)
+
+    return counts
+
+
+def export_window(
+    from_time: datetime,
+    to_time: datetime,
+    out_dir: Path,
+    slice_hours: float = 1.0,
+    workers: int = 4,
+    include_observations: bool = False,
+    tags: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Export a time window as parallel, resumable slices.
+
+    Returns:
+        Summary with slice counts, row totals and any failed slices
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    settings = {
+        "from": from_time.isoformat(),
+        "to": to_time.isoformat(),
+        "slice_hours": slice_hours,
+        "observations": include_observations,
+        "tags": sorted(tags) if tags else None,
+    }
+    if include_observations and tags:
+        # Older tagged exports swept observations by window; never resume those
+        settings["observation_scope"] = "exported-traces"
+    checkpoint = load_checkpoint(out_dir, settings)
+
+    slices = plan_slices(from_time, to_time, slice_hours)
+    pending = [s for s in slices if str(s["index"]) not in checkpoint["completed"]]
+    skipped = len(slices) - len(pending)
+    failed = []
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(pending)))) as executor:
+            futures = {
+                executor.submit(export_slice, s, out_dir, include_observations, tags): s
+                for s in pending
+            }
+            for future in as_completed(futures):
+                slice_info = futures[future]
+                try:
+                    counts = future.result()
+                    mark_slice_complete(out_dir, checkpoint, slice_info["index"], counts)
+                    print(
+                        f"Slice {slice_info['index']}/{len(slices)} done: {counts}",
+                        file=sys.stderr
+                    )
+                except Exception as e:
+                    failed.append({"index": slice_info["index"], "error": str(e)})
+                    print(f"Slice {slice_info['index']} failed: {e}", file=sys.stderr)
+
+    completed = checkpoint["completed"].values()
+    return {
+        "out_dir": str(out_dir),
+        "slices": len(slices),
+        "resumed_from_checkpoint": skipped,
+        "completed": len(checkpoint["completed"]),
+        "traces": sum(c.get("traces", 0) for c in completed),
+        "observations": sum(c.get("observations", 0) for c in completed) if include_observations else None,
+        "failed": sorted(failed, key=lambda f: f["index"]),
+    }
+
+
+# =============================================================================
+# COLUMNAR (PARQUET) CONVERSION
+# =============================================================================
+
+# Rows buffered per Parquet row group
+ROW_GROUP_SIZE = 50_000
+
+# Flattened columns: (name, arrow type id)
+TRACE_COLUMNS = [
+    ("id", "string"),
+    ("name", "string"),
+    ("timestamp", "timestamp"),
+    ("user_id", "string"),
+    ("session_id", "string"),
+    ("release", "string"),
+    ("version", "string"),
+    ("environment", "string"),
+    ("tags", "list<string>"),
+    ("latency_ms", "float64"),
+    ("total_cost", "float64"),
+]
+
+OBSERVATION_COLUMNS = [
+    ("id", "string"),
+    ("trace_id", "string"),
+    ("parent_observation_id", "string"),
+    ("type", "string"),
+    ("name", "string"),
+    ("start_time", "timestamp"),
+    ("end_time", "timestamp"),
+    ("latency_ms", "float64"),
+    ("level", "string"),
+    ("status_message", "string"),
+    ("model", "string"),
+    ("input_tokens", "int64"),
+    ("output_tokens", "int64"),
+    ("total_tokens", "int64"),
+    ("input_cost", "float64"),
+    ("output_cost", "float64"),
+    ("total_cost", "float64"),
+]
+
+
+def _get(record: Dict, snake: str, camel: Optional[str] = None) -> Any:
+    """Read a field from SDK (snake_case) or raw HTTP (camelCase) records."""
+    value = record.get(snake)
+    if value is None and camel:
+        value = record.get(camel)
+    return value
+
+
+def _parse_time(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    try:
+        return parse_timestamp(str(value))
+    except ValueError:
+        return None
+
+
+def _latency_ms(start: Optional[datetime], end: Optional[datetime]) -> Optional[float]:
+    if start is None or end is None:
+        return None
+    return (end - start).total_seconds() * 1000
+
+
+def _as_int(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_float(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def flatten_trace(trace: Dict) -> Dict[str, Any]:
+    """Flatten a trace record into TRACE_COLUMNS."""
+    metadata = trace.get("metadata") or {}
+    # Trace list latency is reported in seconds
+    latency = _as_float(trace.get("latency"))
+    return {
+        "id": trace.get("id"),
+        "name": trace.get("name"),
+        "timestamp": _parse_time(trace.get("timestamp")),
+        "user_id": _get(trace, "user_id", "userId"),
+        "session_id": _get(trace, "session_id", "sessionId"),
+        "release": trace.get("release"),
+        "version": trace.get("version"),
+        "environment": trace.get("environment") or (metadata.get("environment") if isinstance(metadata, dict) else None),
+        "tags": [str(t) for t in trace.get("tags") or []],
+        "latency_ms": latency * 1000 if latency is not None else None,
+        "total_cost": _as_float(_get(trace, "total_cost", "totalCost")),
+    }
+
+
+def flatten_observation(obs: Dict) -> Dict[str, Any]:
+    """Flatten an observation record into OBSERVATION_COLUMNS."""
+    start = _parse_time(_get(obs, "start_time", "startTime"))
+    end = _parse_time(_get(obs, "end_time", "endTime"))
+    usage = obs.get("usage") or {}
+    return {
+        "id": obs.get("id"),
+        "trace_id": _get(obs, "trace_id", "traceId"),
+        "parent_observation_id": _get(obs, "parent_observation_id", "parentObservationId"),
+        "type": obs.get("type"),
+        "name": obs.get("name"),
+        "start_time": start,
+        "end_time": end,
+        "latency_ms": _latency_ms(start, end),
+        "level": obs.get("level"),
+        "status_message": _get(obs, "status_message", "statusMessage"),
+        "model": obs.get("model"),
+        "input_tokens": _as_int(usage.get("input")),
+        "output_tokens": _as_int(usage.get("output")),
+        "total_tokens": _as_int(usage.get("total")),
+        "input_cost": _as_float(_get(obs, "calculated_input_cost", "calculatedInputCost")),
+        "output_cost": _as_float(_get(obs, "calculated_output_cost", "calculatedOutputCost")),
+        "total_cost": _as_float(_get(obs, "calculated_total_cost", "calculatedTotalCost")),
+    }
+
+
+def _import_pyarrow():
+    """Import pyarrow lazily; it is only needed for Parquet conversion."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        print("ERROR: pyarrow package not installed", file=sys.stderr)
+        print("Install with: pip install pyarrow", file=sys.stderr)
+        sys.exit(1)
+
+
+def _arrow_schema(pa, columns: List[tuple]):
+    types = {
+        "string": pa.string(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+        "float64": pa.float64(),
+        "int64": pa.int64(),
+        "list<string>": pa.list_(pa.string()),
+    }
+    return pa.schema([(name, types[type_id]) for name, type_id in columns])
+
+
+def _iter_shard_rows(paths: List[Path]) -> Iterator[Dict]:
+    for path in paths:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def write_parquet(
+    rows: Iterator[Dict[str, Any]],
+    columns: List[tuple],
+    out_dir: Path,
+    partition_column: Optional[str] = None
+) -> Dict[str, int]:
+    """
+    Stream flattened rows into Parquet, one row group per ROW_GROUP_SIZE rows.
+
+    With partition_column set, rows are split into hive-style day partitions
+    (`day=YYYY-MM-DD/part-0.parquet`) by that timestamp column.
+
+    Returns:
+        Row count per written file
+    """
+    pa = _import_pyarrow()
+    schema = _arrow_schema(pa, columns)
+    names = [name for name, _ in columns]
+
+    writers = {}
+    paths = {}
+    buffers = {}
+    counts = {}
+
+    def flush(key):
+        buffer = buffers.pop(key, None)
+        if not buffer:
+            return
+        if key not in writers:
+            path = out_dir / key / "part-0.parquet" if key else out_dir / "part-0.parquet"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            writers[key] = pa.parquet.ParquetWriter(str(path), schema, compression="zstd")
+            paths[key] = str(path)
+            counts[paths[key]] = 0
+        table = pa.Table.from_pydict({name: [row[name] for row in buffer] for name in names}, schema=schema)
+        writers[key].write_table(table)
+        counts[paths[key]] += len(buffer)
+
+    try:
+        for row in rows:
+            key = ""
+            if partition_column:
+                ts = row.get(partition_column)
+                key = f"day={ts.astimezone(timezone.utc).strftime('%Y-%m-%d')}" if ts else "day=unknown"
+            buffers.setdefault(key, []).append(row)
+            if len(buffers[key]) >= ROW_GROUP_SIZE:
+                flush(key)
+        for key in list(buffers):
+            flush(key)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    return counts
+
+
+def convert_to_parquet(input_dir: Path, out_dir: Path, partition_by: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Convert exported JSONL.gz shards into flattened Parquet tables.
+
+    Writes `traces/` and `observations/` under out_dir, optionally partitioned
+    by day of trace timestamp / observation start time.
+    """
+    trace_shards = sorted(input_dir.glob("traces-*.jsonl.gz"))
+    observation_shards = sorted(input_dir.glob("observations-*.jsonl.gz"))
+    if not trace_shards and not observation_shards:
+        raise ValueError(f"No exported shards found in {input_dir}")
+
+    result = {"out_dir": str(out_dir), "files": {}}
+    if trace_shards:
+        result["files"].update(write_parquet(
+            (flatten_trace(t) for t in _iter_shard_rows(trace_shards)),
+            TRACE_COLUMNS,
+            out_dir / "traces",
+            "timestamp" if partition_by == "day" else None
+        ))
+    if observation_shards:
+        result["files"].update(write_parquet(
+            (flatten_observation(o) for o in _iter_shard_rows(observation_shards)),
+            OBSERVATION_COLUMNS,
+            out_dir / "observations",
+            "start_time" if partition_by == "day" else None
+        ))
+    return result
+
+
+# =============================================================================
+# FORMATTING
+# =============================================================================
+
+def format_export_result(result: Dict[str, Any]) -> str:
+    """Format export summary for display."""
+    lines = ["# Trace Export\n"]
+    lines.append(f"**Output:** {result['out_dir']}")
+    lines.append(f"**Slices:** {result['completed']}/{result['slices']} complete "
+                 f"({result['resumed_from_checkpoint']} resumed from checkpoint)")
+    lines.append(f"**Traces:** {result['traces']:,}")
+    if result.get("observations") is not None:
+        lines.append(f"**Observations:** {result['observations']:,}")
+
+    if result["failed"]:
+        lines.append(f"\n## Failed Slices ({len(result['failed'])})\n")
+        for f in result["failed"]:
+            lines.append(f"- Slice {f['index']}: {f['error']}")
+        lines.append("\nRe-run the same command to resume the remaining slices.")
+
+    return "\n".join(lines)
+
+
+def format_parquet_result(result: Dict[str, Any]) -> str:
+    """Format Parquet conversion summary for display."""
+    lines = ["# Parquet Conversion\n"]
+    lines.append(f"**Output:** {result['out_dir']}\n")
+    lines.append("| File | Rows |")
+    lines.append("|------|------|")
+    for path, rows in sorted(result["files"].items()):
+        lines.append(f"| {path} | {rows:,} |")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Bulk export of Langfuse traces and observations",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Export traces to JSONL.gz shards")
+    export_parser.add_argument("--from", dest="from_time", help="Window start (ISO date/datetime, UTC)")
+    export_parser.add_argument("--to", dest="to_time", help="Window end (ISO date/datetime, UTC; default: now)")
+    export_parser.add_argument("--days", type=int,
+                               help="Window length in days when --from is not set (default: 1)")
+    export_parser.add_argument("--out-dir", required=True, help="Directory for shards and checkpoint")
+    export_parser.add_argument("--slice-hours", type=float,
+                               help="Hours per time slice / shard (default: 1)")
+    export_parser.add_argument("--workers", type=int, default=4,
+                               help="Slices fetched in parallel (default: 4)")
+    export_parser.add_argument("--observations", action="store_true", default=None,
+                               help="Also export observations (by start time; with --tags, per exported trace)")
+    export_parser.add_argument("--tags", nargs="+", help="Only export traces with these tags")
+
+    parquet_parser = subparsers.add_parser("to-parquet", help="Convert exported shards to Parquet")
+    parquet_parser.add_argument("--input-dir", required=True, help="Directory written by the export command")
+    parquet_parser.add_argument("--out-dir", required=True, help="Directory for Parquet output")
+    parquet_parser.add_argument("--partition-by", choices=["day"],
+                                help="Partition files by day (hive-style day=YYYY-MM-DD)")
+
+    args = parser.parse_args()
+
+    if args.command == "export":
+        checkpoint_path = Path(args.out_dir) / CHECKPOINT_FILE
+        saved = None
+        if not args.to_time and checkpoint_path.exists():
+            with open(checkpoint_path) as f:
+                saved = json.load(f)["settings"]
+            # Without --to the window would end "now" and never match again: resume the
+            # checkpointed window if the command names the same start (or none at all)
+            if args.from_time:
+                resume = parse_timestamp(args.from_time) == parse_timestamp(saved["from"])
+            else:
+                resume = args.days is None
+            if not resume:
+                saved = None
+
+        if saved:
+            conflicts = resume_conflicts(saved, args.slice_hours, args.observations, args.tags)
+            if conflicts:
+                parser.error(
+                    f"{args.out_dir} holds an export of {saved['from']} to {saved['to']} with "
+                    + ", ".join(conflicts)
+                    + "; re-run with matching flags, or use a new --out-dir"
+                )
+            from_time = parse_timestamp(saved["from"])
+            to_time = parse_timestamp(saved["to"])
+            args.slice_hours = saved["slice_hours"]
+            args.observations = saved["observations"]
+            args.tags = saved["tags"]
+            print(f"Resuming export {saved['from']} to {saved['to']}", file=sys.stderr)
+        else:
+            to_time = parse_timestamp(args.to_time) if args.to_time else datetime.now(timezone.utc)
+            days = args.days if args.days is not None else 1
+            from_time = parse_timestamp(args.from_time) if args.from_time else to_time - timedelta(days=days)
+            args.slice_hours = args.slice_hours if args.slice_hours is not None else 1.0
+            args.observations = bool(args.observations)
+        if from_time >= to_time:
+            parser.error("--from must be before --to")
+
+        try:
+            result = export_window(
+                from_time=from_time,
+                to_time=to_time,
+                out_dir=Path(args.out_dir),
+                slice_hours=args.slice_hours,
+                workers=args.workers,
+                include_observations=args.observations,
+                tags=args.tags
+            )
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+
+        print(format_export_result(result))
+        if result["failed"]:
+            sys.exit(1)
+
+    elif args.command == "to-parquet":
+        try:
+            result = convert_to_parquet(Path(args.input_dir), Path(args.out_dir), args.partition_by)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(format_parquet_result(result))
+
+
+if __name__ == "__main__":
+    main()
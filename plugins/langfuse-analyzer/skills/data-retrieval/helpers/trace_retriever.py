@@ -10,6 +10,8 @@ MODES:
     io       - Input/output of each node + tool calls (DEFAULT - core debugging)
     prompts  - Just LLM prompts and responses (no tool calls)
     flow     - Node names, execution order, timing per node
+    tree     - Span tree with self-time vs child-time, critical path marked
+    critical-path - Only the critical path and the spans dominating latency
     full     - Everything including costs, tokens, metadata
 
 RETRIEVAL:
@@ -17,109 +19,134 @@ RETRIEVAL:
     --last N          Last N traces (default: 1)
     --case ID         Filter by case_id metadata
     --tags TAG...     Filter by tags
+    --tail            Follow new traces as they arrive (see live_tail.py)
+
+CONCURRENCY:
+    --concurrency N   Fetch observations for up to N traces in parallel (default: 8)
+                      Traces are still printed in their original order.
+    --workers N       List traces/scores in N parallel time slices when paging
+                      through a window (filters, --sync; default: 4). Slices
+                      holding more than a page are split (see fetch_planner.py).
+
+AGGREGATION:
+    --aggregate latency  Per-node count, p50/p90/p99, max and self-time share across
+                         all retrieved traces (bounded memory via quantile sketches)
+
+OUTPUT FORMATS:
+    --format markdown Formatted markdown for LLM consumption (default)
+    --format ndjson   One JSON record per trace, streamed as each trace is loaded
+    --format json     A JSON array of the same records
+    --flatten         Emit observations as separate records (ndjson/json only)
+
+LOCAL CACHE:
+    Traces and observations are cached on disk (see trace_cache.py) and served
+    from the cache once finished.
+    --sync            Fetch only traces newer than the last sync, then list from cache
+    --refresh         Re-fetch cached traces/observations from the API
+    --offline         Serve from cache only, with zero API calls
 
 ENVIRONMENT:
     LANGFUSE_SDK_TIMEOUT  SDK timeout in seconds before HTTP fallback (default: 30)
                           When SDK operations time out, falls back to direct HTTP
                           calls via httpx for more reliable batch operations.
+    LANGFUSE_HTTP_TIMEOUT Deadline in seconds for the HTTP fallback (default: 60)
+    LANGFUSE_MAX_RETRIES  Retries with jittered backoff on 429/5xx (default: 3)
 
 EXAMPLES:
     python trace_retriever.py --last 2
     python trace_retriever.py --trace-id abc123 --mode prompts
     python trace_retriever.py --last 5 --case 0001 --mode flow
+    python trace_retriever.py --tail --mode minimal --tags production
 """
 
 import argparse
-import os
+import json
+import re
 import sys
-from datetime import datetime, timedelta
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 sys.path.insert(0, str(Path(__file__).parent))
-from langfuse_client import get_langfuse_client
+from fetch_planner import DEFAULT_WORKERS, fetch_window
+from langfuse_client import call_with_retry, get_langfuse_client, http_get, is_timeout_error
+from live_tail import DEFAULT_MAX_INTERVAL, DEFAULT_MIN_INTERVAL, tail_endpoint
+from streaming_stats import new_sketch, sketch_add, sketch_quantile
+from trace_cache import (
+    get_cached_observations,
+    get_cached_trace,
+    get_sync_mark,
+    json_default,
+    put_observations,
+    put_traces,
+    query_cached_traces,
+    set_sync_mark,
+    to_utc_iso,
+    CACHE_SETTLE_SECONDS,
+)
 
 
 # =============================================================================
 # HTTP FALLBACK FOR SDK TIMEOUTS
 # =============================================================================
 
-# Default timeout for SDK operations (seconds)
-SDK_TIMEOUT = int(os.getenv("LANGFUSE_SDK_TIMEOUT", "30"))
+# Default number of traces whose observations are fetched in parallel
+DEFAULT_CONCURRENCY = 8
 
+# Page size for paginated trace and score listing (API maximum)
+PAGE_SIZE = 100
 
-def _get_httpx_client():
-    """Get or create httpx client for fallback operations."""
-    try:
-        import httpx
-        host = os.getenv("LANGFUSE_HOST", "https://cloud.langfuse.com")
-        public_key = os.getenv("LANGFUSE_PUBLIC_KEY", "")
-        secret_key = os.getenv("LANGFUSE_SECRET_KEY", "")
-
-        return httpx.Client(
-            base_url=host,
-            auth=(public_key, secret_key),
-            timeout=60.0,  # Longer timeout for fallback
-            headers={"Content-Type": "application/json"}
-        )
-    except ImportError:
-        return None
 
-
-def _fetch_traces_via_http(limit: int, from_timestamp: datetime, to_timestamp: datetime, tags: Optional[List[str]] = None) -> List[Dict]:
+def _fetch_traces_via_http(limit: int, from_timestamp: datetime, to_timestamp: datetime, tags: Optional[List[str]] = None, page: int = 1) -> Tuple[List[Dict], Optional[int]]:
     """
     Fallback: fetch traces via direct HTTP when SDK times out.
 
-    This is more reliable for batch operations as it bypasses SDK overhead.
-    """
-    client = _get_httpx_client()
-    if not client:
-        print("Warning: httpx not available for fallback", file=sys.stderr)
-        return []
+    Uses the shared pooled transport with its longer HTTP_TIMEOUT deadline.
 
+    Returns:
+        tuple: (traces, total traces in the window if reported)
+    """
     try:
         params = {
             "limit": limit,
+            "page": page,
             "fromTimestamp": from_timestamp.isoformat(),
             "toTimestamp": to_timestamp.isoformat(),
         }
         if tags:
             params["tags"] = tags
 
-        response = client.get("/api/public/traces", params=params)
-        response.raise_for_status()
-        data = response.json()
-        return data.get("data", [])
+        data = http_get("/api/public/traces", params=params)
+        return data.get("data", []), (data.get("meta") or {}).get("totalItems")
     except Exception as e:
         print(f"HTTP fallback failed: {e}", file=sys.stderr)
-        return []
-    finally:
-        client.close()
+        return [], None
+
+
+def _snake_case_keys(record: Dict) -> Dict:
+    """Convert top-level camelCase API keys (startTime) to SDK-style snake_case (start_time)."""
+    return {re.sub(r"(?<!^)(?=[A-Z])", "_", key).lower(): value for key, value in record.items()}
 
 
 def _fetch_observations_via_http(trace_id: str) -> List[Dict]:
     """
     Fallback: fetch observations via direct HTTP when SDK times out.
     """
-    client = _get_httpx_client()
-    if not client:
-        return []
-
     try:
         all_observations = []
         page = 1
 
         while True:
             params = {"traceId": trace_id, "limit": 100, "page": page}
-            response = client.get("/api/public/observations", params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = http_get("/api/public/observations", params=params)
 
             observations = data.get("data", [])
             if not observations:
                 break
 
-            all_observations.extend(observations)
+            all_observations.extend(_snake_case_keys(o) for o in observations)
             if len(observations) < 100:
                 break
             page += 1
@@ -128,14 +155,68 @@ def _fetch_observations_via_http(trace_id: str) -> List[Dict]:
     except Exception as e:
         print(f"HTTP fallback for observations failed: {e}", file=sys.stderr)
         return []
-    finally:
-        client.close()
+
+
+# Field groups requested from the v2 observations endpoint for light fetches
+# (ids, parent, type, name, level, status and timing; no input/output payloads)
+V2_OBSERVATION_FIELD_GROUPS = "core,basic"
+
+# None = not probed yet, False = endpoint unavailable on this Langfuse host
+_v2_observations_supported = None
+
+
+def _fetch_observations_projected(trace_id: str) -> Optional[List[Dict]]:
+    """
+    Fetch observations without input/output payloads via server-side field selection.
+
+    Uses the v2 observations endpoint (`fields` parameter). Returns None if the
+    host does not support it, so the caller can fall back to the v1 listing.
+    """
+    global _v2_observations_supported
+
+    if _v2_observations_supported is False:
+        return None
+
+    try:
+        all_observations = []
+        cursor = None
+
+        while True:
+            params = {"traceId": trace_id, "fields": V2_OBSERVATION_FIELD_GROUPS, "limit": 1000}
+            if cursor:
+                params["cursor"] = cursor
+            data = http_get("/api/public/v2/observations", params=params)
+
+            observations = data.get("data", [])
+            all_observations.extend(_snake_case_keys(o) for o in observations)
+            cursor = (data.get("meta") or {}).get("cursor")
+            if not observations or not cursor:
+                break
+
+        _v2_observations_supported = True
+        return all_observations
+    except Exception as e:
+        status = getattr(getattr(e, "response", None), "status_code", None)
+        if status in (400, 404, 405):
+            _v2_observations_supported = False
+        else:
+            print(f"Projected observation fetch failed for {trace_id}, using full fetch: {e}", file=sys.stderr)
+        return None
 
 
 # =============================================================================
 # OUTPUT MODES - Define what each mode includes
 # =============================================================================
 
+# Field projections pushed into the fetch layer. Modes reference these by name
+# via "fetch_fields"; None means full observations including payloads.
+FETCH_PROJECTIONS = {
+    "timing": [
+        "id", "trace_id", "parent_observation_id", "type", "name",
+        "start_time", "end_time", "level", "status_message",
+    ],
+}
+
 MODE_CONFIGS = {
     "minimal": {
         "description": "Quick overview - IDs, names, status, timing",
@@ -148,6 +229,7 @@ MODE_CONFIGS = {
         "trace_fields": ["id", "name", "timestamp"],
         "include_observations": True,
         "observation_fields": ["name", "type", "input", "output", "status_message", "level"],
+        "fetch_fields": None,  # Needs full payloads
         "include_latency": False,
         "include_tokens": False,
         "include_costs": False,
@@ -157,6 +239,7 @@ MODE_CONFIGS = {
         "trace_fields": ["id", "name", "timestamp"],
         "include_observations": True,
         "observation_fields": ["name", "input", "output"],
+        "fetch_fields": None,  # Needs full payloads
         "observation_filter": lambda obs: obs.get("type") == "GENERATION",
         "include_latency": False,
     },
@@ -165,14 +248,34 @@ MODE_CONFIGS = {
         "trace_fields": ["id", "name", "timestamp"],
         "include_observations": True,
         "observation_fields": ["name", "type", "start_time", "end_time"],
+        "fetch_fields": "timing",  # No payloads needed
         "include_latency": True,
         "include_tokens": False,
     },
+    "tree": {
+        "description": "Span tree with self-time vs child-time and the critical path",
+        "trace_fields": ["id", "name", "timestamp"],
+        "include_observations": True,
+        "observation_fields": ["parent_observation_id", "name", "type", "start_time", "end_time", "level"],
+        "fetch_fields": "timing",  # No payloads needed
+        "include_latency": True,
+        "analyze_tree": True,
+    },
+    "critical-path": {
+        "description": "Critical path and the spans dominating wall-clock latency",
+        "trace_fields": ["id", "name", "timestamp"],
+        "include_observations": True,
+        "observation_fields": ["parent_observation_id", "name", "type", "start_time", "end_time", "level"],
+        "fetch_fields": "timing",  # No payloads needed
+        "include_latency": True,
+        "analyze_tree": True,
+    },
     "full": {
         "description": "Everything - for deep investigation",
         "trace_fields": ["id", "name", "timestamp", "metadata", "tags"],
         "include_observations": True,
         "observation_fields": None,  # All fields
+        "fetch_fields": None,  # Needs full payloads
         "include_latency": True,
         "include_tokens": True,
         "include_costs": True,
@@ -188,7 +291,7 @@ def retrieve_trace_by_id(trace_id: str) -> Optional[Dict]:
     """Fetch a single trace by ID."""
     client = get_langfuse_client()
     try:
-        trace = client.api.trace.get(trace_id)
+        trace = call_with_retry(client.api.trace.get, trace_id)
         if trace:
             return trace.dict() if hasattr(trace, "dict") else dict(trace)
         return None
@@ -210,7 +313,7 @@ def get_trace_score(trace_id: str, score_name: str) -> Optional[float]:
     """
     client = get_langfuse_client()
     try:
-        response = client.api.scores.get_many(trace_id=trace_id)
+        response = call_with_retry(client.api.scores.get_many, trace_id=trace_id)
         if hasattr(response, "data") and response.data:
             for score in response.data:
                 score_dict = score.dict() if hasattr(score, "dict") else dict(score)
@@ -222,6 +325,96 @@ def get_trace_score(trace_id: str, score_name: str) -> Optional[float]:
         return None
 
 
+def fetch_score_index(
+    score_name: str,
+    from_timestamp: datetime,
+    to_timestamp: datetime,
+    workers: int = DEFAULT_WORKERS
+) -> Dict[str, float]:
+    """
+    Bulk-fetch all scores with a given name in a time window.
+
+    Fetches the window once (parallel time slices via the fetch planner) and
+    builds a trace_id -> value index, so score filtering costs O(pages)
+    requests instead of one request per trace. If a trace has several scores
+    with the same name, the most recent one wins.
+    """
+    client = get_langfuse_client()
+
+    def fetch_page(start: datetime, end: datetime, page: int) -> Tuple[List[Any], Optional[int]]:
+        response = call_with_retry(
+            client.api.scores.get_many,
+            name=score_name,
+            from_timestamp=start,
+            to_timestamp=end,
+            limit=PAGE_SIZE,
+            page=page
+        )
+        data = response.data if hasattr(response, "data") and response.data else []
+        return list(data), getattr(getattr(response, "meta", None), "total_items", None)
+
+    def compact(scores: List[Any]) -> List[Tuple[str, str, float]]:
+        rows = []
+        for score in scores:
+            trace_id = getattr(score, "trace_id", None)
+            value = getattr(score, "value", None)
+            if not trace_id or value is None:
+                continue
+            rows.append((trace_id, str(getattr(score, "timestamp", "") or ""), float(value)))
+        return rows
+
+    index = {}
+    latest = {}
+    for rows in fetch_window(fetch_page, from_timestamp, to_timestamp, workers, PAGE_SIZE, transform=compact):
+        for trace_id, timestamp, value in rows:
+            if trace_id not in index or timestamp >= latest[trace_id]:
+                index[trace_id] = value
+                latest[trace_id] = timestamp
+
+    return index
+
+
+def _list_traces_page(params: Dict[str, Any], page: int) -> Optional[Tuple[List[Dict], Optional[int]]]:
+    """
+    Fetch one page of traces, falling back to HTTP on SDK timeout.
+
+    Returns:
+        tuple: (traces, total traces in the window if reported), or None on error
+    """
+    client = get_langfuse_client()
+
+    try:
+        response = call_with_retry(client.api.trace.list, page=page, retry_timeouts=False, **params)
+        total = getattr(getattr(response, "meta", None), "total_items", None)
+        if hasattr(response, "data") and response.data:
+            return [t.dict() if hasattr(t, "dict") else dict(t) for t in response.data], total
+        return [], total
+
+    except Exception as e:
+        if is_timeout_error(e):
+            print(f"SDK timeout, falling back to HTTP: {e}", file=sys.stderr)
+            return _fetch_traces_via_http(
+                params["limit"], params["from_timestamp"], params["to_timestamp"], params.get("tags"), page
+            )
+        print(f"Error fetching traces: {e}", file=sys.stderr)
+        return None
+
+
+def _trace_page_fetcher(params: Dict[str, Any]) -> Callable[[datetime, datetime, int], Tuple]:
+    """Page fetcher for fetch_window over trace listing (params: extra list filters, e.g. tags)."""
+    def fetch_page(start: datetime, end: datetime, page: int) -> Tuple[List[Dict], Optional[int]]:
+        result = _list_traces_page(dict(params, limit=PAGE_SIZE, from_timestamp=start, to_timestamp=end), page)
+        if result is None:
+            raise RuntimeError(f"could not list traces between {start} and {end}")
+        return result
+
+    return fetch_page
+
+
+def _trace_sort_key(trace: Dict) -> str:
+    return to_utc_iso(trace.get("timestamp")) or ""
+
+
 def retrieve_last_traces(
     limit: int = 1,
     filter_field: Optional[str] = None,
@@ -230,11 +423,18 @@ def retrieve_last_traces(
     days: int = 7,
     min_score: Optional[float] = None,
     max_score: Optional[float] = None,
-    score_name: str = "quality_score"
+    score_name: str = "quality_score",
+    from_cache: bool = False,
+    workers: int = DEFAULT_WORKERS
 ) -> List[Dict]:
     """
     Fetch the last N traces, optionally filtered.
 
+    With client-side filters (metadata or score), or when `limit` exceeds one
+    page, the window is listed newest first in parallel time slices (fetch
+    planner) until `limit` matches are found or the window is exhausted. Score filters are resolved against an
+    index built by fetch_score_index().
+
     Args:
         limit: Maximum number of traces to return
         filter_field: Metadata field name to filter by (e.g., 'project_id', 'environment')
@@ -244,153 +444,624 @@ def retrieve_last_traces(
         min_score: Only include traces with score >= this value
         max_score: Only include traces with score <= this value
         score_name: Name of score to filter by (default: quality_score)
+        from_cache: List traces from the local cache instead of the API
+        workers: Time slices listed in parallel when paging through the window
     """
-    client = get_langfuse_client()
-
     end_time = datetime.now()
     start_time = end_time - timedelta(days=days)
 
-    # Fetch more traces if filtering by score (client-side filtering)
-    fetch_limit = limit * 5 if (min_score is not None or max_score is not None) else limit
-
-    params = {
-        "limit": fetch_limit,
-        "from_timestamp": start_time,
-        "to_timestamp": end_time,
-    }
-    if tags:
-        params["tags"] = tags
-
-    # Try SDK first, fall back to HTTP on timeout
-    raw_traces = None
-    try:
-        import signal
-
-        def timeout_handler(signum, frame):
-            raise TimeoutError("SDK operation timed out")
+    filter_by_metadata = bool(filter_field and filter_value)
+    filter_by_score = min_score is not None or max_score is not None
 
-        # Set timeout (Unix only, graceful degradation on Windows)
+    # Score join: one paginated sweep over the window, then match locally
+    candidate_ids = None
+    score_index = {}
+    if filter_by_score:
         try:
-            signal.signal(signal.SIGALRM, timeout_handler)
-            signal.alarm(SDK_TIMEOUT)
-        except (AttributeError, ValueError):
-            pass  # Windows or threading context
+            score_index = fetch_score_index(score_name, start_time, end_time, workers)
+        except Exception as e:
+            print(f"Error fetching scores for '{score_name}': {e}", file=sys.stderr)
+            return []
+        candidate_ids = {
+            trace_id for trace_id, value in score_index.items()
+            if (min_score is None or value >= min_score) and (max_score is None or value <= max_score)
+        }
+        if not candidate_ids:
+            return []
 
-        response = client.api.trace.list(**params)
+    # Without client-side filters a single page of `limit` traces is enough,
+    # unless more traces are wanted than one page can hold
+    paginate = filter_by_metadata or filter_by_score or limit > PAGE_SIZE
+    list_filters = {"tags": tags} if tags else {}
+    if from_cache:
+        pages = iter([list(query_cached_traces(start_time, end_time, tags))])
+    elif paginate:
+        pages = fetch_window(_trace_page_fetcher(list_filters), start_time, end_time, workers, PAGE_SIZE,
+                             sort_key=_trace_sort_key, newest_first=True)
+    else:
+        first = _list_traces_page(dict(list_filters, limit=limit, from_timestamp=start_time, to_timestamp=end_time), 1)
+        pages = iter([first[0]] if first else [])
 
-        try:
-            signal.alarm(0)  # Cancel timeout
-        except (AttributeError, ValueError):
-            pass
+    traces = []
+    seen_candidates = 0
 
-        if hasattr(response, "data") and response.data:
-            raw_traces = [t.dict() if hasattr(t, "dict") else dict(t) for t in response.data]
+    try:
+        for raw_traces in pages:
+            for trace_dict in raw_traces:
+                # Filter by score if specified (joined against the score index)
+                if candidate_ids is not None:
+                    if trace_dict.get("id") not in candidate_ids:
+                        continue
+                    seen_candidates += 1
+
+                # Filter by metadata field if specified (client-side filter)
+                if filter_by_metadata:
+                    metadata = trace_dict.get("metadata", {}) or {}
+                    if str(metadata.get(filter_field)) != str(filter_value):
+                        continue
+
+                if candidate_ids is not None:
+                    # Store score in trace dict for display
+                    trace_dict["_filtered_score"] = {
+                        "name": score_name,
+                        "value": score_index[trace_dict["id"]]
+                    }
+
+                traces.append(trace_dict)
+                if len(traces) >= limit:
+                    return traces
+
+            # Stop once every scored candidate has been seen
+            if candidate_ids is not None and seen_candidates >= len(candidate_ids):
+                break
+    except Exception as e:
+        print(f"Error fetching traces: {e}", file=sys.stderr)
+    finally:
+        # Stops pending slice fetches when returning early
+        if hasattr(pages, "close"):
+            pages.close()
 
-    except (TimeoutError, Exception) as e:
-        if "timeout" in str(e).lower() or isinstance(e, TimeoutError):
-            print(f"SDK timeout, falling back to HTTP: {e}", file=sys.stderr)
-            raw_traces = _fetch_traces_via_http(fetch_limit, start_time, end_time, tags)
-        else:
-            print(f"Error fetching traces: {e}", file=sys.stderr)
-            return []
+    return traces
 
-    if not raw_traces:
-        return []
 
-    # Process traces with filters
-    traces = []
-    for trace_dict in raw_traces:
-        # Filter by metadata field if specified (client-side filter)
-        if filter_field and filter_value:
-            metadata = trace_dict.get("metadata", {}) or {}
-            if str(metadata.get(filter_field)) != str(filter_value):
-                continue
+def _project(obs: Any, fields: List[str]) -> Dict:
+    """Shallow projection of an SDK object or dict; avoids deep-converting payloads."""
+    if isinstance(obs, dict):
+        return {field: obs.get(field) for field in fields}
+    return {field: getattr(obs, field, None) for field in fields}
 
-        # Filter by score if specified (client-side filter)
-        if min_score is not None or max_score is not None:
-            score_value = get_trace_score(trace_dict["id"], score_name)
-            if score_value is None:
-                continue  # Skip traces without the specified score
-            if min_score is not None and score_value < min_score:
-                continue
-            if max_score is not None and score_value > max_score:
-                continue
-            # Store score in trace dict for display
-            trace_dict["_filtered_score"] = {
-                "name": score_name,
-                "value": score_value
-            }
-
-        traces.append(trace_dict)
-        if len(traces) >= limit:
-            break
 
-    return traces
+def retrieve_observations_for_trace(trace_id: str, projection: Optional[str] = None) -> List[Dict]:
+    """
+    Fetch all observations for a single trace with timeout fallback.
 
+    Args:
+        trace_id: Trace ID
+        projection: Name of a FETCH_PROJECTIONS entry, or None for full observations.
+            Projected fetches use server-side field selection when the host supports
+            it (no input/output bytes transferred) and shallow conversion otherwise.
+    """
+    fields = FETCH_PROJECTIONS[projection] if projection else None
+
+    if fields:
+        projected = _fetch_observations_projected(trace_id)
+        if projected is not None:
+            projected = [_project(o, fields) for o in projected]
+            projected.sort(key=lambda x: x.get("start_time") or "")
+            return projected
 
-def retrieve_observations_for_trace(trace_id: str) -> List[Dict]:
-    """Fetch all observations for a single trace with timeout fallback."""
     client = get_langfuse_client()
 
     all_observations = []
     page = 1
-    use_http_fallback = False
 
     while True:
         try:
-            if use_http_fallback:
-                # Already switched to HTTP fallback
-                break
-
-            import signal
-
-            def timeout_handler(signum, frame):
-                raise TimeoutError("SDK operation timed out")
-
-            # Set timeout (Unix only)
-            try:
-                signal.signal(signal.SIGALRM, timeout_handler)
-                signal.alarm(SDK_TIMEOUT)
-            except (AttributeError, ValueError):
-                pass
-
-            response = client.api.observations.get_many(
+            response = call_with_retry(
+                client.api.observations.get_many,
                 trace_id=trace_id,
                 limit=100,
-                page=page
+                page=page,
+                retry_timeouts=False
             )
 
-            try:
-                signal.alarm(0)
-            except (AttributeError, ValueError):
-                pass
-
             if not hasattr(response, "data") or not response.data:
                 break
 
             for obs in response.data:
-                obs_dict = obs.dict() if hasattr(obs, "dict") else dict(obs)
+                if fields:
+                    obs_dict = _project(obs, fields)
+                else:
+                    obs_dict = obs.dict() if hasattr(obs, "dict") else dict(obs)
                 all_observations.append(obs_dict)
 
             if len(response.data) < 100:
                 break
             page += 1
 
-        except (TimeoutError, Exception) as e:
-            if "timeout" in str(e).lower() or isinstance(e, TimeoutError):
+        except Exception as e:
+            if is_timeout_error(e):
                 print(f"SDK timeout on observations, falling back to HTTP: {e}", file=sys.stderr)
                 all_observations = _fetch_observations_via_http(trace_id)
-                use_http_fallback = True
-                break
+                if fields:
+                    all_observations = [_project(o, fields) for o in all_observations]
             else:
                 print(f"Error fetching observations for {trace_id}: {e}", file=sys.stderr)
-                break
+            break
 
     # Sort by start_time for execution order
     all_observations.sort(key=lambda x: x.get("start_time") or "")
     return all_observations
 
 
+def iter_observations_for_traces(
+    traces: List[Dict],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    refresh: bool = False,
+    offline: bool = False,
+    projection: Optional[str] = None
+) -> Iterator[List[Dict]]:
+    """
+    Load observations for many traces, yielding one list per trace in input order.
+
+    Up to `concurrency` traces are fetched in parallel. Results are yielded as soon
+    as the next trace in order is ready, so output can start before the slowest
+    trace finishes. At most 2 * concurrency traces are in flight or waiting to be
+    yielded, so memory stays bounded on large pulls; closing the generator
+    cancels fetches not yet started. Reads go through the local cache (see
+    load_observations).
+    """
+    def load(trace):
+        return load_observations(trace, refresh=refresh, offline=offline, projection=projection)
+
+    if concurrency <= 1 or len(traces) <= 1:
+        for trace in traces:
+            yield load(trace)
+        return
+
+    executor = ThreadPoolExecutor(max_workers=min(concurrency, len(traces)))
+    pending = deque()
+    remaining = iter(traces)
+    try:
+        for trace in remaining:
+            pending.append(executor.submit(load, trace))
+            if len(pending) >= 2 * concurrency:
+                break
+        while pending:
+            observations = pending.popleft().result()
+            trace = next(remaining, None)
+            if trace is not None:
+                pending.append(executor.submit(load, trace))
+            yield observations
+            # Don't hold the yielded list while waiting for the next trace
+            del observations
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def tail_traces(
+    filter_field: Optional[str] = None,
+    filter_value: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    min_interval: float = DEFAULT_MIN_INTERVAL,
+    max_interval: float = DEFAULT_MAX_INTERVAL
+) -> Iterator[List[Dict]]:
+    """
+    Follow new traces, yielding each poll's new traces oldest first.
+
+    Polls the trace list from a moving high-water mark with adaptive
+    intervals and conditional requests (see live_tail.py), so an idle stream
+    costs one small request per interval instead of a full re-listing.
+    Metadata filters are applied client-side as in retrieve_last_traces.
+    """
+    params = {"tags": tags} if tags else {}
+    for records in tail_endpoint("/api/public/traces", "timestamp", params,
+                                 min_interval=min_interval, max_interval=max_interval):
+        traces = [_snake_case_keys(record) for record in records]
+        if filter_field and filter_value:
+            traces = [
+                trace for trace in traces
+                if str((trace.get("metadata") or {}).get(filter_field)) == str(filter_value)
+            ]
+        if traces:
+            yield traces
+
+
+# =============================================================================
+# LOCAL CACHE
+# =============================================================================
+
+def load_trace(trace_id: str, refresh: bool = False, offline: bool = False) -> Optional[Dict]:
+    """
+    Return a trace, reading through the local cache.
+
+    Args:
+        trace_id: Trace ID
+        refresh: Skip cached data and re-fetch from the API
+        offline: Never call the API (returns cached data even if not settled)
+    """
+    if offline:
+        return get_cached_trace(trace_id, allow_unsettled=True)
+    if not refresh:
+        cached = get_cached_trace(trace_id)
+        if cached is not None:
+            return cached
+
+    trace = retrieve_trace_by_id(trace_id)
+    if trace:
+        put_traces([trace])
+    return trace
+
+
+def load_observations(
+    trace: Dict,
+    refresh: bool = False,
+    offline: bool = False,
+    projection: Optional[str] = None
+) -> List[Dict]:
+    """
+    Return observations for a trace, reading through the local cache.
+
+    Args:
+        trace: Trace dict (its timestamp decides when observations are final)
+        refresh: Skip cached data and re-fetch from the API
+        offline: Never call the API (returns cached data even if not settled)
+        projection: FETCH_PROJECTIONS entry, or None for full observations.
+            Cached full observations satisfy any projection.
+    """
+    trace_id = trace.get("id")
+    if offline:
+        return get_cached_observations(trace_id, allow_unsettled=True, projection=projection) or []
+    if not refresh:
+        cached = get_cached_observations(trace_id, projection=projection)
+        if cached is not None:
+            return cached
+
+    observations = retrieve_observations_for_trace(trace_id, projection=projection)
+    # Empty results are not cached: they are indistinguishable from fetch errors
+    if observations:
+        put_observations(trace_id, observations, trace.get("timestamp"), projection=projection)
+    return observations
+
+
+def sync_traces(days: int, workers: int = DEFAULT_WORKERS) -> int:
+    """
+    Incrementally sync traces into the local cache.
+
+    Fetches only traces newer than the last high-water mark (minus the settle
+    window, so traces that were still running get refreshed), plus any part of
+    the requested `days` window older than what has been synced before. Each
+    window is listed in `workers` parallel time slices (fetch planner).
+
+    Returns:
+        Number of traces written to the cache
+    """
+    end_time = datetime.now(timezone.utc)
+    start_time = end_time - timedelta(days=days)
+
+    high_water = get_sync_mark("traces_high_water")
+    low_water = get_sync_mark("traces_low_water")
+
+    windows = []
+    if high_water and low_water:
+        high = datetime.fromisoformat(high_water) - timedelta(seconds=CACHE_SETTLE_SECONDS)
+        low = datetime.fromisoformat(low_water)
+        if start_time < low:
+            windows.append((start_time, low))
+        windows.append((max(high, start_time), end_time))
+    else:
+        windows.append((start_time, end_time))
+
+    synced = 0
+    for window_start, window_end in windows:
+        try:
+            for raw_traces in fetch_window(_trace_page_fetcher({}), window_start, window_end, workers, PAGE_SIZE):
+                put_traces(raw_traces)
+                synced += len(raw_traces)
+        except Exception as e:
+            # Leave watermarks untouched so the next sync retries this window
+            print(f"Sync incomplete ({e}); watermarks not advanced", file=sys.stderr)
+            return synced
+
+    set_sync_mark("traces_high_water", to_utc_iso(end_time))
+    if not low_water or to_utc_iso(start_time) < low_water:
+        set_sync_mark("traces_low_water", to_utc_iso(start_time))
+
+    return synced
+
+
+# =============================================================================
+# SPAN TREE ANALYSIS
+# =============================================================================
+
+def _to_epoch_ms(value: Any) -> Optional[float]:
+    """Convert a datetime or ISO string to epoch milliseconds."""
+    if not value:
+        return None
+    try:
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return value.timestamp() * 1000
+    except Exception:
+        return None
+
+
+def _union_length(intervals: List[tuple]) -> float:
+    """Total length covered by a list of (start, end) intervals."""
+    total = 0.0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+def analyze_span_tree(observations: List[Dict]) -> Dict[str, Any]:
+    """
+    Rebuild the span tree from parent_observation_id and compute latency attribution.
+
+    For every node: duration, child time (union of child intervals clipped to the
+    node, so parallel children are not double counted), self time (duration minus
+    child time) and parallel overlap (sum of child durations minus their union).
+
+    The critical path is found by walking backwards from each node's end: the
+    child that finishes last is on the path, then the last child finishing before
+    that one started, and so on. Each node's critical self time is the part of
+    its duration not covered by critical children.
+
+    Returns:
+        dict with "nodes" (id -> stats), "roots", "children" (id -> child ids in
+        start order), "critical_path" (ids in time order), "wall_clock_ms",
+        "untimed" (observations without start_time)
+    """
+    nodes = {}
+    untimed = 0
+    for obs in observations:
+        obs_id = obs.get("id")
+        start = _to_epoch_ms(obs.get("start_time"))
+        if obs_id is None or start is None:
+            untimed += 1
+            continue
+        end = _to_epoch_ms(obs.get("end_time"))
+        nodes[obs_id] = {
+            "obs": obs,
+            "start": start,
+            "end": max(end, start) if end is not None else start,
+        }
+
+    # Parent -> children index (O(n)); unknown parents become roots
+    children = {obs_id: [] for obs_id in nodes}
+    roots = []
+    for obs_id, node in nodes.items():
+        parent_id = node["obs"].get("parent_observation_id")
+        if parent_id in nodes and parent_id != obs_id:
+            children[parent_id].append(obs_id)
+        else:
+            roots.append(obs_id)
+    for kids in children.values():
+        kids.sort(key=lambda k: nodes[k]["start"])
+    roots.sort(key=lambda k: nodes[k]["start"])
+
+    for obs_id, node in nodes.items():
+        duration = node["end"] - node["start"]
+        clipped = [
+            (max(nodes[k]["start"], node["start"]), min(nodes[k]["end"], node["end"]))
+            for k in children[obs_id]
+        ]
+        clipped = [(a, b) for a, b in clipped if b > a]
+        child_time = _union_length(clipped)
+        node["duration_ms"] = duration
+        node["child_time_ms"] = child_time
+        node["self_time_ms"] = max(duration - child_time, 0.0)
+        node["overlap_ms"] = sum(b - a for a, b in clipped) - child_time
+
+    def critical_children(kid_ids: List[str], window_end: float) -> List[str]:
+        """Backward walk: last-finishing child, then last child ending before it started."""
+        chosen = []
+        t = window_end
+        for k in sorted(kid_ids, key=lambda k: nodes[k]["end"], reverse=True):
+            # Children still running when the chosen one started ran in parallel with it
+            if (nodes[k]["end"] <= t) if chosen else (nodes[k]["start"] <= t):
+                chosen.append(k)
+                t = nodes[k]["start"]
+        chosen.reverse()
+        return chosen
+
+    # Walk the critical path iteratively (deep agent trees can exceed recursion limits)
+    critical_path = []
+    if roots:
+        wall_end = max(nodes[r]["end"] for r in roots)
+        stack = list(reversed(critical_children(roots, wall_end)))
+        while stack:
+            obs_id = stack.pop()
+            node = nodes[obs_id]
+            critical_path.append(obs_id)
+            kids = critical_children(children[obs_id], node["end"])
+            covered = _union_length([
+                (max(nodes[k]["start"], node["start"]), min(nodes[k]["end"], node["end"])) for k in kids
+            ])
+            node["critical_self_ms"] = max(node["duration_ms"] - covered, 0.0)
+            stack.extend(reversed(kids))
+
+    critical_set = set(critical_path)
+    for obs_id, node in nodes.items():
+        node["on_critical_path"] = obs_id in critical_set
+
+    wall_clock = 0.0
+    if roots:
+        wall_clock = max(nodes[r]["end"] for r in roots) - min(nodes[r]["start"] for r in roots)
+
+    return {
+        "nodes": nodes,
+        "roots": roots,
+        "children": children,
+        "critical_path": critical_path,
+        "wall_clock_ms": wall_clock,
+        "untimed": untimed,
+    }
+
+
+def format_span_tree(observations: List[Dict], mode: str) -> str:
+    """Format the span tree (tree mode) or just the critical path (critical-path mode)."""
+    analysis = analyze_span_tree(observations)
+    nodes = analysis["nodes"]
+    critical_path = analysis["critical_path"]
+    wall_clock = analysis["wall_clock_ms"]
+    lines = []
+
+    critical_total = sum(nodes[k]["critical_self_ms"] for k in critical_path)
+    overlap_total = sum(n["overlap_ms"] for n in nodes.values())
+    lines.append(f"**Wall Clock:** {wall_clock:.0f}ms | "
+                 f"**Critical Path:** {len(critical_path)} spans | "
+                 f"**Parallel Overlap:** {overlap_total:.0f}ms")
+    if analysis["untimed"]:
+        lines.append(f"_{analysis['untimed']} observation(s) without timing omitted_")
+    lines.append("")
+
+    def label(obs_id):
+        node = nodes[obs_id]
+        obs = node["obs"]
+        type_icon = {"GENERATION": "🤖", "SPAN": "📦", "EVENT": "⚡"}.get(obs.get("type"), "•")
+        level = obs.get("level")
+        level_indicator = f" [{level}]" if level and level != "DEFAULT" else ""
+        parallel = f", ∥ {node['overlap_ms']:.0f}ms overlap" if node["overlap_ms"] > 0 else ""
+        return (f"{type_icon} **{obs.get('name', 'unnamed')}**{level_indicator} "
+                f"{node['duration_ms']:.0f}ms (self {node['self_time_ms']:.0f}ms{parallel})")
+
+    if mode == "tree":
+        lines.append(f"### Span Tree ({len(nodes)} spans, ★ = critical path)")
+        lines.append("")
+        # Iterative pre-order walk
+        stack = [(r, 0) for r in reversed(analysis["roots"])]
+        while stack:
+            obs_id, depth = stack.pop()
+            marker = "★ " if nodes[obs_id]["on_critical_path"] else ""
+            lines.append(f"{'  ' * depth}- {marker}{label(obs_id)}")
+            stack.extend((k, depth + 1) for k in reversed(analysis["children"][obs_id]))
+        lines.append("")
+    else:
+        lines.append(f"### Critical Path ({len(critical_path)} spans)")
+        lines.append("")
+        for i, obs_id in enumerate(critical_path, 1):
+            lines.append(f"{i}. {label(obs_id)}")
+        lines.append("")
+
+    # Spans dominating wall-clock latency
+    dominant = sorted(critical_path, key=lambda k: nodes[k]["critical_self_ms"], reverse=True)[:10]
+    if dominant and critical_total > 0:
+        lines.append("### Dominant Spans (critical-path self time)")
+        lines.append("")
+        lines.append("| Span | Type | Critical Self | Share | Duration |")
+        lines.append("|------|------|---------------|-------|----------|")
+        for obs_id in dominant:
+            node = nodes[obs_id]
+            share = node["critical_self_ms"] / wall_clock * 100 if wall_clock else 0
+            lines.append(f"| {node['obs'].get('name', 'unnamed')} | {node['obs'].get('type', '-')} | "
+                         f"{node['critical_self_ms']:.0f}ms | {share:.1f}% | {node['duration_ms']:.0f}ms |")
+        lines.append("")
+
+    return "\n".join(lines)
+
+
+# =============================================================================
+# LATENCY AGGREGATION
+# =============================================================================
+
+AGGREGATIONS = ["latency"]
+
+
+def aggregate_latency(traces: List[Dict], observation_lists: Iterator[List[Dict]]) -> Dict[str, Any]:
+    """
+    Profile node latency across many traces.
+
+    Observations are grouped by (name, type). Each group keeps a count, max,
+    total and self time, and a quantile sketch of durations, so memory stays
+    bounded by the number of distinct nodes rather than observations.
+
+    Returns:
+        dict with "groups" (list sorted by total self time), "traces",
+        "observations", "wall_clock" (sketch of trace wall-clock times) and
+        "total_self_ms"
+    """
+    groups = {}
+    wall_clock = new_sketch()
+    trace_count = 0
+    observation_count = 0
+
+    for trace, observations in zip(traces, observation_lists):
+        trace_count += 1
+        analysis = analyze_span_tree(observations)
+        if analysis["nodes"]:
+            sketch_add(wall_clock, analysis["wall_clock_ms"])
+        for node in analysis["nodes"].values():
+            obs = node["obs"]
+            key = (obs.get("name") or "unnamed", obs.get("type") or "-")
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = {
+                    "name": key[0],
+                    "type": key[1],
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "self_ms": 0.0,
+                    "max_ms": 0.0,
+                    "sketch": new_sketch(),
+                }
+            duration = node["duration_ms"]
+            group["count"] += 1
+            group["total_ms"] += duration
+            group["self_ms"] += node["self_time_ms"]
+            group["max_ms"] = max(group["max_ms"], duration)
+            sketch_add(group["sketch"], duration)
+            observation_count += 1
+
+    total_self = sum(g["self_ms"] for g in groups.values())
+    for group in groups.values():
+        sketch = group.pop("sketch")
+        group["p50_ms"] = sketch_quantile(sketch, 0.50)
+        group["p90_ms"] = sketch_quantile(sketch, 0.90)
+        group["p99_ms"] = sketch_quantile(sketch, 0.99)
+        group["self_share"] = group["self_ms"] / total_self if total_self else 0.0
+
+    return {
+        "groups": sorted(groups.values(), key=lambda g: g["self_ms"], reverse=True),
+        "traces": trace_count,
+        "observations": observation_count,
+        "wall_clock": {
+            "p50_ms": sketch_quantile(wall_clock, 0.50),
+            "p90_ms": sketch_quantile(wall_clock, 0.90),
+            "p99_ms": sketch_quantile(wall_clock, 0.99),
+        },
+        "total_self_ms": total_self,
+    }
+
+
+def format_latency_aggregate(result: Dict[str, Any]) -> str:
+    """Format a latency profile as markdown."""
+    def ms(value):
+        return f"{value:.0f}ms" if value is not None else "-"
+
+    wall = result["wall_clock"]
+    lines = ["# Latency Profile", ""]
+    lines.append(f"**Traces:** {result['traces']} | **Observations:** {result['observations']}")
+    lines.append(f"**Trace Wall Clock:** p50 {ms(wall['p50_ms'])} | p90 {ms(wall['p90_ms'])} | p99 {ms(wall['p99_ms'])}")
+    lines.append("")
+    lines.append("Sorted by self time (time not covered by child spans) - the top rows are the hot spots.")
+    lines.append("")
+    lines.append("| Node | Type | Count | p50 | p90 | p99 | Max | Self Share |")
+    lines.append("|------|------|-------|-----|-----|-----|-----|------------|")
+    for g in result["groups"]:
+        lines.append(f"| {g['name']} | {g['type']} | {g['count']} | {ms(g['p50_ms'])} | {ms(g['p90_ms'])} | "
+                     f"{ms(g['p99_ms'])} | {ms(g['max_ms'])} | {g['self_share'] * 100:.1f}% |")
+    return "\n".join(lines)
+
+
 # =============================================================================
 # OUTPUT FORMATTING
 # =============================================================================
@@ -461,6 +1132,24 @@ def compute_latency_ms(obs: Dict) -> Optional[int]:
         return None
 
 
+def compute_total_duration_ms(observations: List[Dict]) -> Optional[int]:
+    """Calculate wall-clock duration from the first observation start to the last end."""
+    start_times = [o.get("start_time") for o in observations if o.get("start_time")]
+    end_times = [o.get("end_time") for o in observations if o.get("end_time")]
+    if not start_times or not end_times:
+        return None
+    try:
+        first = min(start_times)
+        last = max(end_times)
+        if isinstance(first, str):
+            first = datetime.fromisoformat(first.replace("Z", "+00:00"))
+        if isinstance(last, str):
+            last = datetime.fromisoformat(last.replace("Z", "+00:00"))
+        return int((last - first).total_seconds() * 1000)
+    except Exception:
+        return None
+
+
 def format_observation_io(obs: Dict, config: Dict) -> str:
     """Format a single observation for io/prompts mode."""
     lines = []
@@ -569,20 +1258,9 @@ def format_trace(trace: Dict, observations: List[Dict], mode: str) -> str:
 
     if config.get("include_latency") and observations:
         # Calculate total latency from first to last observation
-        start_times = [o.get("start_time") for o in observations if o.get("start_time")]
-        end_times = [o.get("end_time") for o in observations if o.get("end_time")]
-        if start_times and end_times:
-            try:
-                first = min(start_times)
-                last = max(end_times)
-                if isinstance(first, str):
-                    first = datetime.fromisoformat(first.replace("Z", "+00:00"))
-                if isinstance(last, str):
-                    last = datetime.fromisoformat(last.replace("Z", "+00:00"))
-                total_ms = int((last - first).total_seconds() * 1000)
-                lines.append(f"**Total Duration:** {total_ms}ms")
-            except Exception:
-                pass
+        total_ms = compute_total_duration_ms(observations)
+        if total_ms is not None:
+            lines.append(f"**Total Duration:** {total_ms}ms")
 
     lines.append("")
     lines.append("---")
@@ -605,6 +1283,10 @@ def format_trace(trace: Dict, observations: List[Dict], mode: str) -> str:
         lines.append("_No matching observations_")
         return "\n".join(lines)
 
+    if config.get("analyze_tree"):
+        lines.append(format_span_tree(observations, mode))
+        return "\n".join(lines)
+
     lines.append(f"### Observations ({len(observations)})")
     lines.append("")
 
@@ -619,10 +1301,150 @@ def format_trace(trace: Dict, observations: List[Dict], mode: str) -> str:
     return "\n".join(lines)
 
 
+# =============================================================================
+# STRUCTURED OUTPUT (NDJSON / JSON)
+# =============================================================================
+
+OUTPUT_FORMATS = ["markdown", "ndjson", "json"]
+
+
+def trace_to_record(trace: Dict, observations: List[Dict], mode: str) -> Dict[str, Any]:
+    """
+    Build a JSON-serializable record for a trace, projected per MODE_CONFIGS.
+
+    Trace fields follow `trace_fields`, observation fields follow
+    `observation_fields` (None means all fields), and `observation_filter`
+    is applied. Latencies are added when the mode includes them.
+    """
+    config = MODE_CONFIGS[mode]
+
+    record = {field: trace.get(field) for field in config["trace_fields"]}
+    filtered_score = trace.get("_filtered_score")
+    if filtered_score:
+        record["score"] = filtered_score
+
+    if config.get("include_latency") and observations:
+        record["total_duration_ms"] = compute_total_duration_ms(observations)
+
+    if not config.get("include_observations"):
+        return record
+
+    obs_filter = config.get("observation_filter")
+    fields = config.get("observation_fields")
+
+    projected = []
+    for obs in observations:
+        if obs_filter and not obs_filter(obs):
+            continue
+        item = {"id": obs.get("id")}
+        item.update(obs if fields is None else {field: obs.get(field) for field in fields})
+        if config.get("include_latency"):
+            item["latency_ms"] = compute_latency_ms(obs)
+        projected.append(item)
+
+    if config.get("analyze_tree"):
+        analysis = analyze_span_tree(observations)
+        for item in projected:
+            node = analysis["nodes"].get(item["id"])
+            if node:
+                item["duration_ms"] = node["duration_ms"]
+                item["self_time_ms"] = node["self_time_ms"]
+                item["child_time_ms"] = node["child_time_ms"]
+                item["overlap_ms"] = node["overlap_ms"]
+                item["on_critical_path"] = node["on_critical_path"]
+                if node["on_critical_path"]:
+                    item["critical_self_ms"] = node["critical_self_ms"]
+        record["critical_path"] = analysis["critical_path"]
+        record["wall_clock_ms"] = analysis["wall_clock_ms"]
+
+    record["observations"] = projected
+    return record
+
+
+def write_records(records: Iterator[Dict[str, Any]], output_format: str, flatten: bool = False) -> None:
+    """
+    Stream trace records to stdout as NDJSON or a JSON array.
+
+    Each record is written and flushed as soon as it is produced, so memory
+    stays constant and consumers (jq, pandas, ETL) can read incrementally.
+
+    Args:
+        records: Trace records from trace_to_record()
+        output_format: "ndjson" or "json"
+        flatten: Emit observations as separate records (tagged with "record")
+                 instead of nesting them under their trace
+    """
+    def expand(record):
+        if not flatten:
+            return [record]
+        observations = record.pop("observations", None) or []
+        rows = [{"record": "trace", **record}]
+        rows.extend({"record": "observation", "trace_id": record.get("id"), **obs} for obs in observations)
+        return rows
+
+    first = True
+    if output_format == "json":
+        sys.stdout.write("[")
+
+    for record in records:
+        for row in expand(record):
+            line = json.dumps(row, default=json_default, ensure_ascii=False)
+            if output_format == "json":
+                sys.stdout.write(("\n" if first else ",\n") + line)
+            else:
+                sys.stdout.write(line + "\n")
+            first = False
+        sys.stdout.flush()
+        # Release the written record before the next trace is loaded
+        record = row = line = None
+
+    if output_format == "json":
+        sys.stdout.write("\n]\n" if not first else "]\n")
+        sys.stdout.flush()
+
+
 # =============================================================================
 # MAIN
 # =============================================================================
 
+def follow_traces(args: argparse.Namespace) -> None:
+    """Print new traces as they arrive (--tail), in the requested mode and format."""
+    include_observations = MODE_CONFIGS[args.mode].get("include_observations")
+
+    if args.format == "markdown":
+        print("# Langfuse Traces (live)")
+        print(f"**Mode:** {args.mode} - {MODE_CONFIGS[args.mode]['description']}")
+        print(f"**Following:** new traces, polling every {args.poll_interval:g}-{args.max_poll_interval:g}s "
+              "(Ctrl-C to stop)")
+        print("")
+        print("=" * 60)
+        print("", flush=True)
+
+    for traces in tail_traces(args.filter_field, args.filter_value, args.tags,
+                              args.poll_interval, args.max_poll_interval):
+        if include_observations:
+            observation_lists = iter_observations_for_traces(
+                traces, args.concurrency, refresh=args.refresh,
+                projection=MODE_CONFIGS[args.mode].get("fetch_fields")
+            )
+        else:
+            observation_lists = ([] for _ in traces)
+
+        if args.format != "markdown":
+            write_records(
+                (trace_to_record(trace, observations, args.mode)
+                 for trace, observations in zip(traces, observation_lists)),
+                args.format, flatten=args.flatten
+            )
+            continue
+
+        for trace, observations in zip(traces, observation_lists):
+            print(format_trace(trace, observations, args.mode), flush=True)
+            print("")
+            print("=" * 60)
+            print("", flush=True)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Surgical Langfuse trace retrieval with output modes",
@@ -633,6 +1455,8 @@ Output Modes:
   io        Core debugging - node inputs/outputs and tool calls (DEFAULT)
   prompts   LLM prompts and responses only
   flow      Execution flow with timing per node
+  tree      Span tree with self-time, child-time and critical path
+  critical-path  Critical path and spans dominating wall-clock latency
   full      Everything - for deep investigation
 
 Score Filtering:
@@ -650,6 +1474,12 @@ Examples:
   %(prog)s --last 5 --filter-field project_id --filter-value myproject --mode flow
   %(prog)s --last 20 --filter-field environment --filter-value production --max-score 7.0 --mode minimal
   %(prog)s --last 10 --min-score 9.0 --mode minimal
+  %(prog)s --last 100 --max-score 7.0 --mode io --concurrency 16
+  %(prog)s --last 20 --sync --mode flow
+  %(prog)s --last 50 --mode flow --format ndjson | jq .total_duration_ms
+  %(prog)s --last 20 --offline --filter-field environment --filter-value production
+  %(prog)s --last 500 --aggregate latency --filter-field environment --filter-value production
+  %(prog)s --tail --mode minimal --filter-field environment --filter-value production
         """
     )
 
@@ -665,6 +1495,23 @@ Examples:
         default=1,
         help="Retrieve last N traces (default: 1)"
     )
+    retrieval.add_argument(
+        "--tail",
+        action="store_true",
+        help="Follow new traces as they arrive until interrupted"
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=DEFAULT_MIN_INTERVAL,
+        help=f"With --tail, shortest poll interval in seconds (default: {DEFAULT_MIN_INTERVAL:g})"
+    )
+    parser.add_argument(
+        "--max-poll-interval",
+        type=float,
+        default=DEFAULT_MAX_INTERVAL,
+        help=f"With --tail, longest poll interval while idle (default: {DEFAULT_MAX_INTERVAL:g})"
+    )
 
     # Filters
     parser.add_argument(
@@ -704,6 +1551,44 @@ Examples:
         help="Score name to filter by (default: quality_score)"
     )
 
+    # Concurrency
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Fetch observations for up to N traces in parallel (default: {DEFAULT_CONCURRENCY})"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"List traces and scores in N parallel time slices (default: {DEFAULT_WORKERS})"
+    )
+
+    # Local cache
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="Sync new traces into the local cache, then list --last N from the cache"
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore cached traces/observations and re-fetch them from the API"
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Serve everything from the local cache without any API calls"
+    )
+
+    # Aggregation
+    parser.add_argument(
+        "--aggregate",
+        choices=AGGREGATIONS,
+        help="Aggregate across all retrieved traces instead of printing them (latency: per-node percentiles)"
+    )
+
     # Output mode
     parser.add_argument(
         "--mode",
@@ -712,16 +1597,45 @@ Examples:
         help="Output mode (default: io)"
     )
 
+    # Output format
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="markdown",
+        help="Output format (default: markdown). ndjson streams one record per trace"
+    )
+    parser.add_argument(
+        "--flatten",
+        action="store_true",
+        help="With ndjson/json, emit observations as separate records instead of nesting them"
+    )
+
     args = parser.parse_args()
 
+    if args.offline and (args.min_score is not None or args.max_score is not None):
+        parser.error("--min-score/--max-score need the scores API and cannot be used with --offline")
+    if args.tail:
+        if args.min_score is not None or args.max_score is not None:
+            parser.error("--tail cannot filter by score (scores usually arrive after their trace)")
+        if args.sync or args.offline or args.aggregate or args.format == "json":
+            parser.error("--tail cannot be combined with --sync, --offline, --aggregate or --format json")
+        try:
+            follow_traces(args)
+        except KeyboardInterrupt:
+            print("Stopped tailing", file=sys.stderr)
+        return
+
     # Retrieve traces
     if args.trace_id:
-        trace = retrieve_trace_by_id(args.trace_id)
+        trace = load_trace(args.trace_id, refresh=args.refresh, offline=args.offline)
         if not trace:
             print(f"Trace not found: {args.trace_id}", file=sys.stderr)
             sys.exit(1)
         traces = [trace]
     else:
+        if args.sync:
+            synced = sync_traces(args.days, args.workers)
+            print(f"Synced {synced} trace(s) into local cache", file=sys.stderr)
         traces = retrieve_last_traces(
             limit=args.last,
             filter_field=args.filter_field,
@@ -730,12 +1644,44 @@ Examples:
             days=args.days,
             min_score=args.min_score,
             max_score=args.max_score,
-            score_name=args.score_name
+            score_name=args.score_name,
+            from_cache=args.sync or args.offline,
+            workers=args.workers
         )
         if not traces:
             print("No traces found matching criteria", file=sys.stderr)
             sys.exit(1)
 
+    # Fleet-wide latency profile: only timing fields are needed
+    if args.aggregate == "latency":
+        observation_lists = iter_observations_for_traces(
+            traces, args.concurrency, refresh=args.refresh, offline=args.offline, projection="timing"
+        )
+        result = aggregate_latency(traces, observation_lists)
+        if args.format == "markdown":
+            print(format_latency_aggregate(result))
+        else:
+            write_records(iter(result["groups"]), args.format)
+        return
+
+    # Fetch observations if needed (in parallel, yielded in trace order)
+    if MODE_CONFIGS[args.mode].get("include_observations"):
+        observation_lists = iter_observations_for_traces(
+            traces, args.concurrency, refresh=args.refresh, offline=args.offline,
+            projection=MODE_CONFIGS[args.mode].get("fetch_fields")
+        )
+    else:
+        observation_lists = ([] for _ in traces)
+
+    # Structured output: stream one record per trace as soon as it is loaded
+    if args.format != "markdown":
+        records = (
+            trace_to_record(trace, observations, args.mode)
+            for trace, observations in zip(traces, observation_lists)
+        )
+        write_records(records, args.format, flatten=args.flatten)
+        return
+
     # Output header
     mode_desc = MODE_CONFIGS[args.mode]["description"]
     print(f"# Langfuse Traces")
@@ -755,22 +1701,12 @@ Examples:
     print("")
 
     # Format and output each trace
-    for trace in traces:
-        trace_id = trace.get("id")
-
-        # Fetch observations if needed
-        if MODE_CONFIGS[args.mode].get("include_observations"):
-            observations = retrieve_observations_for_trace(trace_id)
-        else:
-            observations = []
-
-        # Format and print
+    for trace, observations in zip(traces, observation_lists):
         output = format_trace(trace, observations, args.mode)
-        print(output)
+        print(output, flush=True)
         print("")
         print("=" * 60)
         print("")
 
-
 if __name__ == "__main__":
     main()
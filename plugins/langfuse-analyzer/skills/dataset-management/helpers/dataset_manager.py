@@ -28,7 +28,7 @@ from typing import Any, Dict, List, Optional
 
 # Add parent directory to path for langfuse_client import
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "data-retrieval" / "helpers"))
-from langfuse_client import get_langfuse_client
+from langfuse_client import call_with_retry, get_langfuse_client
 
 
 # =============================================================================
@@ -83,7 +83,7 @@ def get_trace_input(trace_id: str) -> Optional[Dict[str, Any]]:
     client = get_langfuse_client()
 
     try:
-        trace = client.api.trace.get(trace_id)
+        trace = call_with_retry(client.api.trace.get, trace_id)
         if not trace:
             return None
 
@@ -111,7 +111,7 @@ def get_trace_score(trace_id: str, score_name: str = "quality_score") -> Optiona
     """Get a specific score value for a trace."""
     client = get_langfuse_client()
     try:
-        response = client.api.scores.get_many(trace_id=trace_id)
+        response = call_with_retry(client.api.scores.get_many, trace_id=trace_id)
         if hasattr(response, "data") and response.data:
             for score in response.data:
                 score_dict = score.dict() if hasattr(score, "dict") else dict(score)
@@ -249,7 +249,7 @@ def list_datasets() -> List[Dict[str, Any]]:
 
     while True:
         try:
-            response = client.api.datasets.list(limit=50, page=page)
+            response = call_with_retry(client.api.datasets.list, limit=50, page=page)
             if not hasattr(response, "data") or not response.data:
                 break
 
@@ -279,7 +279,7 @@ def get_dataset_items(name: str) -> Dict[str, Any]:
     client = get_langfuse_client()
 
     try:
-        dataset = client.get_dataset(name)
+        dataset = call_with_retry(client.get_dataset, name)
         if not dataset:
             return {"error": f"Dataset '{name}' not found"}
 
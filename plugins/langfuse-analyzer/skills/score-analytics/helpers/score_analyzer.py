@@ -11,20 +11,57 @@ USAGE:
     python score_analyzer.py compare --score-name "accuracy" --dimension release --days 7
     python score_analyzer.py regression --score-name "accuracy" --baseline-days 14 --current-days 7
     python score_analyzer.py distribution --score-name "accuracy" --days 30 --bins 10
+    python score_analyzer.py rollup-sync --score-name "accuracy" --days 30
+    python score_analyzer.py trend --score-name "accuracy" --days 30 --rollup
+    python score_analyzer.py regression-scan --baseline-days 14 --current-days 7 --dimension release
+    python score_analyzer.py detect-changes --score-name "accuracy" --granularity hour
+    python score_analyzer.py correlate --score-names "latency_ms" "quality" "topic" --days 7
+    python score_analyzer.py report --score-name "accuracy" --days 7 --dimension release --format json
+
+SCORE FETCHING:
+    Every command fetches the complete time window (no silent truncation) with
+    the shared fetch planner: --workers N fetches N time slices in parallel
+    (default: 4), bisecting slices that hold more than one page.
+
+REPORT:
+    report fetches the union of its windows once into a columnar buffer and
+    computes summary, trend, distribution, regression (and compare with
+    --dimension) from it, instead of one fetch per command.
+
+ROLLUPS:
+    trend/regression --rollup read pre-aggregated hourly buckets from the local
+    rollup store (score_rollups.py), first syncing only hours after the last sync.
 """
 
 import argparse
 import json
+import math
 import sys
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Iterator, Tuple
 from collections import defaultdict
 
 # Add parent directories to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "data-retrieval" / "helpers"))
-from langfuse_client import get_langfuse_client
-
+from fetch_planner import DEFAULT_WORKERS, fetch_window
+from langfuse_client import call_with_retry, get_langfuse_client
+from streaming_stats import (
+    accumulate, category_matrix, category_table, category_total, chi_square_test, count_category, histogram,
+    merge_accumulators, new_accumulator, new_category_counts, new_change_detector,
+    summarize, update_change_detector
+)
+from score_rollups import (
+    get_detector_state, get_rollup_range, query_buckets, query_change_events, replace_buckets,
+    reset_detector, save_detector_run, set_rollup_range
+)
+
+
+# Maximum page size accepted by the scores API
+SCORE_PAGE_SIZE = 100
 
 def get_time_range(days: int) -> tuple:
     """Get ISO formatted time range for the last N days."""
@@ -36,23 +73,227 @@ def get_time_range(days: int) -> tuple:
     )
 
 
-def list_scores(days: int) -> List[Dict[str, Any]]:
-    """List all unique score names in the project."""
+# =============================================================================
+# SCORE FETCHING
+# =============================================================================
+
+def _parse_time(value: Any) -> datetime:
+    """Parse an ISO string (or pass through a datetime) as an aware UTC datetime."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _format_time(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _compact_scores(scores: List[Any]) -> List[Tuple[Optional[datetime], Optional[str], float]]:
+    """Reduce SDK score objects to (timestamp, trace_id, value) for numeric values only."""
+    rows = []
+    for score in scores:
+        value = getattr(score, "value", None)
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            continue
+        ts = getattr(score, "timestamp", None)
+        rows.append((_parse_time(ts) if ts else None, getattr(score, "trace_id", None), value))
+    return rows
+
+
+def category_label(score: Any) -> Optional[str]:
+    """
+    Category of a score: its string value, "True"/"False" for boolean scores
+    without one, otherwise the formatted numeric value.
+    """
+    string_value = getattr(score, "string_value", None)
+    if string_value not in (None, ""):
+        return str(string_value)
+    value = getattr(score, "value", None)
+    if value is None:
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return str(value)
+    if getattr(score, "data_type", None) == "BOOLEAN":
+        return "True" if value else "False"
+    return f"{value:g}"
+
+
+def _compact_categories(scores: List[Any]) -> List[Tuple[Optional[datetime], Optional[str], str]]:
+    """Reduce SDK score objects to (timestamp, trace_id, category label)."""
+    rows = []
+    for score in scores:
+        label = category_label(score)
+        if label is None:
+            continue
+        ts = getattr(score, "timestamp", None)
+        rows.append((_parse_time(ts) if ts else None, getattr(score, "trace_id", None), label))
+    return rows
+
+
+def _compact_mixed(scores: List[Any]) -> List[Tuple[Optional[datetime], Optional[str], Any]]:
+    """Like _compact_scores, keeping CATEGORICAL and non-numeric scores as category labels."""
+    rows = []
+    for score in scores:
+        if getattr(score, "data_type", None) == "CATEGORICAL":
+            rows.extend(_compact_categories([score]))
+            continue
+        numeric = _compact_scores([score])
+        rows.extend(numeric or _compact_categories([score]))
+    return rows
+
+
+# Data types analyzed as category frequencies instead of numeric statistics
+CATEGORICAL_TYPES = ("CATEGORICAL", "BOOLEAN")
+
+# Category columns shown in trend/compare tables (the rest is folded into "other")
+MAX_CATEGORY_COLUMNS = 6
+
+# Categorical regression: chi-square significance and minimum share shift
+# (total variation distance) to flag
+CATEGORY_ALPHA = 0.05
+CATEGORY_MIN_SHIFT = 0.05
+
+
+def get_score_data_type(score_name: str, from_time: str, to_time: str) -> Optional[str]:
+    """Data type (NUMERIC, CATEGORICAL, BOOLEAN) of the first score of a name in a window."""
     client = get_langfuse_client()
+    response = call_with_retry(
+        client.api.scores.get_many,
+        name=score_name, from_timestamp=from_time, to_timestamp=to_time, limit=1, page=1
+    )
+    for score in getattr(response, "data", None) or []:
+        data_type = getattr(score, "data_type", None)
+        return str(getattr(data_type, "value", data_type)).upper() if data_type else "NUMERIC"
+    return None
+
+
+def _page_with_total(response: Any) -> Tuple[List[Any], Optional[int]]:
+    """(items, total item count) of a list response, for fetch_window."""
+    return list(getattr(response, "data", None) or []), getattr(getattr(response, "meta", None), "total_items", None)
+
+
+def _score_page_fetcher(score_name: Optional[str] = None) -> Callable[[datetime, datetime, int], Tuple]:
+    """Page fetcher for fetch_window over scores (optionally of one name)."""
+    client = get_langfuse_client()
+    params = {"limit": SCORE_PAGE_SIZE}
+    if score_name:
+        params["name"] = score_name
+
+    def fetch_page(start: datetime, end: datetime, page: int) -> Tuple[List[Any], Optional[int]]:
+        return _page_with_total(call_with_retry(
+            client.api.scores.get_many,
+            from_timestamp=_format_time(start), to_timestamp=_format_time(end), page=page, **params
+        ))
+
+    return fetch_page
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _row_time(row: Tuple) -> datetime:
+    return row[0] or _EPOCH
+
+
+def iter_scores(
+    score_name: str,
+    from_time: str,
+    to_time: str,
+    workers: int = DEFAULT_WORKERS,
+    compact: Callable[[List[Any]], List[Tuple]] = _compact_scores
+) -> Iterator[Tuple[Optional[datetime], Optional[str], Any]]:
+    """
+    Stream every numeric score of a name in a time window, oldest first.
+
+    The window is fetched by the shared fetch planner (fetch_planner.py):
+    time slices are fetched in parallel and slices holding a full page are
+    bisected, so nothing is truncated. Only compact tuples are kept, never
+    the SDK response objects.
+
+    Args:
+        score_name: Score name
+        from_time: Window start (ISO string)
+        to_time: Window end (ISO string)
+        workers: Number of time slices fetched in parallel
+        compact: Row reducer; _compact_categories yields category labels
+            instead, _compact_mixed both
+
+    Yields:
+        tuple: (timestamp, trace_id, value)
+
+    Raises:
+        Exception: If any page cannot be fetched after retries
+    """
+    for rows in fetch_window(_score_page_fetcher(score_name), _parse_time(from_time), _parse_time(to_time),
+                             workers, SCORE_PAGE_SIZE, transform=compact, sort_key=_row_time):
+        yield from rows
+
+
+def accumulate_scores(
+    score_name: str,
+    from_time: str,
+    to_time: str,
+    workers: int = DEFAULT_WORKERS,
+    group_key: Optional[Callable[[Optional[datetime], Optional[str]], Any]] = None,
+    categorical: bool = False
+) -> Dict[Any, Dict[str, Any]]:
+    """
+    Summarize every numeric score of a name in one streaming pass.
+
+    Scores are folded into accumulators as slices arrive from iter_scores, so
+    neither raw values nor SDK objects are kept in memory. With categorical,
+    scores are counted per category label (dictionary-encoded category
+    counts) instead.
+
+    Args:
+        score_name: Score name
+        from_time: Window start (ISO string)
+        to_time: Window end (ISO string)
+        workers: Number of time slices fetched in parallel
+        group_key: Optional fn(timestamp, trace_id) -> group; scores mapped
+            to None are skipped. Without it everything lands in group None.
+        categorical: Count category labels of any score data type
+
+    Returns:
+        dict: group -> accumulator, or group -> category counts with
+        categorical (see streaming_stats)
+
+    Raises:
+        Exception: If any page cannot be fetched after retries
+    """
+    if categorical:
+        compact, new, add = _compact_categories, new_category_counts, count_category
+    else:
+        compact, new, add = _compact_scores, new_accumulator, accumulate
+
+    groups = {}
+    for ts, trace_id, value in iter_scores(score_name, from_time, to_time, workers, compact):
+        key = group_key(ts, trace_id) if group_key else None
+        if group_key and key is None:
+            continue
+        acc = groups.get(key)
+        if acc is None:
+            acc = groups[key] = new()
+        add(acc, value)
+    return groups
+
+
+def list_scores(days: int, workers: int = DEFAULT_WORKERS) -> List[Dict[str, Any]]:
+    """List all unique score names in the project."""
     from_time, to_time = get_time_range(days)
 
     try:
-        # Fetch scores and extract unique names
-        scores = client.api.scores.get_many(
-            from_timestamp=from_time,
-            to_timestamp=to_time,
-            limit=1000
-        )
-
+        # Fetch all scores and extract unique names
         score_counts = defaultdict(lambda: {"count": 0, "types": set()})
 
-        if hasattr(scores, 'data'):
-            for score in scores.data:
+        for page in fetch_window(_score_page_fetcher(), from_time, to_time, workers, SCORE_PAGE_SIZE):
+            for score in page:
                 name = score.name
                 score_counts[name]["count"] += 1
                 if hasattr(score, 'data_type') and score.data_type:
@@ -72,183 +313,434 @@ def list_scores(days: int) -> List[Dict[str, Any]]:
         return []
 
 
-def get_score_summary(score_name: str, days: int) -> Dict[str, Any]:
-    """Get aggregate statistics for a score."""
-    client = get_langfuse_client()
-    from_time, to_time = get_time_range(days)
+def _category_view(score_name: str, days: int, data_type: str, counts: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Frequency table of categorical/boolean scores (summary and distribution)."""
+    if not counts or not category_total(counts):
+        return {"error": f"No scores found for '{score_name}'"}
+    return {
+        "score_name": score_name,
+        "days": days,
+        "data_type": data_type,
+        "count": category_total(counts),
+        "categories": category_table(counts)
+    }
 
-    try:
-        # Fetch all scores with the given name
-        scores = client.api.scores.get_many(
-            name=score_name,
-            from_timestamp=from_time,
-            to_timestamp=to_time,
-            limit=10000
-        )
 
-        values = []
-        if hasattr(scores, 'data'):
-            for score in scores.data:
-                if hasattr(score, 'value') and score.value is not None:
-                    values.append(float(score.value))
+def _summary_view(score_name: str, days: int, data_type: Optional[str], acc: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Summary result from an accumulator (category counts for categorical data types)."""
+    if data_type in CATEGORICAL_TYPES:
+        return _category_view(score_name, days, data_type, acc)
 
-        if not values:
-            return {"error": f"No numeric scores found for '{score_name}'"}
+    if not acc or not acc["count"]:
+        return {"error": f"No numeric scores found for '{score_name}'"}
 
-        values.sort()
-        n = len(values)
+    stats = summarize(acc, quantiles=(0.5, 0.95))
 
-        return {
-            "score_name": score_name,
-            "days": days,
-            "count": n,
-            "mean": sum(values) / n,
-            "min": values[0],
-            "max": values[-1],
-            "p50": values[n // 2],
-            "p95": values[int(n * 0.95)] if n > 1 else values[0],
-            "std_dev": (sum((x - sum(values)/n)**2 for x in values) / n) ** 0.5
-        }
-    except Exception as e:
-        print(f"Error getting score summary: {e}", file=sys.stderr)
-        return {"error": str(e)}
+    return {
+        "score_name": score_name,
+        "days": days,
+        "count": stats["count"],
+        "mean": stats["mean"],
+        "min": stats["min"],
+        "max": stats["max"],
+        "p50": stats["p50"],
+        "p95": stats["p95"],
+        "std_dev": stats["std_dev"]
+    }
 
 
-def get_score_trend(score_name: str, days: int, granularity: str) -> List[Dict[str, Any]]:
-    """Get score values over time with specified granularity."""
-    client = get_langfuse_client()
+def get_score_summary(score_name: str, days: int, workers: int = DEFAULT_WORKERS) -> Dict[str, Any]:
+    """Get aggregate statistics for a score."""
     from_time, to_time = get_time_range(days)
 
     try:
-        # Fetch all scores with the given name
-        scores = client.api.scores.get_many(
-            name=score_name,
-            from_timestamp=from_time,
-            to_timestamp=to_time,
-            limit=10000
-        )
+        data_type = get_score_data_type(score_name, from_time, to_time)
 
-        # Group by time bucket
-        buckets = defaultdict(list)
-
-        if hasattr(scores, 'data'):
-            for score in scores.data:
-                if hasattr(score, 'value') and score.value is not None:
-                    # Parse timestamp
-                    ts = score.timestamp if hasattr(score, 'timestamp') else None
-                    if ts:
-                        if isinstance(ts, str):
-                            ts = datetime.fromisoformat(ts.replace('Z', '+00:00'))
-
-                        # Create bucket key based on granularity
-                        if granularity == "hour":
-                            key = ts.strftime("%Y-%m-%d %H:00")
-                        elif granularity == "day":
-                            key = ts.strftime("%Y-%m-%d")
-                        elif granularity == "week":
-                            # Get start of week
-                            week_start = ts - timedelta(days=ts.weekday())
-                            key = week_start.strftime("%Y-%m-%d")
-                        elif granularity == "month":
-                            key = ts.strftime("%Y-%m")
-                        else:
-                            key = ts.strftime("%Y-%m-%d")
-
-                        buckets[key].append(float(score.value))
+        # Single streaming pass over all scores with the given name
+        acc = accumulate_scores(score_name, from_time, to_time, workers,
+                                categorical=data_type in CATEGORICAL_TYPES).get(None)
+        return _summary_view(score_name, days, data_type, acc)
+    except Exception as e:
+        print(f"Error getting score summary: {e}", file=sys.stderr)
+        return {"error": str(e)}
 
-        # Calculate stats for each bucket
-        result = []
-        for key in sorted(buckets.keys()):
-            values = buckets[key]
+
+def period_key(ts: datetime, granularity: str) -> str:
+    """Bucket key of a timestamp for a trend granularity (hour, day, week, month)."""
+    if granularity == "hour":
+        return ts.strftime("%Y-%m-%d %H:00")
+    elif granularity == "day":
+        return ts.strftime("%Y-%m-%d")
+    elif granularity == "week":
+        # Get start of week
+        week_start = ts - timedelta(days=ts.weekday())
+        return week_start.strftime("%Y-%m-%d")
+    elif granularity == "month":
+        return ts.strftime("%Y-%m")
+    return ts.strftime("%Y-%m-%d")
+
+
+def _trend_rows(buckets: Dict[str, Dict[str, Any]], categorical: bool = False) -> List[Dict[str, Any]]:
+    """Trend rows from period -> accumulator (or category counts), oldest first."""
+    result = []
+    for key in sorted(buckets.keys()):
+        acc = buckets[key]
+        if categorical:
+            total = category_total(acc)
             result.append({
                 "period": key,
-                "count": len(values),
-                "mean": sum(values) / len(values),
-                "min": min(values),
-                "max": max(values)
+                "count": total,
+                "shares": {label: count / total for label, count in zip(acc["labels"], acc["counts"])}
             })
+            continue
+        result.append({
+            "period": key,
+            "count": acc["count"],
+            "mean": acc["mean"],
+            "min": acc["min"],
+            "max": acc["max"]
+        })
+    return result
+
+
+def get_score_trend(
+    score_name: str,
+    days: int,
+    granularity: str,
+    workers: int = DEFAULT_WORKERS,
+    use_rollup: bool = False,
+    dimension: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Get score values over time with specified granularity.
+
+    With use_rollup, reads merged hourly buckets from the rollup store (after an
+    incremental sync) instead of re-downloading raw scores; only then can the
+    trend be split by a dimension.
+
+    Categorical and boolean scores yield the share of each category per period
+    instead of mean/min/max (rollups hold numeric scores only).
+    """
+    from_time, to_time = get_time_range(days)
 
-        return result
+    # Create bucket key based on granularity
+    def bucket_key(ts: Optional[datetime], _trace_id: Optional[str]) -> Optional[str]:
+        return period_key(ts, granularity) if ts else None
+
+    try:
+        if get_score_data_type(score_name, from_time, to_time) in CATEGORICAL_TYPES:
+            if use_rollup:
+                raise ValueError("rollups hold numeric scores only; drop --rollup for categorical scores")
+            buckets = accumulate_scores(score_name, from_time, to_time, workers, group_key=bucket_key,
+                                        categorical=True)
+            return _trend_rows(buckets, categorical=True)
+
+        if use_rollup:
+            sync_rollup(score_name, days, dimension or "", workers)
+            now = datetime.now(timezone.utc)
+            buckets = read_rollup(score_name, now - timedelta(days=days), now, granularity, dimension or "")
+            result = []
+            for (dim_value, key) in sorted(buckets.keys(), key=lambda k: (k[1], k[0])):
+                acc = buckets[(dim_value, key)]
+                row = {
+                    "period": key,
+                    "count": acc["count"],
+                    "mean": acc["mean"],
+                    "min": acc["min"],
+                    "max": acc["max"]
+                }
+                if dimension:
+                    row["dimension_value"] = dim_value
+                result.append(row)
+            return result
+
+        buckets = accumulate_scores(score_name, from_time, to_time, workers, group_key=bucket_key)
+
+        # Calculate stats for each bucket
+        return _trend_rows(buckets)
     except Exception as e:
         print(f"Error getting score trend: {e}", file=sys.stderr)
         return []
 
 
-def compare_by_dimension(score_name: str, dimension: str, days: int) -> Dict[str, Any]:
-    """Compare scores across a dimension (release, environment, name)."""
+# =============================================================================
+# TRACE METADATA JOIN
+# =============================================================================
+
+# Built-in dimensions; anything else is looked up as a trace metadata key
+BUILTIN_DIMENSIONS = ["release", "environment", "name", "user", "tags", "version", "session"]
+
+# Scores are usually written after their trace starts; list traces this far
+# before the score window so the bulk join finds them
+TRACE_LOOKBACK = timedelta(hours=24)
+
+# Parallel trace.get lookups for traces the bulk listing did not cover
+FALLBACK_CONCURRENCY = 8
+
+
+def _trace_dimensions(trace: Any) -> Dict[str, Any]:
+    """Reduce a trace to the fields used as comparison dimensions."""
+    metadata = getattr(trace, "metadata", None) or {}
+    if not isinstance(metadata, dict):
+        metadata = {}
+    return {
+        "release": getattr(trace, "release", None),
+        "environment": metadata.get("environment") or getattr(trace, "environment", None),
+        "name": getattr(trace, "name", None),
+        "user": getattr(trace, "user_id", None),
+        "tags": list(getattr(trace, "tags", None) or []),
+        "version": getattr(trace, "version", None),
+        "session": getattr(trace, "session_id", None),
+        "metadata": metadata,
+    }
+
+
+def dimension_values(info: Dict[str, Any], dimension: str) -> List[str]:
+    """
+    Values of a dimension for one trace.
+
+    Tags yield one value per tag (a score counts under each of its trace's
+    tags). Unknown dimensions are read from trace metadata; "metadata.key"
+    forces a metadata lookup for keys that shadow a built-in dimension.
+    """
+    if dimension.startswith("metadata."):
+        value = info["metadata"].get(dimension[len("metadata."):])
+    elif dimension == "tags":
+        return info["tags"] or ["(no tags)"]
+    elif dimension in BUILTIN_DIMENSIONS:
+        value = info[dimension]
+    else:
+        value = info["metadata"].get(dimension)
+
+    if value is None or value == "":
+        return ["unknown"]
+    if isinstance(value, (dict, list)):
+        return [json.dumps(value, sort_keys=True)]
+    return [str(value)]
+
+
+def _trace_page_fetcher() -> Callable[[datetime, datetime, int], Tuple]:
+    """Page fetcher for fetch_window over trace.list."""
     client = get_langfuse_client()
-    from_time, to_time = get_time_range(days)
+
+    def fetch_page(start: datetime, end: datetime, page: int) -> Tuple[List[Any], Optional[int]]:
+        return _page_with_total(call_with_retry(
+            client.api.trace.list, from_timestamp=start, to_timestamp=end, limit=SCORE_PAGE_SIZE, page=page
+        ))
+
+    return fetch_page
+
+
+def build_trace_index(
+    trace_ids: set,
+    from_time: str,
+    to_time: str,
+    workers: int = DEFAULT_WORKERS
+) -> Tuple[Dict[str, Dict[str, Any]], List[Dict[str, str]]]:
+    """
+    Join trace metadata for a set of trace IDs in bulk.
+
+    Lists traces over the score window (plus TRACE_LOOKBACK) with the fetch
+    planner, then fetches any trace IDs still missing with concurrent
+    trace.get calls.
+
+    Args:
+        trace_ids: Trace IDs to resolve
+        from_time: Score window start (ISO string)
+        to_time: Score window end (ISO string)
+        workers: Number of time slices listed in parallel
+
+    Returns:
+        tuple: (trace_id -> dimensions, list of {"trace_id", "error"} for
+        traces that could not be resolved)
+    """
+    index = {}
+    errors = []
+    if not trace_ids:
+        return index, errors
+
+    def keep_wanted(traces: List[Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        return [(trace.id, _trace_dimensions(trace)) for trace in traces if trace.id in trace_ids]
 
     try:
-        # Fetch scores
-        scores = client.api.scores.get_many(
-            name=score_name,
-            from_timestamp=from_time,
-            to_timestamp=to_time,
-            limit=10000
-        )
+        for rows in fetch_window(_trace_page_fetcher(), _parse_time(from_time) - TRACE_LOOKBACK,
+                                 _parse_time(to_time), workers, SCORE_PAGE_SIZE, transform=keep_wanted):
+            index.update(rows)
+    except Exception as e:
+        # Traces not listed yet are picked up by the fallback below
+        print(f"Warning: bulk trace listing failed: {e}", file=sys.stderr)
+
+    stragglers = [trace_id for trace_id in trace_ids if trace_id not in index]
+    if stragglers:
+        client = get_langfuse_client()
+
+        def lookup(trace_id: str) -> Tuple[str, Any]:
+            try:
+                return trace_id, _trace_dimensions(call_with_retry(client.api.trace.get, trace_id))
+            except Exception as e:
+                return trace_id, e
+
+        with ThreadPoolExecutor(max_workers=FALLBACK_CONCURRENCY) as executor:
+            for trace_id, result in executor.map(lookup, stragglers):
+                if isinstance(result, Exception):
+                    errors.append({"trace_id": trace_id, "error": str(result)})
+                else:
+                    index[trace_id] = result
+
+    return index, errors
+
+
+def _comparison_view(
+    score_name: str,
+    dimension: str,
+    days: int,
+    data_type: Optional[str],
+    scored: List[Tuple[Optional[str], Any]],
+    trace_index: Dict[str, Dict[str, Any]],
+    join_errors: List[Dict[str, str]]
+) -> Dict[str, Any]:
+    """Group (trace_id, value) pairs by the dimension values of their traces and summarize each group."""
+    categorical = data_type in CATEGORICAL_TYPES
+    new, add = (new_category_counts, count_category) if categorical else (new_accumulator, accumulate)
+
+    dimension_accumulators = defaultdict(new)
+    unmatched = 0
+    for trace_id, value in scored:
+        info = trace_index.get(trace_id)
+        if info is None:
+            unmatched += 1
+            continue
+        for dim_value in dimension_values(info, dimension):
+            add(dimension_accumulators[dim_value], value)
+
+    # Calculate stats for each dimension value
+    result = {
+        "score_name": score_name,
+        "dimension": dimension,
+        "days": days,
+        "breakdown": {},
+        "unmatched_scores": unmatched,
+        "join_errors": join_errors
+    }
+
+    if categorical:
+        result["data_type"] = data_type
+        for dim_value, counts in sorted(dimension_accumulators.items()):
+            result["breakdown"][dim_value] = {"count": category_total(counts), "categories": category_table(counts)}
+        _, table = category_matrix(list(dimension_accumulators.values()))
+        result["chi_square"] = chi_square_test(table)
+        return result
 
-        # We need to get trace info for each score to get the dimension
-        trace_cache = {}
-        dimension_values = defaultdict(list)
-
-        if hasattr(scores, 'data'):
-            for score in scores.data:
-                if hasattr(score, 'value') and score.value is not None:
-                    trace_id = score.trace_id
-
-                    # Get trace info if not cached
-                    if trace_id not in trace_cache:
-                        try:
-                            trace = client.api.trace.get(trace_id)
-                            trace_cache[trace_id] = trace
-                        except:
-                            trace_cache[trace_id] = None
-
-                    trace = trace_cache[trace_id]
-                    if trace:
-                        # Get dimension value
-                        if dimension == "release":
-                            dim_value = getattr(trace, 'release', None) or "unknown"
-                        elif dimension == "environment":
-                            metadata = getattr(trace, 'metadata', {}) or {}
-                            dim_value = metadata.get('environment', 'unknown')
-                        elif dimension == "name":
-                            dim_value = getattr(trace, 'name', None) or "unknown"
-                        else:
-                            dim_value = "unknown"
-
-                        dimension_values[dim_value].append(float(score.value))
-
-        # Calculate stats for each dimension value
-        result = {
-            "score_name": score_name,
-            "dimension": dimension,
-            "days": days,
-            "breakdown": {}
+    for dim_value, acc in sorted(dimension_accumulators.items()):
+        stats = summarize(acc, quantiles=(0.5,))
+        result["breakdown"][dim_value] = {
+            "count": stats["count"],
+            "mean": stats["mean"],
+            "min": stats["min"],
+            "max": stats["max"],
+            "p50": stats["p50"]
         }
 
-        for dim_value, values in sorted(dimension_values.items()):
-            values.sort()
-            n = len(values)
-            result["breakdown"][dim_value] = {
-                "count": n,
-                "mean": sum(values) / n,
-                "min": values[0],
-                "max": values[-1],
-                "p50": values[n // 2]
-            }
+    return result
 
-        return result
+
+def compare_by_dimension(score_name: str, dimension: str, days: int, workers: int = DEFAULT_WORKERS) -> Dict[str, Any]:
+    """
+    Compare scores across a dimension.
+
+    Dimensions: release, environment, name, user, tags, version, session, or
+    any trace metadata key (optionally prefixed with "metadata.").
+
+    Categorical and boolean scores get category shares per dimension value
+    and a chi-square test of independence between dimension and category.
+    """
+    from_time, to_time = get_time_range(days)
+
+    try:
+        data_type = get_score_data_type(score_name, from_time, to_time)
+        compact = _compact_categories if data_type in CATEGORICAL_TYPES else _compact_scores
+
+        # Collect compact (trace_id, value) pairs, then join trace metadata in bulk
+        scored = [(trace_id, value) for _, trace_id, value in iter_scores(score_name, from_time, to_time, workers, compact)]
+        trace_ids = {trace_id for trace_id, _ in scored if trace_id}
+        trace_index, join_errors = build_trace_index(trace_ids, from_time, to_time, workers)
+
+        return _comparison_view(score_name, dimension, days, data_type, scored, trace_index, join_errors)
     except Exception as e:
         print(f"Error comparing scores: {e}", file=sys.stderr)
         return {"error": str(e)}
 
 
-def detect_regression(score_name: str, baseline_days: int, current_days: int) -> Dict[str, Any]:
-    """Compare scores between baseline and current periods."""
-    client = get_langfuse_client()
+def _period_label(start: datetime, end: datetime) -> str:
+    return f"{start.strftime('%Y-%m-%d')} to {end.strftime('%Y-%m-%d')}"
+
+
+def _regression_view(
+    score_name: str,
+    data_type: Optional[str],
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    baseline_period: Dict[str, Any],
+    current_period: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Regression result from baseline/current accumulators (category counts for
+    categorical data types). The periods are {"period": label, "days": N}.
+    """
+    if data_type in CATEGORICAL_TYPES:
+        if not category_total(baseline):
+            return {"error": "No baseline data found"}
+        if not category_total(current):
+            return {"error": "No current data found"}
 
+        result = categorical_regression(baseline, current, higher_is_better="True" if data_type == "BOOLEAN" else None)
+        result["score_name"] = score_name
+        result["data_type"] = data_type
+        result["baseline"].update(baseline_period)
+        result["current"].update(current_period)
+        return result
+
+    if not baseline["count"]:
+        return {"error": "No baseline data found"}
+    if not current["count"]:
+        return {"error": "No current data found"}
+
+    baseline_mean = baseline["mean"]
+    current_mean = current["mean"]
+
+    delta = current_mean - baseline_mean
+    pct_change = (delta / baseline_mean * 100) if baseline_mean != 0 else 0
+
+    # Determine if this is a regression (assuming higher is better)
+    is_regression = delta < 0 and abs(pct_change) > 5  # 5% threshold
+
+    return {
+        "score_name": score_name,
+        "baseline": dict(baseline_period, count=baseline["count"], mean=baseline_mean),
+        "current": dict(current_period, count=current["count"], mean=current_mean),
+        "delta": delta,
+        "pct_change": pct_change,
+        "is_regression": is_regression,
+        "severity": "high" if abs(pct_change) > 20 else "medium" if abs(pct_change) > 10 else "low"
+    }
+
+
+def detect_regression(
+    score_name: str,
+    baseline_days: int,
+    current_days: int,
+    workers: int = DEFAULT_WORKERS,
+    use_rollup: bool = False
+) -> Dict[str, Any]:
+    """
+    Compare scores between baseline and current periods.
+
+    With use_rollup, both periods are read from hourly rollup buckets, so
+    period boundaries are aligned to the hour.
+
+    Categorical and boolean scores are compared with a chi-square test on
+    category counts (see categorical_regression).
+    """
     now = datetime.now(timezone.utc)
 
     # Current period: last current_days
@@ -259,142 +751,1125 @@ def detect_regression(score_name: str, baseline_days: int, current_days: int) ->
     baseline_end = current_start
     baseline_start = baseline_end - timedelta(days=baseline_days)
 
+    if use_rollup:
+        # Both periods share one hour boundary so no hourly bucket lands in both
+        current_start = baseline_end = _hour_floor(current_start)
+        baseline_start = _hour_floor(baseline_start)
+
+    baseline_period = {"period": _period_label(baseline_start, baseline_end), "days": baseline_days}
+    current_period = {"period": _period_label(current_start, current_end), "days": current_days}
+
     try:
-        # Fetch baseline scores
-        baseline_scores = client.api.scores.get_many(
-            name=score_name,
-            from_timestamp=baseline_start.strftime("%Y-%m-%dT%H:%M:%SZ"),
-            to_timestamp=baseline_end.strftime("%Y-%m-%dT%H:%M:%SZ"),
-            limit=10000
-        )
+        data_type = get_score_data_type(score_name, _format_time(baseline_start), _format_time(current_end))
+        categorical = data_type in CATEGORICAL_TYPES
+        if categorical and use_rollup:
+            raise ValueError("rollups hold numeric scores only; drop --rollup for categorical scores")
+
+        # Summarize baseline and current scores in one streaming pass each
+        empty = new_category_counts() if categorical else new_accumulator()
+        if use_rollup:
+            sync_rollup(score_name, baseline_days + current_days, "", workers)
+            baseline = read_rollup(score_name, baseline_start, baseline_end).get(("", None), empty)
+            current = read_rollup(score_name, current_start, current_end).get(("", None), empty)
+        else:
+            baseline = accumulate_scores(
+                score_name, _format_time(baseline_start), _format_time(baseline_end), workers, categorical=categorical
+            ).get(None, empty)
+            current = accumulate_scores(
+                score_name, _format_time(current_start), _format_time(current_end), workers, categorical=categorical
+            ).get(None, empty)
+
+        return _regression_view(score_name, data_type, baseline, current, baseline_period, current_period)
+    except Exception as e:
+        print(f"Error detecting regression: {e}", file=sys.stderr)
+        return {"error": str(e)}
 
-        # Fetch current scores
-        current_scores = client.api.scores.get_many(
-            name=score_name,
-            from_timestamp=current_start.strftime("%Y-%m-%dT%H:%M:%SZ"),
-            to_timestamp=current_end.strftime("%Y-%m-%dT%H:%M:%SZ"),
-            limit=10000
-        )
 
-        # Extract values
-        baseline_values = []
-        if hasattr(baseline_scores, 'data'):
-            for score in baseline_scores.data:
-                if hasattr(score, 'value') and score.value is not None:
-                    baseline_values.append(float(score.value))
+def categorical_regression(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    higher_is_better: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Compare category counts of two periods.
+
+    A shift is flagged when the chi-square test is significant
+    (CATEGORY_ALPHA) and the total variation distance between the share
+    distributions is at least CATEGORY_MIN_SHIFT. With higher_is_better (e.g.
+    "True" for boolean scores) only a drop of that category's share is a
+    regression; otherwise any flagged shift is.
+
+    Returns:
+        dict: per-period counts, "shifts" per category (largest first),
+        chi2/dof/p_value, total_variation, is_regression and severity
+    """
+    labels, (baseline_row, current_row) = category_matrix([baseline, current])
+    baseline_total, current_total = sum(baseline_row), sum(current_row)
+    test = chi_square_test([baseline_row, current_row])
+
+    shifts = []
+    for label, b, c in zip(labels, baseline_row, current_row):
+        baseline_share, current_share = b / baseline_total, c / current_total
+        shifts.append({
+            "value": label,
+            "baseline_count": b,
+            "current_count": c,
+            "baseline_share": baseline_share,
+            "current_share": current_share,
+            "delta": current_share - baseline_share
+        })
+    shifts.sort(key=lambda shift: -abs(shift["delta"]))
+    total_variation = sum(abs(shift["delta"]) for shift in shifts) / 2
+
+    shifted = test["p_value"] is not None and test["p_value"] < CATEGORY_ALPHA and total_variation >= CATEGORY_MIN_SHIFT
+    if higher_is_better is not None:
+        good = next((shift for shift in shifts if shift["value"] == higher_is_better), None)
+        is_regression = shifted and good is not None and good["delta"] < 0
+    else:
+        is_regression = shifted
+
+    return {
+        "baseline": {"count": baseline_total},
+        "current": {"count": current_total},
+        "shifts": shifts,
+        "chi2": test["chi2"],
+        "dof": test["dof"],
+        "p_value": test["p_value"],
+        "total_variation": total_variation,
+        "is_regression": is_regression,
+        "severity": "high" if total_variation > 0.2 else "medium" if total_variation > 0.1 else "low"
+    }
+
+
+def _distribution_view(
+    score_name: str,
+    days: int,
+    data_type: Optional[str],
+    acc: Optional[Dict[str, Any]],
+    bins: int
+) -> Dict[str, Any]:
+    """Histogram result from an accumulator (category counts for categorical data types)."""
+    if data_type in CATEGORICAL_TYPES:
+        return _category_view(score_name, days, data_type, acc)
+
+    if not acc or not acc["count"]:
+        return {"error": f"No numeric scores found for '{score_name}'"}
+
+    min_val = acc["min"]
+    max_val = acc["max"]
+
+    # Handle edge case where all values are the same
+    if min_val == max_val:
+        return {
+            "score_name": score_name,
+            "days": days,
+            "count": acc["count"],
+            "min": min_val,
+            "max": max_val,
+            "bins": [{"range": f"{min_val:.2f}", "count": acc["count"], "pct": 100.0}]
+        }
 
-        current_values = []
-        if hasattr(current_scores, 'data'):
-            for score in current_scores.data:
-                if hasattr(score, 'value') and score.value is not None:
-                    current_values.append(float(score.value))
+    # Format bins for output
+    bin_data = []
+    for b in histogram(acc, bins):
+        pct = b["count"] / acc["count"] * 100
+        bin_data.append({
+            "range": f"{b['start']:.2f}-{b['end']:.2f}",
+            "count": b["count"],
+            "pct": round(pct, 1)
+        })
+
+    return {
+        "score_name": score_name,
+        "days": days,
+        "count": acc["count"],
+        "min": min_val,
+        "max": max_val,
+        "bins": bin_data
+    }
+
+
+def get_distribution(score_name: str, days: int, bins: int, workers: int = DEFAULT_WORKERS) -> Dict[str, Any]:
+    """Get score value distribution."""
+    from_time, to_time = get_time_range(days)
 
-        if not baseline_values:
-            return {"error": "No baseline data found"}
-        if not current_values:
-            return {"error": "No current data found"}
+    try:
+        data_type = get_score_data_type(score_name, from_time, to_time)
 
-        baseline_mean = sum(baseline_values) / len(baseline_values)
-        current_mean = sum(current_values) / len(current_values)
+        # Single streaming pass: min, max and histogram from one accumulator
+        acc = accumulate_scores(score_name, from_time, to_time, workers,
+                                categorical=data_type in CATEGORICAL_TYPES).get(None)
+        return _distribution_view(score_name, days, data_type, acc, bins)
+    except Exception as e:
+        print(f"Error getting distribution: {e}", file=sys.stderr)
+        return {"error": str(e)}
+
+
+# =============================================================================
+# SCORE ROLLUPS
+# =============================================================================
+
+# Re-aggregate this much before the last sync so late-arriving scores land in
+# their hour bucket
+ROLLUP_SETTLE = timedelta(hours=2)
+
+
+def _hour_floor(ts: datetime) -> datetime:
+    return ts.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
 
-        delta = current_mean - baseline_mean
-        pct_change = (delta / baseline_mean * 100) if baseline_mean != 0 else 0
 
-        # Determine if this is a regression (assuming higher is better)
-        is_regression = delta < 0 and abs(pct_change) > 5  # 5% threshold
+def _aggregate_hours(
+    score_name: str,
+    start: datetime,
+    end: datetime,
+    dimension: str,
+    workers: int
+) -> Dict[Tuple[str, datetime], Dict[str, Any]]:
+    """Aggregate raw scores in [start, end) into (dim_value, hour) accumulators."""
+    def hour_key(ts: Optional[datetime], _trace_id: Optional[str]) -> Optional[datetime]:
+        return _hour_floor(ts) if ts else None
 
+    if not dimension:
+        groups = accumulate_scores(score_name, _format_time(start), _format_time(end), workers, group_key=hour_key)
+        return {("", hour): acc for hour, acc in groups.items()}
+
+    scored = [row for row in iter_scores(score_name, _format_time(start), _format_time(end), workers) if row[0]]
+    trace_index, join_errors = build_trace_index(
+        {trace_id for _, trace_id, _ in scored if trace_id}, _format_time(start), _format_time(end), workers
+    )
+    if join_errors:
+        print(f"Warning: {len(join_errors)} trace(s) could not be loaded; their scores are not in the rollup",
+              file=sys.stderr)
+
+    buckets = {}
+    for ts, trace_id, value in scored:
+        info = trace_index.get(trace_id)
+        if info is None:
+            continue
+        for dim_value in dimension_values(info, dimension):
+            key = (dim_value, _hour_floor(ts))
+            if key not in buckets:
+                buckets[key] = new_accumulator()
+            accumulate(buckets[key], value)
+    return buckets
+
+
+def sync_rollup(score_name: str, days: int, dimension: str = "", workers: int = DEFAULT_WORKERS) -> Dict[str, Any]:
+    """
+    Bring the hourly rollup for a score (and optional dimension) up to date.
+
+    Only hours after the last sync (minus ROLLUP_SETTLE) are re-aggregated,
+    plus any older hours needed to cover the last `days` days. Re-aggregated
+    hours replace their stored buckets, so syncing is idempotent.
+
+    Returns:
+        dict: score_name, dimension, synced windows and bucket count written
+    """
+    now = datetime.now(timezone.utc)
+    want_from = _hour_floor(now - timedelta(days=days))
+    synced_from, synced_to = get_rollup_range(score_name, dimension)
+
+    if synced_to is None:
+        windows = [(want_from, now)]
+        new_from = want_from
+    else:
+        windows = []
+        if want_from < synced_from:
+            windows.append((want_from, synced_from))
+        windows.append((_hour_floor(synced_to - ROLLUP_SETTLE), now))
+        new_from = min(want_from, synced_from)
+
+    written = 0
+    for start, end in windows:
+        buckets = _aggregate_hours(score_name, start, end, dimension, workers)
+        replace_buckets(score_name, dimension, start, end, buckets)
+        written += len(buckets)
+    set_rollup_range(score_name, dimension, new_from, now)
+
+    return {
+        "score_name": score_name,
+        "dimension": dimension,
+        "windows": [(_format_time(a), _format_time(b)) for a, b in windows],
+        "buckets": written
+    }
+
+
+def read_rollup(
+    score_name: str,
+    from_time: datetime,
+    to_time: datetime,
+    granularity: Optional[str] = None,
+    dimension: str = ""
+) -> Dict[Tuple[str, Optional[str]], Dict[str, Any]]:
+    """
+    Merge stored hourly buckets into coarser periods.
+
+    Args:
+        score_name: Score name
+        from_time: Window start (rounded down to the hour)
+        to_time: Window end (exclusive)
+        granularity: hour/day/week/month, or None for one bucket per dimension value
+        dimension: Dimension the rollup was synced with ("" for overall)
+
+    Returns:
+        dict: (dim_value, period key or None) -> accumulator
+    """
+    merged = {}
+    for dim_value, hour, acc in query_buckets(score_name, dimension, _hour_floor(from_time), to_time):
+        key = (dim_value, period_key(hour, granularity) if granularity else None)
+        if key in merged:
+            merge_accumulators(merged[key], acc)
+        else:
+            merged[key] = acc
+    return merged
+
+
+# =============================================================================
+# CHANGE DETECTION
+# =============================================================================
+
+_PERIOD_FORMATS = {"hour": "%Y-%m-%d %H:00", "day": "%Y-%m-%d", "week": "%Y-%m-%d", "month": "%Y-%m"}
+
+
+def _period_start(key: str, granularity: str) -> datetime:
+    """Inverse of period_key: start of the period a key names."""
+    return datetime.strptime(key, _PERIOD_FORMATS[granularity]).replace(tzinfo=timezone.utc)
+
+
+def detect_changes(
+    score_name: str,
+    granularity: str = "hour",
+    days: int = 14,
+    workers: int = DEFAULT_WORKERS,
+    reset: bool = False,
+    min_count: int = 5,
+    detector_params: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Run change-point and anomaly detection over the bucketed score series.
+
+    Syncs the hourly rollup, then feeds only completed periods newer than the
+    last processed one into the persisted detector (O(1) work per period).
+    The first run warms up on the last `days` days.
+
+    Args:
+        score_name: Score name
+        granularity: Period size (hour, day, week, month)
+        days: History used on the first run (and rollup coverage)
+        workers: Parallel time slices for the rollup sync
+        reset: Discard detector state and events and start over
+        min_count: Periods with fewer scores are skipped as too noisy
+        detector_params: new_change_detector() arguments (only applied when
+            a detector is created)
+
+    Returns:
+        dict: processed period count, new events, recent events and the
+        current baseline
+    """
+    try:
+        if reset:
+            reset_detector(score_name, granularity)
+        last_period, state = get_detector_state(score_name, granularity)
+        if state is None:
+            state = new_change_detector(**(detector_params or {}))
+
+        sync_rollup(score_name, days, "", workers)
+
+        now = datetime.now(timezone.utc)
+        read_from = now - timedelta(days=days)
+        if last_period:
+            read_from = max(read_from, _period_start(last_period, granularity))
+        current_period = period_key(now, granularity)
+        periods = read_rollup(score_name, read_from, now, granularity)
+
+        processed = 0
+        skipped = 0
+        new_events = []
+        for _, key in sorted(periods.keys(), key=lambda k: k[1]):
+            # Only completed periods, each exactly once
+            if key >= current_period or (last_period and key <= last_period):
+                continue
+            acc = periods[("", key)]
+            last_period = key
+            if acc["count"] < min_count:
+                skipped += 1
+                continue
+            for signal in update_change_detector(state, acc["mean"]):
+                signal["period"] = key
+                signal["count"] = acc["count"]
+                new_events.append(signal)
+            processed += 1
+
+        save_detector_run(score_name, granularity, last_period, state, new_events)
+
+        warmup = state["params"]["warmup"]
         return {
             "score_name": score_name,
+            "granularity": granularity,
+            "processed": processed,
+            "skipped": skipped,
+            "last_period": last_period,
+            "new_events": new_events,
+            "recent_events": query_change_events(score_name, granularity),
             "baseline": {
-                "period": f"{baseline_start.strftime('%Y-%m-%d')} to {baseline_end.strftime('%Y-%m-%d')}",
-                "days": baseline_days,
-                "count": len(baseline_values),
-                "mean": baseline_mean
-            },
-            "current": {
-                "period": f"{current_start.strftime('%Y-%m-%d')} to {current_end.strftime('%Y-%m-%d')}",
-                "days": current_days,
-                "count": len(current_values),
-                "mean": current_mean
-            },
-            "delta": delta,
-            "pct_change": pct_change,
-            "is_regression": is_regression,
-            "severity": "high" if abs(pct_change) > 20 else "medium" if abs(pct_change) > 10 else "low"
+                "mean": state["mean"] if state["n"] else None,
+                "std_dev": state["var"] ** 0.5 if state["n"] > 1 else None,
+                "warming_up": state["n"] <= warmup,
+                "periods_seen": state["n"],
+                "cusum_up": state["cusum_pos"],
+                "cusum_down": state["cusum_neg"],
+                "threshold": state["params"]["threshold"],
+            }
         }
     except Exception as e:
-        print(f"Error detecting regression: {e}", file=sys.stderr)
+        print(f"Error detecting changes: {e}", file=sys.stderr)
         return {"error": str(e)}
 
 
-def get_distribution(score_name: str, days: int, bins: int) -> Dict[str, Any]:
-    """Get score value distribution."""
-    client = get_langfuse_client()
-    from_time, to_time = get_time_range(days)
+# =============================================================================
+# REGRESSION SCAN
+# =============================================================================
 
+# Resamples for bootstrap confidence intervals
+BOOTSTRAP_RESAMPLES = 2000
+
+# Upper bound on resample matrix cells held in memory at once (numpy path)
+_BOOTSTRAP_CHUNK_CELLS = 5_000_000
+
+
+def _import_numpy():
+    """Import numpy lazily; without it the scan falls back to analytic intervals."""
     try:
-        # Fetch all scores with the given name
-        scores = client.api.scores.get_many(
-            name=score_name,
-            from_timestamp=from_time,
-            to_timestamp=to_time,
-            limit=10000
-        )
+        import numpy
+        return numpy
+    except ImportError:
+        return None
+
+
+def _compact_named_scores(scores: List[Any]) -> List[Tuple[str, Optional[datetime], Optional[str], float]]:
+    """Like _compact_scores, keeping the score name: (name, timestamp, trace_id, value)."""
+    rows = []
+    for score in scores:
+        for ts, trace_id, value in _compact_scores([score]):
+            rows.append((getattr(score, "name", None), ts, trace_id, value))
+    return rows
+
+
+def fetch_windowed_scores(
+    from_time: datetime,
+    split_time: datetime,
+    to_time: datetime,
+    score_names: Optional[List[str]] = None,
+    workers: int = DEFAULT_WORKERS
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch all scores across a baseline and current window in one sweep.
+
+    Fetches [from_time, to_time) once for all score names (fetch planner) and
+    splits values at split_time. Values are kept as compact
+    float arrays because rank tests and resampling need them.
+
+    Returns:
+        dict: score name -> {"baseline": array, "current": array,
+        "baseline_traces": list, "current_traces": list}
+    """
+    wanted = set(score_names) if score_names else None
+
+    def compact(page: List[Any]) -> List[Tuple]:
+        return [row for row in _compact_named_scores(page) if row[1] and (wanted is None or row[0] in wanted)]
+
+    groups = {}
+    for rows in fetch_window(_score_page_fetcher(), from_time, to_time, workers, SCORE_PAGE_SIZE, transform=compact):
+        for name, ts, trace_id, value in rows:
+            group = groups.get(name)
+            if group is None:
+                group = groups[name] = {"baseline": array("d"), "current": array("d"),
+                                        "baseline_traces": [], "current_traces": []}
+            period = "current" if ts >= split_time else "baseline"
+            group[period].append(value)
+            group[f"{period}_traces"].append(trace_id)
+    return groups
+
+
+def _mean_var(values) -> Tuple[float, float]:
+    acc = new_accumulator()
+    for value in values:
+        accumulate(acc, value)
+    n = acc["count"]
+    return acc["mean"], (acc["m2"] / (n - 1) if n > 1 else 0.0)
+
+
+def cohens_d(baseline, current) -> Optional[float]:
+    """Cohen's d of current vs baseline (pooled standard deviation)."""
+    n1, n2 = len(baseline), len(current)
+    if n1 < 2 or n2 < 2:
+        return None
+    m1, v1 = _mean_var(baseline)
+    m2, v2 = _mean_var(current)
+    pooled = math.sqrt(((n1 - 1) * v1 + (n2 - 1) * v2) / (n1 + n2 - 2))
+    if pooled == 0:
+        return 0.0 if m1 == m2 else math.copysign(math.inf, m2 - m1)
+    return (m2 - m1) / pooled
+
+
+def mann_whitney(baseline, current) -> Dict[str, Optional[float]]:
+    """
+    Two-sided Mann-Whitney U test (normal approximation with tie correction).
+
+    Returns:
+        dict: u, p_value and rank-biserial correlation (positive = current higher)
+    """
+    n1, n2 = len(baseline), len(current)
+    if n1 == 0 or n2 == 0:
+        return {"u": None, "p_value": None, "rank_biserial": None}
+
+    combined = sorted([(v, 0) for v in baseline] + [(v, 1) for v in current])
+    rank_sum_current = 0.0
+    tie_term = 0.0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        avg_rank = (i + j) / 2 + 1
+        ties = j - i + 1
+        tie_term += ties ** 3 - ties
+        rank_sum_current += avg_rank * sum(1 for k in range(i, j + 1) if combined[k][1] == 1)
+        i = j + 1
+
+    u = rank_sum_current - n2 * (n2 + 1) / 2
+    n = n1 + n2
+    mean_u = n1 * n2 / 2
+    var_u = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1))) if n > 1 else 0.0
+    if var_u <= 0:
+        p_value = 1.0
+    else:
+        z = (abs(u - mean_u) - 0.5) / math.sqrt(var_u)
+        p_value = min(1.0, math.erfc(max(z, 0.0) / math.sqrt(2)))
+    return {"u": u, "p_value": p_value, "rank_biserial": 2 * u / (n1 * n2) - 1}
+
+
+def bootstrap_mean_diff_ci(
+    baseline,
+    current,
+    confidence: float = 0.95,
+    resamples: int = BOOTSTRAP_RESAMPLES,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Confidence interval for mean(current) - mean(baseline).
+
+    Uses a vectorized percentile bootstrap when numpy is installed (resample
+    matrices are processed in chunks to bound memory); otherwise falls back to
+    the Welch normal approximation.
+
+    Returns:
+        dict: low, high, method ("bootstrap" or "welch")
+    """
+    n1, n2 = len(baseline), len(current)
+    alpha = 1 - confidence
+    np = _import_numpy()
+
+    if np is not None and n1 > 1 and n2 > 1:
+        rng = np.random.default_rng(seed)
+        base = np.frombuffer(baseline, dtype=np.float64) if isinstance(baseline, array) else np.asarray(baseline, dtype=np.float64)
+        cur = np.frombuffer(current, dtype=np.float64) if isinstance(current, array) else np.asarray(current, dtype=np.float64)
+        chunk = max(1, _BOOTSTRAP_CHUNK_CELLS // max(n1, n2))
+        diffs = []
+        remaining = resamples
+        while remaining > 0:
+            rows = min(chunk, remaining)
+            base_means = base[rng.integers(0, n1, size=(rows, n1))].mean(axis=1)
+            cur_means = cur[rng.integers(0, n2, size=(rows, n2))].mean(axis=1)
+            diffs.append(cur_means - base_means)
+            remaining -= rows
+        diffs = np.concatenate(diffs)
+        low, high = np.quantile(diffs, [alpha / 2, 1 - alpha / 2])
+        return {"low": float(low), "high": float(high), "method": "bootstrap"}
+
+    m1, v1 = _mean_var(baseline)
+    m2, v2 = _mean_var(current)
+    se = math.sqrt(v1 / max(n1, 1) + v2 / max(n2, 1))
+    z = _normal_quantile(1 - alpha / 2)
+    return {"low": (m2 - m1) - z * se, "high": (m2 - m1) + z * se, "method": "welch"}
+
+
+def _normal_quantile(p: float) -> float:
+    """Inverse standard normal CDF (bisection on erf; sufficient for CIs)."""
+    low, high = -10.0, 10.0
+    for _ in range(80):
+        mid = (low + high) / 2
+        if 0.5 * math.erfc(-mid / math.sqrt(2)) < p:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2
+
+
+def compare_periods(
+    baseline,
+    current,
+    lower_is_better: bool = False,
+    alpha: float = 0.05,
+    min_effect: float = 0.2
+) -> Dict[str, Any]:
+    """
+    Compare two samples of one score.
+
+    A regression requires the change to go in the bad direction, the
+    confidence interval of the mean difference to exclude zero, the
+    Mann-Whitney p-value to be below alpha and |Cohen's d| >= min_effect.
+    """
+    m1, _ = _mean_var(baseline)
+    m2, _ = _mean_var(current)
+    delta = m2 - m1
+    d = cohens_d(baseline, current)
+    mw = mann_whitney(baseline, current)
+    ci = bootstrap_mean_diff_ci(baseline, current, confidence=1 - alpha)
+
+    worse = delta > 0 if lower_is_better else delta < 0
+    ci_excludes_zero = ci["high"] < 0 or ci["low"] > 0
+    significant = (
+        ci_excludes_zero
+        and mw["p_value"] is not None and mw["p_value"] < alpha
+        and d is not None and abs(d) >= min_effect
+    )
+    return {
+        "baseline_count": len(baseline),
+        "current_count": len(current),
+        "baseline_mean": m1,
+        "current_mean": m2,
+        "delta": delta,
+        "pct_change": (delta / m1 * 100) if m1 else 0.0,
+        "cohens_d": d,
+        "p_value": mw["p_value"],
+        "rank_biserial": mw["rank_biserial"],
+        "ci_low": ci["low"],
+        "ci_high": ci["high"],
+        "ci_method": ci["method"],
+        "significant": significant,
+        "is_regression": significant and worse,
+        "is_improvement": significant and not worse,
+    }
+
+
+def regression_scan(
+    baseline_days: int,
+    current_days: int,
+    score_names: Optional[List[str]] = None,
+    dimension: Optional[str] = None,
+    lower_is_better: Optional[List[str]] = None,
+    alpha: float = 0.05,
+    min_effect: float = 0.2,
+    min_samples: int = 10,
+    workers: int = DEFAULT_WORKERS
+) -> Dict[str, Any]:
+    """
+    Scan many scores for regressions between a baseline and a current window.
+
+    Scores for both windows are fetched in a single sweep for all score names.
+    Each score gets effect size, Mann-Whitney p-value and a confidence interval
+    for the mean difference. With a dimension, every regression is drilled
+    down per dimension value using one bulk trace-metadata join.
+
+    Returns:
+        dict: windows, ranked "results" (regressions first, then by |d|),
+        "skipped" (scores with too few samples) and optional "drilldowns"
+    """
+    now = datetime.now(timezone.utc)
+    current_start = now - timedelta(days=current_days)
+    baseline_start = current_start - timedelta(days=baseline_days)
+    lower_is_better = set(lower_is_better or [])
 
-        values = []
-        if hasattr(scores, 'data'):
-            for score in scores.data:
-                if hasattr(score, 'value') and score.value is not None:
-                    values.append(float(score.value))
-
-        if not values:
-            return {"error": f"No numeric scores found for '{score_name}'"}
-
-        min_val = min(values)
-        max_val = max(values)
-
-        # Handle edge case where all values are the same
-        if min_val == max_val:
-            return {
-                "score_name": score_name,
-                "days": days,
-                "count": len(values),
-                "min": min_val,
-                "max": max_val,
-                "bins": [{"range": f"{min_val:.2f}", "count": len(values), "pct": 100.0}]
-            }
+    try:
+        windows = fetch_windowed_scores(baseline_start, current_start, now, score_names, workers)
+
+        results = []
+        skipped = []
+        for name, data in windows.items():
+            if len(data["baseline"]) < min_samples or len(data["current"]) < min_samples:
+                skipped.append({"score_name": name, "baseline_count": len(data["baseline"]),
+                                "current_count": len(data["current"])})
+                continue
+            result = compare_periods(data["baseline"], data["current"], name in lower_is_better, alpha, min_effect)
+            result["score_name"] = name
+            results.append(result)
+
+        results.sort(key=lambda r: (not r["is_regression"], -abs(r["cohens_d"] or 0)))
+
+        drilldowns = {}
+        regressions = [r for r in results if r["is_regression"]]
+        if dimension and regressions:
+            trace_ids = set()
+            for r in regressions:
+                data = windows[r["score_name"]]
+                trace_ids.update(t for t in data["baseline_traces"] + data["current_traces"] if t)
+            trace_index, _ = build_trace_index(trace_ids, _format_time(baseline_start), _format_time(now), workers)
+
+            for r in regressions:
+                data = windows[r["score_name"]]
+                split = defaultdict(lambda: {"baseline": array("d"), "current": array("d")})
+                for period in ("baseline", "current"):
+                    for trace_id, value in zip(data[f"{period}_traces"], data[period]):
+                        info = trace_index.get(trace_id)
+                        for dim_value in (dimension_values(info, dimension) if info else ["unknown"]):
+                            split[dim_value][period].append(value)
+                rows = []
+                for dim_value, parts in split.items():
+                    if len(parts["baseline"]) < 2 or len(parts["current"]) < 2:
+                        continue
+                    m1, _ = _mean_var(parts["baseline"])
+                    m2, _ = _mean_var(parts["current"])
+                    rows.append({
+                        "value": dim_value,
+                        "baseline_count": len(parts["baseline"]),
+                        "current_count": len(parts["current"]),
+                        "baseline_mean": m1,
+                        "current_mean": m2,
+                        "delta": m2 - m1,
+                        "cohens_d": cohens_d(parts["baseline"], parts["current"]),
+                        "p_value": mann_whitney(parts["baseline"], parts["current"])["p_value"],
+                    })
+                rows.sort(key=lambda row: row["cohens_d"] or 0, reverse=r["score_name"] in lower_is_better)
+                drilldowns[r["score_name"]] = rows
 
-        # Create histogram bins
-        bin_width = (max_val - min_val) / bins
-        histogram = [0] * bins
-
-        for value in values:
-            # Determine bin index
-            idx = min(int((value - min_val) / bin_width), bins - 1)
-            histogram[idx] += 1
-
-        # Format bins for output
-        bin_data = []
-        for i, count in enumerate(histogram):
-            bin_start = min_val + i * bin_width
-            bin_end = bin_start + bin_width
-            pct = count / len(values) * 100
-            bin_data.append({
-                "range": f"{bin_start:.2f}-{bin_end:.2f}",
-                "count": count,
-                "pct": round(pct, 1)
-            })
+        return {
+            "baseline": f"{baseline_start.strftime('%Y-%m-%d')} to {current_start.strftime('%Y-%m-%d')}",
+            "current": f"{current_start.strftime('%Y-%m-%d')} to {now.strftime('%Y-%m-%d')}",
+            "alpha": alpha,
+            "min_effect": min_effect,
+            "dimension": dimension,
+            "results": results,
+            "skipped": skipped,
+            "drilldowns": drilldowns
+        }
+    except Exception as e:
+        print(f"Error scanning for regressions: {e}", file=sys.stderr)
+        return {"error": str(e)}
+
+
+# =============================================================================
+# SCORE CORRELATION
+# =============================================================================
+
+# Cross-tab rows/columns shown per categorical pair
+CROSSTAB_MAX_CATEGORIES = 12
+
+
+def _score_table(
+    score_name: str,
+    from_time: str,
+    to_time: str,
+    workers: int = DEFAULT_WORKERS
+) -> Dict[str, Any]:
+    """
+    Hash one score stream by trace ID (build side of the join).
+
+    Keeps the latest value per trace. Categorical values are dictionary-encoded
+    to integer codes so cross-tabs count ints instead of strings.
+
+    Returns:
+        dict: "values" (trace_id -> float or category code), "categories"
+        (code -> label, empty for numeric scores) and "kind"
+    """
+    latest = {}
+    for ts, trace_id, value in iter_scores(score_name, from_time, to_time, workers, compact=_compact_mixed):
+        if not trace_id:
+            continue
+        seen = latest.get(trace_id)
+        if seen is None or (ts and (seen[0] is None or ts >= seen[0])):
+            latest[trace_id] = (ts, value)
+
+    if all(isinstance(value, float) for _, value in latest.values()):
+        return {"kind": "numeric", "categories": [],
+                "values": {trace_id: value for trace_id, (_, value) in latest.items()}}
+
+    codes = {}
+    values = {}
+    for trace_id, (_, value) in latest.items():
+        label = value if isinstance(value, str) else f"{value:g}"
+        values[trace_id] = codes.setdefault(label, len(codes))
+    return {"kind": "categorical", "categories": list(codes), "values": values}
+
+
+def _join(x_table: Dict[str, Any], y_table: Dict[str, Any]) -> Tuple[array, array]:
+    """Hash-join two score tables on trace ID (probing with the smaller one)."""
+    xs, ys = x_table["values"], y_table["values"]
+    x_out = array("d" if x_table["kind"] == "numeric" else "q")
+    y_out = array("d" if y_table["kind"] == "numeric" else "q")
+    probe, build = (xs, ys) if len(xs) <= len(ys) else (ys, xs)
+    for trace_id in probe:
+        if trace_id in build:
+            x_out.append(xs[trace_id])
+            y_out.append(ys[trace_id])
+    return x_out, y_out
+
+
+def _average_ranks(values) -> List[float]:
+    """1-based ranks with ties sharing their average rank."""
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2 + 1
+        i = j + 1
+    return ranks
+
+
+def _pearson(xs, ys) -> Optional[float]:
+    n = len(xs)
+    if n < 3:
+        return None
+    mx, my = sum(xs) / n, sum(ys) / n
+    sxy = sum((x - mx) * (y - my) for x, y in zip(xs, ys))
+    sxx = sum((x - mx) ** 2 for x in xs)
+    syy = sum((y - my) ** 2 for y in ys)
+    if sxx == 0 or syy == 0:
+        return None
+    return sxy / math.sqrt(sxx * syy)
+
+
+def correlation_coefficients(xs, ys) -> Dict[str, Optional[float]]:
+    """
+    Pearson and Spearman correlation of two aligned numeric samples.
+
+    Vectorized with numpy when installed (ranking included); otherwise pure
+    Python.
+    """
+    np = _import_numpy()
+    if np is None or len(xs) < 3:
+        return {"pearson": _pearson(xs, ys), "spearman": _pearson(_average_ranks(xs), _average_ranks(ys))}
+
+    def coefficient(a, b):
+        if a.std() == 0 or b.std() == 0:
+            return None
+        return float(np.corrcoef(a, b)[0, 1])
+
+    def ranks(a):
+        order = np.argsort(a, kind="mergesort")
+        sorted_values = a[order]
+        _, starts, counts = np.unique(sorted_values, return_index=True, return_counts=True)
+        group_ranks = starts + (counts + 1) / 2
+        result = np.empty(len(a))
+        result[order] = np.repeat(group_ranks, counts)
+        return result
+
+    x = np.frombuffer(xs, dtype=np.float64)
+    y = np.frombuffer(ys, dtype=np.float64)
+    return {"pearson": coefficient(x, y), "spearman": coefficient(ranks(x), ranks(y))}
+
+
+def conditional_by_bins(xs, ys, bins: int) -> List[Dict[str, Any]]:
+    """Distribution of y within equal-count quantile bins of x."""
+    if not xs:
+        return []
+    sorted_x = sorted(xs)
+    n = len(sorted_x)
+    edges = sorted({sorted_x[min(n - 1, n * i // bins)] for i in range(1, bins)})
+
+    groups = [new_accumulator() for _ in range(len(edges) + 1)]
+    for x, y in zip(xs, ys):
+        lo, hi = 0, len(edges)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if x < edges[mid]:
+                hi = mid
+            else:
+                lo = mid + 1
+        accumulate(groups[lo], y)
+
+    bounds = [sorted_x[0]] + edges + [sorted_x[-1]]
+    rows = []
+    for i, acc in enumerate(groups):
+        if acc["count"]:
+            rows.append({"range": f"{bounds[i]:.4g} - {bounds[i + 1]:.4g}", **summarize(acc, (0.5,))})
+    return rows
+
+
+def conditional_by_category(codes, ys, categories: List[str]) -> Tuple[List[Dict[str, Any]], Optional[float]]:
+    """
+    Distribution of a numeric score per category, plus the correlation ratio.
+
+    Returns:
+        tuple: (rows sorted by count, eta); eta is sqrt(SS_between / SS_total)
+    """
+    groups = defaultdict(new_accumulator)
+    overall = new_accumulator()
+    for code, y in zip(codes, ys):
+        accumulate(groups[code], y)
+        accumulate(overall, y)
+
+    eta = None
+    if overall["count"] > 1 and overall["m2"] > 0:
+        between = sum(acc["count"] * (acc["mean"] - overall["mean"]) ** 2 for acc in groups.values())
+        eta = math.sqrt(min(1.0, between / overall["m2"]))
+
+    rows = [{"category": categories[code], **summarize(acc, (0.5,))} for code, acc in groups.items()]
+    rows.sort(key=lambda row: row["count"], reverse=True)
+    return rows, eta
+
+
+def crosstab(x_codes, y_codes, x_categories: List[str], y_categories: List[str]) -> Dict[str, Any]:
+    """
+    Contingency table of two categorical scores with Cramér's V.
+
+    Counts are accumulated over combined integer codes (np.bincount when
+    numpy is installed).
+    """
+    width = len(y_categories)
+    np = _import_numpy()
+    if np is not None and len(x_codes):
+        flat = np.frombuffer(x_codes, dtype=np.int64) * width + np.frombuffer(y_codes, dtype=np.int64)
+        cells = np.bincount(flat, minlength=len(x_categories) * width).tolist()
+    else:
+        cells = [0] * (len(x_categories) * width)
+        for x, y in zip(x_codes, y_codes):
+            cells[x * width + y] += 1
+    table = [cells[i * width:(i + 1) * width] for i in range(len(x_categories))]
+
+    n = len(x_codes)
+    row_totals = [sum(row) for row in table]
+    col_totals = [sum(col) for col in zip(*table)] if table else []
+    test = chi_square_test(table)
+    k = min(sum(1 for t in row_totals if t), sum(1 for t in col_totals if t)) - 1
+    cramers_v = math.sqrt(test["chi2"] / (n * k)) if n and k > 0 else None
+
+    return {"rows": x_categories, "columns": y_categories, "counts": table, "row_totals": row_totals,
+            "column_totals": col_totals, "chi2": test["chi2"], "p_value": test["p_value"], "cramers_v": cramers_v}
+
+
+def correlate_scores(
+    score_names: List[str],
+    days: int,
+    bins: int = 4,
+    method: str = "spearman",
+    workers: int = DEFAULT_WORKERS
+) -> Dict[str, Any]:
+    """
+    Correlate several scores attached to the same traces.
+
+    Each score stream is fetched once and hashed by trace ID; every pair is
+    then joined in memory. Numeric pairs get Pearson/Spearman and the
+    distribution of the second score per quantile bin of the first.
+    Categorical scores are grouped by category (boolean scores are numeric 0/1):
+    numeric x categorical pairs get per-category distributions and the
+    correlation ratio (eta), categorical pairs a cross-tab with Cramér's V.
+
+    Returns:
+        dict: per-score kinds/counts, "matrix" (pair -> coefficient, n)
+        and detailed "pairs"
+    """
+    from_time, to_time = get_time_range(days)
+
+    try:
+        tables = {name: _score_table(name, from_time, to_time, workers) for name in score_names}
+
+        pairs = []
+        for i, first in enumerate(score_names):
+            for second in score_names[i + 1:]:
+                x_name, y_name = first, second
+                # Put a categorical score first so it is always the grouping side
+                if tables[x_name]["kind"] == "numeric" and tables[y_name]["kind"] == "categorical":
+                    x_name, y_name = y_name, x_name
+                x_table, y_table = tables[x_name], tables[y_name]
+                xs, ys = _join(x_table, y_table)
+                pair = {"x": x_name, "y": y_name, "n": len(xs)}
+
+                if x_table["kind"] == "numeric":
+                    pair["kind"] = "numeric"
+                    pair.update(correlation_coefficients(xs, ys))
+                    pair["coefficient"] = pair[method]
+                    pair["conditional"] = conditional_by_bins(xs, ys, bins)
+                elif y_table["kind"] == "numeric":
+                    pair["kind"] = "mixed"
+                    pair["conditional"], pair["eta"] = conditional_by_category(xs, ys, x_table["categories"])
+                    pair["coefficient"] = pair["eta"]
+                else:
+                    pair["kind"] = "categorical"
+                    pair["crosstab"] = crosstab(xs, ys, x_table["categories"], y_table["categories"])
+                    pair["coefficient"] = pair["crosstab"]["cramers_v"]
+                pairs.append(pair)
+
+        matrix = {}
+        for pair in pairs:
+            matrix[(pair["x"], pair["y"])] = matrix[(pair["y"], pair["x"])] = (pair["coefficient"], pair["n"])
 
         return {
+            "score_names": score_names,
+            "days": days,
+            "method": method,
+            "kinds": {name: table["kind"] for name, table in tables.items()},
+            "counts": {name: len(table["values"]) for name, table in tables.items()},
+            "matrix": matrix,
+            "pairs": pairs
+        }
+    except Exception as e:
+        print(f"Error correlating scores: {e}", file=sys.stderr)
+        return {"error": str(e)}
+
+
+# =============================================================================
+# SCORE REPORT
+# =============================================================================
+
+def load_score_buffer(
+    score_name: str,
+    from_time: str,
+    to_time: str,
+    workers: int = DEFAULT_WORKERS,
+    categorical: bool = False
+) -> Dict[str, Any]:
+    """
+    Fetch a score window once into a compact columnar buffer.
+
+    Columns are typed arrays in timestamp order: "times" (epoch seconds),
+    "values" (floats, or codes into "labels" for categorical scores) and
+    "traces" (codes into "trace_ids", -1 without a trace). Strings are
+    dictionary-encoded, so a row costs about 24 bytes instead of a tuple of
+    Python objects. Scores without a timestamp are dropped.
+    """
+    times, values, traces = array("d"), array("q" if categorical else "d"), array("q")
+    labels, label_codes = [], {}
+    trace_ids, trace_codes = [], {}
+    compact = _compact_categories if categorical else _compact_scores
+
+    for ts, trace_id, value in iter_scores(score_name, from_time, to_time, workers, compact):
+        if ts is None:
+            continue
+        if categorical:
+            code = label_codes.get(value)
+            if code is None:
+                code = label_codes[value] = len(labels)
+                labels.append(value)
+            value = code
+        trace_code = -1
+        if trace_id:
+            trace_code = trace_codes.get(trace_id)
+            if trace_code is None:
+                trace_code = trace_codes[trace_id] = len(trace_ids)
+                trace_ids.append(trace_id)
+        times.append(ts.timestamp())
+        values.append(value)
+        traces.append(trace_code)
+
+    return {"categorical": categorical, "times": times, "values": values, "labels": labels,
+            "traces": traces, "trace_ids": trace_ids}
+
+
+def _buffer_rows(buffer: Dict[str, Any], start: datetime, end: datetime) -> range:
+    """Row indices with start <= timestamp < end (binary search on the sorted times)."""
+    times = buffer["times"]
+    return range(bisect_left(times, start.timestamp()), bisect_left(times, end.timestamp()))
+
+
+def _buffer_values(buffer: Dict[str, Any], rows: range) -> Iterator[Any]:
+    values = buffer["values"]
+    if buffer["categorical"]:
+        labels = buffer["labels"]
+        return (labels[values[i]] for i in rows)
+    return (values[i] for i in rows)
+
+
+def _accumulate_buffer(
+    buffer: Dict[str, Any],
+    rows: range,
+    group_key: Optional[Callable[[int], Any]] = None
+) -> Dict[Any, Dict[str, Any]]:
+    """accumulate_scores over buffered rows; group_key maps a row index to its group."""
+    new, add = (new_category_counts, count_category) if buffer["categorical"] else (new_accumulator, accumulate)
+    groups = {}
+    for i, value in zip(rows, _buffer_values(buffer, rows)):
+        key = group_key(i) if group_key else None
+        acc = groups.get(key)
+        if acc is None:
+            acc = groups[key] = new()
+        add(acc, value)
+    return groups
+
+
+def build_report(
+    score_name: str,
+    days: int = 7,
+    granularity: str = "day",
+    bins: int = 10,
+    baseline_days: int = 14,
+    current_days: int = 7,
+    dimension: Optional[str] = None,
+    workers: int = DEFAULT_WORKERS
+) -> Dict[str, Any]:
+    """
+    Compute summary, trend, distribution, regression and (with a dimension)
+    comparison views from a single fetch.
+
+    The union of the report window (last `days`) and the regression periods is
+    fetched once into a columnar buffer (load_score_buffer); every view then
+    reads its time range from the buffer with a binary search. Results match
+    the individual commands run over the same windows.
+
+    Returns:
+        dict: score_name, data_type, days, fetched (rows buffered) and one
+        entry per view, each shaped like the matching command's result
+    """
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    view_start = now - timedelta(days=days)
+    current_start = now - timedelta(days=current_days)
+    baseline_start = current_start - timedelta(days=baseline_days)
+    fetch_start = min(view_start, baseline_start)
+
+    try:
+        data_type = get_score_data_type(score_name, _format_time(fetch_start), _format_time(now))
+        if data_type is None:
+            return {"error": f"No scores found for '{score_name}'"}
+        categorical = data_type in CATEGORICAL_TYPES
+
+        buffer = load_score_buffer(score_name, _format_time(fetch_start), _format_time(now), workers, categorical)
+        times = buffer["times"]
+        view_rows = _buffer_rows(buffer, view_start, now)
+
+        def bucket_key(i: int) -> str:
+            return period_key(datetime.fromtimestamp(times[i], timezone.utc), granularity)
+
+        # Summary and distribution share one accumulator
+        acc = _accumulate_buffer(buffer, view_rows).get(None)
+        empty = new_category_counts() if categorical else new_accumulator()
+        baseline = _accumulate_buffer(buffer, _buffer_rows(buffer, baseline_start, current_start)).get(None, empty)
+        current = _accumulate_buffer(buffer, _buffer_rows(buffer, current_start, now)).get(None, empty)
+
+        report = {
             "score_name": score_name,
+            "data_type": data_type,
             "days": days,
-            "count": len(values),
-            "min": min_val,
-            "max": max_val,
-            "bins": bin_data
+            "fetched": len(times),
+            "summary": _summary_view(score_name, days, data_type, acc),
+            "trend": {
+                "granularity": granularity,
+                "periods": _trend_rows(_accumulate_buffer(buffer, view_rows, bucket_key), categorical)
+            },
+            "distribution": _distribution_view(score_name, days, data_type, acc, bins),
+            "regression": _regression_view(
+                score_name, data_type, baseline, current,
+                {"period": _period_label(baseline_start, current_start), "days": baseline_days},
+                {"period": _period_label(current_start, now), "days": current_days}
+            )
         }
+
+        if dimension:
+            trace_ids, traces = buffer["trace_ids"], buffer["traces"]
+            scored = [(trace_ids[traces[i]] if traces[i] >= 0 else None, value)
+                      for i, value in zip(view_rows, _buffer_values(buffer, view_rows))]
+            trace_index, join_errors = build_trace_index(
+                {trace_id for trace_id, _ in scored if trace_id}, _format_time(view_start), _format_time(now), workers
+            )
+            report["comparison"] = _comparison_view(score_name, dimension, days, data_type, scored,
+                                                    trace_index, join_errors)
+
+        return report
     except Exception as e:
-        print(f"Error getting distribution: {e}", file=sys.stderr)
+        print(f"Error building report: {e}", file=sys.stderr)
         return {"error": str(e)}
 
 
@@ -416,6 +1891,31 @@ def format_score_list(scores: List[Dict[str, Any]]) -> str:
     return "\n".join(lines)
 
 
+def _category_columns(groups: List[Dict[str, float]]) -> Tuple[List[str], bool]:
+    """Most frequent categories across label -> count maps, and whether any were left out."""
+    totals = defaultdict(float)
+    for group in groups:
+        for label, count in group.items():
+            totals[label] += count
+    ranked = sorted(totals, key=lambda label: (-totals[label], label))
+    return ranked[:MAX_CATEGORY_COLUMNS], len(ranked) > MAX_CATEGORY_COLUMNS
+
+
+def _share_cells(shares: Dict[str, float], columns: List[str], other: bool) -> str:
+    cells = [f"{shares.get(label, 0.0) * 100:.1f}%" for label in columns]
+    if other:
+        cells.append(f"{max(0.0, 1 - sum(shares.get(label, 0.0) for label in columns)) * 100:.1f}%")
+    return " | ".join(cells)
+
+
+def _frequency_lines(categories: List[Dict[str, Any]]) -> List[str]:
+    lines = ["| Value | Count | Share |", "|-------|-------|-------|"]
+    for row in categories:
+        bar = "█" * int(row["share"] * 20)
+        lines.append(f"| {row['value']} | {row['count']} | {row['share'] * 100:.1f}% {bar} |")
+    return lines
+
+
 def format_summary(summary: Dict[str, Any]) -> str:
     """Format score summary for display."""
     if "error" in summary:
@@ -423,6 +1923,13 @@ def format_summary(summary: Dict[str, Any]) -> str:
 
     lines = [f"# Score Summary: {summary['score_name']}\n"]
     lines.append(f"**Period:** Last {summary['days']} days")
+    if "categories" in summary:
+        lines.append(f"**Type:** {summary['data_type']}")
+        lines.append(f"**Count:** {summary['count']} scores, {len(summary['categories'])} categories\n")
+        lines.append("## Frequencies\n")
+        lines.extend(_frequency_lines(summary["categories"]))
+        return "\n".join(lines)
+
     lines.append(f"**Count:** {summary['count']} scores\n")
     lines.append("## Statistics\n")
     lines.append(f"| Metric | Value |")
@@ -444,6 +1951,25 @@ def format_trend(trend: List[Dict[str, Any]], score_name: str, granularity: str)
 
     lines = [f"# Score Trend: {score_name}\n"]
     lines.append(f"**Granularity:** {granularity}\n")
+
+    if "shares" in trend[0]:
+        columns, other = _category_columns(
+            [{label: share * t["count"] for label, share in t["shares"].items()} for t in trend]
+        )
+        headers = columns + (["other"] if other else [])
+        lines.append("| Period | Count | " + " | ".join(headers) + " |")
+        lines.append("|--------|-------|" + "---|" * len(headers))
+        for t in trend:
+            lines.append(f"| {t['period']} | {t['count']} | {_share_cells(t['shares'], columns, other)} |")
+        return "\n".join(lines)
+
+    if "dimension_value" in trend[0]:
+        lines.append("| Period | Value | Count | Mean | Min | Max |")
+        lines.append("|--------|-------|-------|------|-----|-----|")
+        for t in trend:
+            lines.append(f"| {t['period']} | {t['dimension_value']} | {t['count']} | {t['mean']:.4f} | {t['min']:.4f} | {t['max']:.4f} |")
+        return "\n".join(lines)
+
     lines.append("| Period | Count | Mean | Min | Max |")
     lines.append("|--------|-------|------|-----|-----|")
 
@@ -461,11 +1987,35 @@ def format_comparison(comparison: Dict[str, Any]) -> str:
     lines = [f"# Score Comparison: {comparison['score_name']}\n"]
     lines.append(f"**Dimension:** {comparison['dimension']}")
     lines.append(f"**Period:** Last {comparison['days']} days\n")
-    lines.append("| Value | Count | Mean | Min | Max | Median |")
-    lines.append("|-------|-------|------|-----|-----|--------|")
 
-    for dim_value, stats in comparison.get("breakdown", {}).items():
-        lines.append(f"| {dim_value} | {stats['count']} | {stats['mean']:.4f} | {stats['min']:.4f} | {stats['max']:.4f} | {stats['p50']:.4f} |")
+    if "chi_square" in comparison:
+        breakdown = comparison["breakdown"]
+        columns, other = _category_columns(
+            [{row["value"]: row["count"] for row in stats["categories"]} for stats in breakdown.values()]
+        )
+        headers = columns + (["other"] if other else [])
+        lines.append("| Value | Count | " + " | ".join(headers) + " |")
+        lines.append("|-------|-------|" + "---|" * len(headers))
+        for dim_value, stats in breakdown.items():
+            shares = {row["value"]: row["share"] for row in stats["categories"]}
+            lines.append(f"| {dim_value} | {stats['count']} | {_share_cells(shares, columns, other)} |")
+        test = comparison["chi_square"]
+        if test["p_value"] is not None:
+            verdict = "differ" if test["p_value"] < CATEGORY_ALPHA else "do not differ significantly"
+            lines.append(f"\n**Chi-square:** {test['chi2']:.2f} (dof {test['dof']}, p={test['p_value']:.4f}) - "
+                         f"category shares {verdict} across {comparison['dimension']} values")
+    else:
+        lines.append("| Value | Count | Mean | Min | Max | Median |")
+        lines.append("|-------|-------|------|-----|-----|--------|")
+
+        for dim_value, stats in comparison.get("breakdown", {}).items():
+            lines.append(f"| {dim_value} | {stats['count']} | {stats['mean']:.4f} | {stats['min']:.4f} | {stats['max']:.4f} | {stats['p50']:.4f} |")
+
+    if comparison.get("unmatched_scores"):
+        lines.append("")
+        lines.append(f"**Note:** {comparison['unmatched_scores']} score(s) skipped because their trace could not be loaded")
+        for err in comparison.get("join_errors", [])[:5]:
+            lines.append(f"- `{err['trace_id']}`: {err['error']}")
 
     return "\n".join(lines)
 
@@ -477,6 +2027,26 @@ def format_regression(regression: Dict[str, Any]) -> str:
 
     lines = [f"# Regression Analysis: {regression['score_name']}\n"]
 
+    if "shifts" in regression:
+        if regression["is_regression"]:
+            label = "REGRESSION DETECTED" if regression["data_type"] == "BOOLEAN" else "DISTRIBUTION SHIFT DETECTED"
+            lines.append(f"**Status:** {label} ({regression['severity'].upper()} severity)")
+        else:
+            lines.append("**Status:** No significant regression detected")
+        lines.append(f"**Type:** {regression['data_type']}")
+        lines.append(f"**Baseline:** {regression['baseline']['period']} ({regression['baseline']['count']} scores)")
+        lines.append(f"**Current:** {regression['current']['period']} ({regression['current']['count']} scores)")
+        p_value = f"{regression['p_value']:.4f}" if regression["p_value"] is not None else "-"
+        lines.append(f"**Chi-square:** {regression['chi2']:.2f} (dof {regression['dof']}, p={p_value}) | "
+                     f"**Share shift (TVD):** {regression['total_variation'] * 100:.1f} pts\n")
+        lines.append("| Value | Baseline | Current | Delta |")
+        lines.append("|-------|----------|---------|-------|")
+        for shift in regression["shifts"]:
+            lines.append(f"| {shift['value']} | {shift['baseline_share'] * 100:.1f}% ({shift['baseline_count']}) | "
+                         f"{shift['current_share'] * 100:.1f}% ({shift['current_count']}) | "
+                         f"{shift['delta'] * 100:+.1f} pts |")
+        return "\n".join(lines)
+
     # Status indicator
     if regression['is_regression']:
         lines.append(f"**Status:** REGRESSION DETECTED ({regression['severity'].upper()} severity)")
@@ -510,6 +2080,12 @@ def format_distribution(distribution: Dict[str, Any]) -> str:
 
     lines = [f"# Score Distribution: {distribution['score_name']}\n"]
     lines.append(f"**Period:** Last {distribution['days']} days")
+    if "categories" in distribution:
+        lines.append(f"**Type:** {distribution['data_type']}")
+        lines.append(f"**Count:** {distribution['count']} scores\n")
+        lines.append("## Frequencies\n")
+        lines.extend(_frequency_lines(distribution["categories"]))
+        return "\n".join(lines)
     lines.append(f"**Count:** {distribution['count']} scores")
     lines.append(f"**Range:** {distribution['min']:.4f} - {distribution['max']:.4f}\n")
 
@@ -525,6 +2101,207 @@ def format_distribution(distribution: Dict[str, Any]) -> str:
     return "\n".join(lines)
 
 
+def format_regression_scan(scan: Dict[str, Any]) -> str:
+    """Format a multi-score regression scan for display."""
+    if "error" in scan:
+        return f"Error: {scan['error']}"
+
+    def num(value, fmt="{:+.4f}"):
+        return fmt.format(value) if value is not None and math.isfinite(value) else "-"
+
+    results = scan["results"]
+    regressions = sum(1 for r in results if r["is_regression"])
+    confidence = int(round((1 - scan["alpha"]) * 100))
+
+    lines = ["# Regression Scan\n"]
+    lines.append(f"**Baseline:** {scan['baseline']}")
+    lines.append(f"**Current:** {scan['current']}")
+    lines.append(f"**Scores:** {len(results)} analyzed, {regressions} regression(s)")
+    lines.append(f"**Criteria:** {confidence}% CI of the mean difference excludes 0, "
+                 f"Mann-Whitney p < {scan['alpha']}, |Cohen's d| >= {scan['min_effect']}\n")
+
+    if results:
+        lines.append(f"| Status | Score | Baseline | Current | Delta | % | Cohen's d | p | {confidence}% CI |")
+        lines.append("|--------|-------|----------|---------|-------|---|-----------|---|--------|")
+        for r in results:
+            status = "REGRESSION" if r["is_regression"] else "improved" if r["is_improvement"] else "-"
+            ci = f"[{r['ci_low']:+.4f}, {r['ci_high']:+.4f}]"
+            lines.append(
+                f"| {status} | {r['score_name']} | {r['baseline_mean']:.4f} (n={r['baseline_count']}) | "
+                f"{r['current_mean']:.4f} (n={r['current_count']}) | {r['delta']:+.4f} | {r['pct_change']:+.1f}% | "
+                f"{num(r['cohens_d'], '{:+.2f}')} | {num(r['p_value'], '{:.4f}')} | {ci} |"
+            )
+        methods = {r["ci_method"] for r in results}
+        if "welch" in methods:
+            lines.append("\n_CIs use the Welch normal approximation (install numpy for bootstrap intervals)._")
+
+    for score_name, rows in scan.get("drilldowns", {}).items():
+        lines.append(f"\n## {score_name} by {scan['dimension']}\n")
+        lines.append("| Value | Baseline | Current | Delta | Cohen's d | p |")
+        lines.append("|-------|----------|---------|-------|-----------|---|")
+        for row in rows:
+            lines.append(
+                f"| {row['value']} | {row['baseline_mean']:.4f} (n={row['baseline_count']}) | "
+                f"{row['current_mean']:.4f} (n={row['current_count']}) | {row['delta']:+.4f} | "
+                f"{num(row['cohens_d'], '{:+.2f}')} | {num(row['p_value'], '{:.4f}')} |"
+            )
+
+    if scan.get("skipped"):
+        lines.append("\n## Skipped (too few samples)\n")
+        for skipped in scan["skipped"]:
+            lines.append(f"- {skipped['score_name']}: baseline n={skipped['baseline_count']}, "
+                         f"current n={skipped['current_count']}")
+
+    return "\n".join(lines)
+
+
+def format_changes(result: Dict[str, Any]) -> str:
+    """Format change detection results for display."""
+    if "error" in result:
+        return f"Error: {result['error']}"
+
+    baseline = result["baseline"]
+    lines = [f"# Change Detection: {result['score_name']}\n"]
+    lines.append(f"**Granularity:** {result['granularity']}")
+    lines.append(f"**Processed:** {result['processed']} new period(s) "
+                 f"({result['skipped']} skipped as too sparse), up to {result['last_period'] or '-'}")
+    if baseline["warming_up"]:
+        lines.append(f"**Baseline:** warming up ({baseline['periods_seen']} period(s) seen)")
+    elif baseline["mean"] is not None:
+        lines.append(f"**Baseline:** {baseline['mean']:.4f} ± {baseline['std_dev'] or 0:.4f} | "
+                     f"CUSUM up {baseline['cusum_up']:.2f} / down {baseline['cusum_down']:.2f} "
+                     f"(threshold {baseline['threshold']})")
+
+    def event_rows(events):
+        rows = ["| Period | Event | Direction | Value | Baseline | z |",
+                "|--------|-------|-----------|-------|----------|---|"]
+        for e in events:
+            z = f"{e['z']:+.2f}" if e.get("z") is not None else "-"
+            label = "CHANGE" if e["kind"] == "change" else "anomaly"
+            rows.append(f"| {e['period']} | {label} | {e['direction']} | {e['value']:.4f} | {e['baseline']:.4f} | {z} |")
+        return rows
+
+    lines.append("")
+    if result["new_events"]:
+        lines.append(f"## New Events ({len(result['new_events'])})\n")
+        lines.extend(event_rows(result["new_events"]))
+    else:
+        lines.append("No new changes or anomalies.")
+
+    older = [e for e in result["recent_events"]
+             if (e["period"], e["kind"]) not in {(n["period"], n["kind"]) for n in result["new_events"]}]
+    if older:
+        lines.append("\n## Earlier Events\n")
+        lines.extend(event_rows(older))
+
+    return "\n".join(lines)
+
+
+def format_correlation(result: Dict[str, Any]) -> str:
+    """Format score correlations for display."""
+    if "error" in result:
+        return f"Error: {result['error']}"
+
+    def num(value, fmt="{:+.3f}"):
+        return fmt.format(value) if value is not None else "-"
+
+    names = result["score_names"]
+    lines = ["# Score Correlation\n"]
+    lines.append(f"**Period:** Last {result['days']} days")
+    lines.append("**Scores:** " + ", ".join(
+        f"{name} ({result['kinds'][name]}, {result['counts'][name]} traces)" for name in names))
+    lines.append(f"**Matrix:** {result['method']} for numeric pairs, eta for categorical x numeric, "
+                 "Cramér's V for categorical pairs\n")
+
+    lines.append("| | " + " | ".join(names) + " |")
+    lines.append("|---|" + "---|" * len(names))
+    for x in names:
+        cells = []
+        for y in names:
+            if x == y:
+                cells.append("1")
+                continue
+            coefficient, n = result["matrix"][(x, y)]
+            cells.append(f"{num(coefficient)} (n={n})")
+        lines.append(f"| **{x}** | " + " | ".join(cells) + " |")
+
+    for pair in result["pairs"]:
+        lines.append(f"\n## {pair['y']} by {pair['x']} (n={pair['n']})\n")
+        if not pair["n"]:
+            lines.append("No traces carry both scores.")
+            continue
+
+        if pair["kind"] == "numeric":
+            lines.append(f"**Pearson:** {num(pair['pearson'])} | **Spearman:** {num(pair['spearman'])}\n")
+            lines.append(f"| {pair['x']} | Count | Mean {pair['y']} | Median | Std Dev |")
+            lines.append("|---|-------|------|--------|---------|")
+            for row in pair["conditional"]:
+                lines.append(f"| {row['range']} | {row['count']} | {row['mean']:.4f} | {row['p50']:.4f} | {row['std_dev']:.4f} |")
+
+        elif pair["kind"] == "mixed":
+            lines.append(f"**Correlation ratio (eta):** {num(pair['eta'], '{:.3f}')}\n")
+            lines.append(f"| {pair['x']} | Count | Mean {pair['y']} | Median | Std Dev |")
+            lines.append("|---|-------|------|--------|---------|")
+            for row in pair["conditional"][:CROSSTAB_MAX_CATEGORIES]:
+                lines.append(f"| {row['category']} | {row['count']} | {row['mean']:.4f} | {row['p50']:.4f} | {row['std_dev']:.4f} |")
+
+        else:
+            table = pair["crosstab"]
+            lines.append(f"**Cramér's V:** {num(table['cramers_v'], '{:.3f}')} | **Chi-square:** {table['chi2']:.2f} "
+                         f"(p={num(table['p_value'], '{:.4f}')})\n")
+            rows = sorted(range(len(table["rows"])), key=lambda i: -table["row_totals"][i])[:CROSSTAB_MAX_CATEGORIES]
+            cols = sorted(range(len(table["columns"])), key=lambda j: -table["column_totals"][j])[:CROSSTAB_MAX_CATEGORIES]
+            lines.append(f"| {pair['x']} \\ {pair['y']} | " + " | ".join(table["columns"][j] for j in cols) + " | Total |")
+            lines.append("|---|" + "---|" * (len(cols) + 1))
+            for i in rows:
+                cells = [f"{table['counts'][i][j]} ({table['counts'][i][j] / table['row_totals'][i] * 100:.0f}%)" for j in cols]
+                lines.append(f"| {table['rows'][i]} | " + " | ".join(cells) + f" | {table['row_totals'][i]} |")
+            if len(rows) < len(table["rows"]) or len(cols) < len(table["columns"]):
+                lines.append(f"\n_Showing the {CROSSTAB_MAX_CATEGORIES} most frequent categories per side._")
+
+    return "\n".join(lines)
+
+
+def format_rollup_sync(result: Dict[str, Any]) -> str:
+    """Format rollup sync result for display."""
+    lines = [f"# Rollup Sync: {result['score_name']}\n"]
+    lines.append(f"**Dimension:** {result['dimension'] or '-'}")
+    lines.append(f"**Buckets written:** {result['buckets']}\n")
+    lines.append("| Re-aggregated From | To |")
+    lines.append("|--------------------|----|")
+    for start, end in result["windows"]:
+        lines.append(f"| {start} | {end} |")
+    return "\n".join(lines)
+
+
+def _demote_headings(text: str) -> str:
+    return "\n".join("#" + line if line.startswith("#") else line for line in text.split("\n"))
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Format a combined score report for display (each view as in its own command)."""
+    if "error" in report:
+        return f"Error: {report['error']}"
+
+    lines = [f"# Score Report: {report['score_name']}\n"]
+    lines.append(f"**Type:** {report['data_type']}")
+    lines.append(f"**Period:** Last {report['days']} days")
+    lines.append(f"**Scores fetched:** {report['fetched']} (one pass for all views)\n")
+
+    trend = report["trend"]
+    sections = [
+        format_summary(report["summary"]),
+        format_trend(trend["periods"], report["score_name"], trend["granularity"]),
+        format_distribution(report["distribution"]),
+        format_regression(report["regression"]),
+    ]
+    if "comparison" in report:
+        sections.append(format_comparison(report["comparison"]))
+
+    lines.append("\n\n".join(_demote_headings(section) for section in sections))
+    return "\n".join(lines)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Langfuse Score Analyzer",
@@ -533,71 +2310,218 @@ def main():
 
     subparsers = parser.add_subparsers(dest="command", required=True)
 
+    # Options shared by commands that stream scores
+    fetch_options = argparse.ArgumentParser(add_help=False)
+    fetch_options.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                               help=f"Time slices fetched in parallel (default: {DEFAULT_WORKERS})")
+
     # List scores command
-    list_parser = subparsers.add_parser("list-scores", help="List available scores")
+    list_parser = subparsers.add_parser("list-scores", help="List available scores", parents=[fetch_options])
     list_parser.add_argument("--days", type=int, default=30, help="Days to look back (default: 30)")
 
     # Summary command
-    summary_parser = subparsers.add_parser("summary", help="Get score statistics")
+    summary_parser = subparsers.add_parser("summary", help="Get score statistics", parents=[fetch_options])
     summary_parser.add_argument("--score-name", required=True, help="Score name")
     summary_parser.add_argument("--days", type=int, default=30, help="Days to analyze (default: 30)")
 
     # Trend command
-    trend_parser = subparsers.add_parser("trend", help="Show score trend over time")
+    trend_parser = subparsers.add_parser("trend", help="Show score trend over time", parents=[fetch_options])
     trend_parser.add_argument("--score-name", required=True, help="Score name")
     trend_parser.add_argument("--days", type=int, default=14, help="Days to analyze (default: 14)")
     trend_parser.add_argument("--granularity", default="day",
                               choices=["hour", "day", "week", "month"],
                               help="Time granularity (default: day)")
+    trend_parser.add_argument("--rollup", action="store_true",
+                              help="Read from the local rollup store (synced incrementally first)")
+    trend_parser.add_argument("--dimension",
+                              help="Split the trend by a dimension (requires --rollup)")
 
     # Compare command
-    compare_parser = subparsers.add_parser("compare", help="Compare scores by dimension")
+    compare_parser = subparsers.add_parser("compare", help="Compare scores by dimension", parents=[fetch_options])
     compare_parser.add_argument("--score-name", required=True, help="Score name")
     compare_parser.add_argument("--dimension", required=True,
-                               choices=["release", "environment", "name"],
-                               help="Dimension to compare")
+                               help="Dimension to compare: release, environment, name, user, tags, "
+                                    "version, session, or any trace metadata key")
     compare_parser.add_argument("--days", type=int, default=7, help="Days to analyze (default: 7)")
 
     # Regression command
-    regression_parser = subparsers.add_parser("regression", help="Detect score regressions")
+    regression_parser = subparsers.add_parser("regression", help="Detect score regressions", parents=[fetch_options])
     regression_parser.add_argument("--score-name", required=True, help="Score name")
     regression_parser.add_argument("--baseline-days", type=int, default=14,
                                    help="Baseline period days (default: 14)")
     regression_parser.add_argument("--current-days", type=int, default=7,
                                    help="Current period days (default: 7)")
+    regression_parser.add_argument("--rollup", action="store_true",
+                                   help="Read from the local rollup store (synced incrementally first)")
+
+    # Regression scan command
+    scan_parser = subparsers.add_parser("regression-scan", help="Scan many scores for regressions in one sweep",
+                                        parents=[fetch_options])
+    scan_parser.add_argument("--score-names", nargs="+", help="Scores to scan (default: all)")
+    scan_parser.add_argument("--baseline-days", type=int, default=14,
+                             help="Baseline period days (default: 14)")
+    scan_parser.add_argument("--current-days", type=int, default=7,
+                             help="Current period days (default: 7)")
+    scan_parser.add_argument("--dimension", help="Drill regressions down by this dimension (see compare)")
+    scan_parser.add_argument("--lower-is-better", nargs="+", default=[],
+                             help="Scores where an increase is a regression (e.g. latency, cost)")
+    scan_parser.add_argument("--alpha", type=float, default=0.05, help="Significance level (default: 0.05)")
+    scan_parser.add_argument("--min-effect", type=float, default=0.2,
+                             help="Minimum |Cohen's d| to flag (default: 0.2)")
+    scan_parser.add_argument("--min-samples", type=int, default=10,
+                             help="Minimum scores per period (default: 10)")
+    scan_parser.add_argument("--fail-on-regression", action="store_true",
+                             help="Exit with status 2 if any regression is found (for scheduled checks)")
+
+    # Change detection command
+    changes_parser = subparsers.add_parser("detect-changes", help="Detect level shifts and anomalies incrementally",
+                                           parents=[fetch_options])
+    changes_parser.add_argument("--score-name", required=True, help="Score name")
+    changes_parser.add_argument("--granularity", default="hour", choices=["hour", "day", "week", "month"],
+                                help="Period size (default: hour)")
+    changes_parser.add_argument("--days", type=int, default=14,
+                                help="History used to warm up on the first run (default: 14)")
+    changes_parser.add_argument("--min-count", type=int, default=5,
+                                help="Skip periods with fewer scores (default: 5)")
+    changes_parser.add_argument("--threshold", type=float, default=5.0,
+                                help="CUSUM threshold in std devs, for new detectors (default: 5.0)")
+    changes_parser.add_argument("--z-threshold", type=float, default=3.5,
+                                help="Anomaly |z| threshold, for new detectors (default: 3.5)")
+    changes_parser.add_argument("--reset", action="store_true", help="Discard detector state and start over")
+    changes_parser.add_argument("--fail-on-change", action="store_true",
+                                help="Exit with status 2 if new events were detected (for scheduled checks)")
+
+    # Correlation command
+    correlate_parser = subparsers.add_parser("correlate", help="Correlate scores attached to the same traces",
+                                             parents=[fetch_options])
+    correlate_parser.add_argument("--score-names", nargs="+", required=True, help="Scores to correlate (two or more)")
+    correlate_parser.add_argument("--days", type=int, default=7, help="Days to analyze (default: 7)")
+    correlate_parser.add_argument("--bins", type=int, default=4,
+                                  help="Quantile bins for numeric conditional distributions (default: 4)")
+    correlate_parser.add_argument("--method", default="spearman", choices=["spearman", "pearson"],
+                                  help="Coefficient shown in the matrix for numeric pairs (default: spearman)")
 
     # Distribution command
-    dist_parser = subparsers.add_parser("distribution", help="Show score distribution")
+    dist_parser = subparsers.add_parser("distribution", help="Show score distribution", parents=[fetch_options])
     dist_parser.add_argument("--score-name", required=True, help="Score name")
     dist_parser.add_argument("--days", type=int, default=30, help="Days to analyze (default: 30)")
     dist_parser.add_argument("--bins", type=int, default=10, help="Number of bins (default: 10)")
 
+    # Report command
+    report_parser = subparsers.add_parser("report", help="Summary, trend, distribution and regression from one fetch",
+                                          parents=[fetch_options])
+    report_parser.add_argument("--score-name", required=True, help="Score name")
+    report_parser.add_argument("--days", type=int, default=7,
+                               help="Days for summary, trend, distribution and compare (default: 7)")
+    report_parser.add_argument("--granularity", default="day", choices=["hour", "day", "week", "month"],
+                               help="Trend granularity (default: day)")
+    report_parser.add_argument("--bins", type=int, default=10, help="Histogram bins (default: 10)")
+    report_parser.add_argument("--baseline-days", type=int, default=14,
+                               help="Regression baseline period days (default: 14)")
+    report_parser.add_argument("--current-days", type=int, default=7,
+                               help="Regression current period days (default: 7)")
+    report_parser.add_argument("--dimension", help="Also compare by this dimension (see compare)")
+    report_parser.add_argument("--format", default="markdown", choices=["markdown", "json"],
+                               help="Output format (default: markdown)")
+
+    # Rollup sync command
+    rollup_parser = subparsers.add_parser("rollup-sync", help="Update the local hourly score rollup",
+                                          parents=[fetch_options])
+    rollup_parser.add_argument("--score-name", required=True, help="Score name")
+    rollup_parser.add_argument("--days", type=int, default=30, help="Days to cover (default: 30)")
+    rollup_parser.add_argument("--dimension", default="",
+                               help="Also roll up by this dimension (see compare --dimension)")
+
     args = parser.parse_args()
 
+    if args.command == "trend" and args.dimension and not args.rollup:
+        parser.error("trend --dimension requires --rollup")
+    if args.command == "correlate" and len(set(args.score_names)) < 2:
+        parser.error("correlate needs at least two distinct --score-names")
+
     if args.command == "list-scores":
-        scores = list_scores(args.days)
+        scores = list_scores(args.days, args.workers)
         print(format_score_list(scores))
 
     elif args.command == "summary":
-        summary = get_score_summary(args.score_name, args.days)
+        summary = get_score_summary(args.score_name, args.days, args.workers)
         print(format_summary(summary))
 
     elif args.command == "trend":
-        trend = get_score_trend(args.score_name, args.days, args.granularity)
+        trend = get_score_trend(args.score_name, args.days, args.granularity, args.workers,
+                                use_rollup=args.rollup, dimension=args.dimension)
         print(format_trend(trend, args.score_name, args.granularity))
 
     elif args.command == "compare":
-        comparison = compare_by_dimension(args.score_name, args.dimension, args.days)
+        comparison = compare_by_dimension(args.score_name, args.dimension, args.days, args.workers)
         print(format_comparison(comparison))
 
     elif args.command == "regression":
-        regression = detect_regression(args.score_name, args.baseline_days, args.current_days)
+        regression = detect_regression(args.score_name, args.baseline_days, args.current_days, args.workers,
+                                       use_rollup=args.rollup)
         print(format_regression(regression))
 
+    elif args.command == "regression-scan":
+        scan = regression_scan(
+            args.baseline_days, args.current_days,
+            score_names=args.score_names,
+            dimension=args.dimension,
+            lower_is_better=args.lower_is_better,
+            alpha=args.alpha,
+            min_effect=args.min_effect,
+            min_samples=args.min_samples,
+            workers=args.workers
+        )
+        print(format_regression_scan(scan))
+        if "error" in scan:
+            sys.exit(1)
+        if args.fail_on_regression and any(r["is_regression"] for r in scan["results"]):
+            sys.exit(2)
+
+    elif args.command == "detect-changes":
+        result = detect_changes(
+            args.score_name, args.granularity, args.days, args.workers,
+            reset=args.reset,
+            min_count=args.min_count,
+            detector_params={"threshold": args.threshold, "z_threshold": args.z_threshold}
+        )
+        print(format_changes(result))
+        if "error" in result:
+            sys.exit(1)
+        if args.fail_on_change and result["new_events"]:
+            sys.exit(2)
+
+    elif args.command == "correlate":
+        names = list(dict.fromkeys(args.score_names))
+        result = correlate_scores(names, args.days, args.bins, args.method, args.workers)
+        print(format_correlation(result))
+        if "error" in result:
+            sys.exit(1)
+
     elif args.command == "distribution":
-        distribution = get_distribution(args.score_name, args.days, args.bins)
+        distribution = get_distribution(args.score_name, args.days, args.bins, args.workers)
         print(format_distribution(distribution))
 
+    elif args.command == "report":
+        report = build_report(
+            args.score_name, args.days, args.granularity, args.bins,
+            args.baseline_days, args.current_days, args.dimension, args.workers
+        )
+        if args.format == "json":
+            print(json.dumps(report, indent=2, default=str))
+        else:
+            print(format_report(report))
+        if "error" in report:
+            sys.exit(1)
+
+    elif args.command == "rollup-sync":
+        try:
+            result = sync_rollup(args.score_name, args.days, args.dimension, args.workers)
+        except Exception as e:
+            print(f"Error syncing rollup: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(format_rollup_sync(result))
+
 
 if __name__ == "__main__":
     main()
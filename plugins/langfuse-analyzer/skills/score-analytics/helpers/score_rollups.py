@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Score Rollup Store
+
+Local SQLite store of pre-aggregated hourly score buckets, kept next to the
+trace cache. Each bucket holds a mergeable accumulator (count, mean/M2, sum,
+min, max, quantile sketch; see streaming_stats.py) per score name, optional
+dimension value and hour. Day/week/month views are derived by merging hours,
+so trend and regression queries never re-download raw scores.
+
+Buckets are written by score_analyzer.py (`rollup-sync`, or `--rollup` on
+trend/regression), which re-aggregates only the hours after the last sync.
+
+The store also persists change-detector state and detected change/anomaly
+events (`detect-changes`), so detection resumes where the last run stopped.
+
+Environment Variables:
+    LANGFUSE_CACHE_DIR: Cache directory (default: ~/.cache/langfuse-analyzer)
+
+USAGE:
+    python score_rollups.py stats
+    python score_rollups.py clear [--score-name NAME]
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Add parent directories to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "data-retrieval" / "helpers"))
+from streaming_stats import accumulator_from_dict, accumulator_to_dict
+from trace_cache import CACHE_DIR
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS score_buckets (
+    score_name TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    dim_value TEXT NOT NULL,
+    bucket_start TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (score_name, dimension, dim_value, bucket_start)
+);
+CREATE INDEX IF NOT EXISTS score_buckets_time ON score_buckets (score_name, dimension, bucket_start);
+CREATE TABLE IF NOT EXISTS rollup_state (
+    score_name TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    synced_from TEXT,
+    synced_to TEXT,
+    PRIMARY KEY (score_name, dimension)
+);
+CREATE TABLE IF NOT EXISTS detector_state (
+    score_name TEXT NOT NULL,
+    granularity TEXT NOT NULL,
+    last_period TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (score_name, granularity)
+);
+CREATE TABLE IF NOT EXISTS change_events (
+    score_name TEXT NOT NULL,
+    granularity TEXT NOT NULL,
+    period TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    direction TEXT,
+    value REAL,
+    baseline REAL,
+    z REAL,
+    detected_at TEXT NOT NULL,
+    PRIMARY KEY (score_name, granularity, period, kind)
+);
+"""
+
+# Singleton connection (shared across threads, serialized by _lock)
+_conn = None
+_lock = threading.RLock()
+
+
+def get_rollup_connection() -> sqlite3.Connection:
+    """Get or create the rollup database connection."""
+    global _conn
+
+    with _lock:
+        if _conn is not None:
+            return _conn
+
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _conn = sqlite3.connect(str(CACHE_DIR / "score_rollups.sqlite3"), check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.executescript(_SCHEMA)
+        return _conn
+
+
+# =============================================================================
+# SYNC STATE
+# =============================================================================
+
+def get_rollup_range(score_name: str, dimension: str = "") -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Return the (from, to) window already aggregated for a score/dimension."""
+    with _lock:
+        row = get_rollup_connection().execute(
+            "SELECT synced_from, synced_to FROM rollup_state WHERE score_name = ? AND dimension = ?",
+            (score_name, dimension)
+        ).fetchone()
+    if not row:
+        return None, None
+    return tuple(datetime.fromisoformat(v) if v else None for v in row)
+
+
+def set_rollup_range(score_name: str, dimension: str, synced_from: datetime, synced_to: datetime) -> None:
+    """Record the window aggregated for a score/dimension."""
+    with _lock:
+        conn = get_rollup_connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO rollup_state (score_name, dimension, synced_from, synced_to) VALUES (?, ?, ?, ?)",
+            (score_name, dimension, synced_from.isoformat(), synced_to.isoformat())
+        )
+        conn.commit()
+
+
+# =============================================================================
+# BUCKETS
+# =============================================================================
+
+def replace_buckets(
+    score_name: str,
+    dimension: str,
+    window_start: datetime,
+    window_end: datetime,
+    buckets: Dict[Tuple[str, datetime], Dict[str, Any]]
+) -> None:
+    """
+    Replace all hourly buckets in [window_start, window_end) in one transaction.
+
+    Args:
+        score_name: Score name
+        dimension: Dimension name ("" for the overall rollup)
+        window_start: First hour re-aggregated (inclusive)
+        window_end: End of the re-aggregated window (exclusive)
+        buckets: (dim_value, hour_start) -> accumulator
+    """
+    rows = [
+        (score_name, dimension, dim_value, hour.isoformat(), json.dumps(accumulator_to_dict(acc)))
+        for (dim_value, hour), acc in buckets.items()
+    ]
+    with _lock:
+        conn = get_rollup_connection()
+        with conn:
+            conn.execute(
+                "DELETE FROM score_buckets WHERE score_name = ? AND dimension = ? "
+                "AND bucket_start >= ? AND bucket_start < ?",
+                (score_name, dimension, window_start.isoformat(), window_end.isoformat())
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO score_buckets (score_name, dimension, dim_value, bucket_start, data) "
+                "VALUES (?, ?, ?, ?, ?)", rows
+            )
+
+
+def query_buckets(
+    score_name: str,
+    dimension: str = "",
+    from_time: Optional[datetime] = None,
+    to_time: Optional[datetime] = None
+) -> Iterator[Tuple[str, datetime, Dict[str, Any]]]:
+    """
+    Yield hourly buckets in a window, oldest first.
+
+    Yields:
+        tuple: (dim_value, hour_start, accumulator)
+    """
+    clauses = ["score_name = ?", "dimension = ?"]
+    params = [score_name, dimension]
+    if from_time is not None:
+        clauses.append("bucket_start >= ?")
+        params.append(from_time.isoformat())
+    if to_time is not None:
+        clauses.append("bucket_start < ?")
+        params.append(to_time.isoformat())
+
+    with _lock:
+        rows = get_rollup_connection().execute(
+            f"SELECT dim_value, bucket_start, data FROM score_buckets WHERE {' AND '.join(clauses)} "
+            "ORDER BY bucket_start", params
+        ).fetchall()
+
+    for dim_value, bucket_start, data in rows:
+        yield dim_value, datetime.fromisoformat(bucket_start), accumulator_from_dict(json.loads(data))
+
+
+# =============================================================================
+# CHANGE DETECTION STATE
+# =============================================================================
+
+def get_detector_state(score_name: str, granularity: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """Return (last processed period, detector state) or (None, None)."""
+    with _lock:
+        row = get_rollup_connection().execute(
+            "SELECT last_period, data FROM detector_state WHERE score_name = ? AND granularity = ?",
+            (score_name, granularity)
+        ).fetchone()
+    if not row:
+        return None, None
+    return row[0], json.loads(row[1])
+
+
+def save_detector_run(
+    score_name: str,
+    granularity: str,
+    last_period: Optional[str],
+    state: Dict[str, Any],
+    events: List[Dict[str, Any]]
+) -> None:
+    """Persist detector state and any new events in one transaction."""
+    detected_at = datetime.now(timezone.utc).isoformat()
+    with _lock:
+        conn = get_rollup_connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO detector_state (score_name, granularity, last_period, data) VALUES (?, ?, ?, ?)",
+                (score_name, granularity, last_period, json.dumps(state))
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO change_events "
+                "(score_name, granularity, period, kind, direction, value, baseline, z, detected_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(score_name, granularity, e["period"], e["kind"], e["direction"], e["value"],
+                  e["baseline"], e["z"], detected_at) for e in events]
+            )
+
+
+def query_change_events(score_name: str, granularity: str, limit: int = 20) -> List[Dict[str, Any]]:
+    """Most recent change/anomaly events, newest first."""
+    with _lock:
+        rows = get_rollup_connection().execute(
+            "SELECT period, kind, direction, value, baseline, z FROM change_events "
+            "WHERE score_name = ? AND granularity = ? ORDER BY period DESC LIMIT ?",
+            (score_name, granularity, limit)
+        ).fetchall()
+    return [
+        {"period": r[0], "kind": r[1], "direction": r[2], "value": r[3], "baseline": r[4], "z": r[5]}
+        for r in rows
+    ]
+
+
+def reset_detector(score_name: str, granularity: str) -> None:
+    """Forget detector state and events for a score/granularity."""
+    with _lock:
+        conn = get_rollup_connection()
+        with conn:
+            conn.execute("DELETE FROM detector_state WHERE score_name = ? AND granularity = ?",
+                         (score_name, granularity))
+            conn.execute("DELETE FROM change_events WHERE score_name = ? AND granularity = ?",
+                         (score_name, granularity))
+
+
+def get_rollup_stats() -> Dict[str, Any]:
+    """Summarize rollup contents per score and dimension."""
+    with _lock:
+        conn = get_rollup_connection()
+        rows = conn.execute(
+            "SELECT s.score_name, s.dimension, s.synced_from, s.synced_to, COUNT(b.bucket_start) "
+            "FROM rollup_state s LEFT JOIN score_buckets b "
+            "ON b.score_name = s.score_name AND b.dimension = s.dimension "
+            "GROUP BY s.score_name, s.dimension ORDER BY s.score_name, s.dimension"
+        ).fetchall()
+    return {
+        "path": str(CACHE_DIR / "score_rollups.sqlite3"),
+        "rollups": [
+            {"score_name": r[0], "dimension": r[1] or "-", "synced_from": r[2], "synced_to": r[3], "buckets": r[4]}
+            for r in rows
+        ],
+    }
+
+
+def clear_rollups(score_name: Optional[str] = None) -> None:
+    """Delete rollups and detector state (all, or for one score name)."""
+    with _lock:
+        conn = get_rollup_connection()
+        with conn:
+            if score_name:
+                for table in ("score_buckets", "rollup_state", "detector_state", "change_events"):
+                    conn.execute(f"DELETE FROM {table} WHERE score_name = ?", (score_name,))
+            else:
+                conn.executescript(
+                    "DELETE FROM score_buckets; DELETE FROM rollup_state; "
+                    "DELETE FROM detector_state; DELETE FROM change_events;"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local score rollup store maintenance")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("stats", help="Show rollup statistics")
+    clear_parser = subparsers.add_parser("clear", help="Delete rollups")
+    clear_parser.add_argument("--score-name", help="Only delete rollups for this score")
+
+    args = parser.parse_args()
+
+    if args.command == "stats":
+        stats = get_rollup_stats()
+        print("# Score Rollups\n")
+        print(f"**Path:** {stats['path']}\n")
+        if not stats["rollups"]:
+            print("No rollups synced yet")
+            return
+        print("| Score | Dimension | From | To | Buckets |")
+        print("|-------|-----------|------|----|---------|")
+        for r in stats["rollups"]:
+            print(f"| {r['score_name']} | {r['dimension']} | {r['synced_from']} | {r['synced_to']} | {r['buckets']} |")
+
+    elif args.command == "clear":
+        clear_rollups(args.score_name)
+        print(f"Cleared rollups{' for ' + args.score_name if args.score_name else ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,20 +8,68 @@ USAGE:
     python session_analyzer.py list --limit 20
     python session_analyzer.py get --session-id "session-123"
     python session_analyzer.py analyze --session-id "session-123"
+    python session_analyzer.py analyze --session-id "session-123" --score-fetch per-trace --concurrency 16
     python session_analyzer.py find-issues --days 7 --has-errors
+    python session_analyzer.py find-issues --days 7 --min-turns 10 --min-score 0.6 --score-name quality
     python session_analyzer.py timeline --session-id "session-123"
+    python session_analyzer.py features --days 30
+    python session_analyzer.py cohort --by turns --edges 5 10 20 --metric quality --days 30
+    python session_analyzer.py flows --days 7 --format dot > flows.dot
+    python session_analyzer.py tail
+
+SESSION SCORES:
+    analyze fetches the scores of all session traces either in one bulk sweep
+    from the session's first trace until now (kept locally by trace ID) or per
+    trace with bounded concurrency. --score-fetch auto (default) probes the
+    bulk window with one request and picks whichever needs fewer requests.
+
+FINDING ISSUES:
+    find-issues pages all sessions created in the --days window (newest
+    first) and evaluates them in a worker pool, cheapest filters first: turn
+    count and errors from the session itself, then scores from one shared
+    score sweep built only once a session gets that far. Matches are printed
+    as they are found and the scan stops at --limit.
+
+SESSION FEATURES:
+    features builds a local table of per-session features and score means
+    (session_features.py), loading only sessions created since the last build
+    (or before the oldest one). cohort answers group-by questions from it, e.g.
+    mean quality of sessions with <5, 5-10 and >=10 turns, without API calls.
+
+CONVERSATION FLOWS:
+    flows counts trace-name transitions turn by turn across every session in
+    the window (a Markov transition graph), plus where sessions end, end on an
+    error, and repeat the same steps. Names are integer-encoded and the counts
+    kept as sparse rows, so thousands of sessions stay cheap.
 """
 
 import argparse
+import json
+import math
 import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional, List, Dict, Any
-from collections import defaultdict
+from types import SimpleNamespace
+from typing import Optional, List, Dict, Any, Callable, Iterator, Tuple
+from collections import Counter, defaultdict, deque
 
 # Add parent directories to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "data-retrieval" / "helpers"))
-from langfuse_client import get_langfuse_client
+from fetch_planner import PAGE_SIZE, SPLIT_FILL, fetch_window
+from langfuse_client import call_with_retry, get_langfuse_client
+from live_tail import DEFAULT_MAX_INTERVAL, DEFAULT_MIN_INTERVAL, tail_endpoint
+from trace_cache import to_utc_iso
+from session_features import (
+    CATEGORICAL_FEATURES, NUMERIC_FEATURES, get_failed_sessions, get_feature_range, get_feature_stats,
+    put_session_features, put_session_scores, query_cohorts, set_failed_sessions, set_feature_range
+)
+
+# Parallel score requests per session (per-trace calls or bulk time slices)
+DEFAULT_CONCURRENCY = 8
+
+SCORE_FETCH_STRATEGIES = ["auto", "bulk", "per-trace"]
 
 
 def get_time_range(days: int) -> tuple:
@@ -44,7 +92,7 @@ def list_sessions(limit: int = 20, user_id: Optional[str] = None) -> List[Dict[s
         if user_id:
             kwargs["user_id"] = user_id
 
-        response = client.api.sessions.list(**kwargs)
+        response = call_with_retry(client.api.sessions.list, **kwargs)
 
         sessions = []
         if hasattr(response, 'data'):
@@ -75,7 +123,7 @@ def get_session(session_id: str) -> Optional[Dict[str, Any]]:
     client = get_langfuse_client()
 
     try:
-        session = client.api.sessions.get(session_id)
+        session = call_with_retry(client.api.sessions.get, session_id)
 
         if not session:
             return None
@@ -113,12 +161,191 @@ def get_session(session_id: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-def analyze_session(session_id: str) -> Dict[str, Any]:
-    """Deep analysis of session quality and metrics."""
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    """Parse an ISO string (or pass through a datetime) as an aware datetime."""
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _trace_has_error(trace: Any) -> bool:
+    status = getattr(trace, 'status', None)
+    return bool(status) and status.lower() == 'error'
+
+
+def session_metrics(traces: List[Any]) -> Dict[str, Any]:
+    """
+    Turn count, duration, tokens, cost and errors of a session's traces.
+
+    Returns:
+        dict: turn_count, duration_seconds (None with fewer than two
+        timestamps), total_tokens, total_cost, error_count, and
+        first_trace_name/last_trace_name by timestamp
+    """
+    metrics = {
+        "turn_count": len(traces),
+        "duration_seconds": None,
+        "total_tokens": 0,
+        "total_cost": 0.0,
+        "error_count": 0,
+        "first_trace_name": None,
+        "last_trace_name": None,
+    }
+
+    timed = []
+    for trace in traces:
+        ts = _parse_timestamp(getattr(trace, 'timestamp', None))
+        if ts:
+            timed.append((ts, getattr(trace, 'name', None)))
+
+        # Accumulate metrics
+        if getattr(trace, 'total_cost', None):
+            metrics["total_cost"] += trace.total_cost
+
+        usage = getattr(trace, 'usage', None)
+        if usage and isinstance(usage, dict):
+            metrics["total_tokens"] += usage.get('total', 0)
+
+        if _trace_has_error(trace):
+            metrics["error_count"] += 1
+
+    if timed:
+        timed.sort(key=lambda item: item[0])
+        metrics["first_trace_name"] = timed[0][1]
+        metrics["last_trace_name"] = timed[-1][1]
+        if len(timed) >= 2:
+            metrics["duration_seconds"] = (timed[-1][0] - timed[0][0]).total_seconds()
+
+    return metrics
+
+
+def _fetch_trace_scores(trace_id: str) -> List[Any]:
+    """All scores of one trace."""
+    client = get_langfuse_client()
+    scores = []
+    page = 1
+    while True:
+        response = call_with_retry(client.api.scores.get_many, trace_id=trace_id, limit=PAGE_SIZE, page=page)
+        data = list(response.data or []) if hasattr(response, 'data') else []
+        scores.extend(data)
+        if len(data) < PAGE_SIZE:
+            return scores
+        page += 1
+
+
+def _score_page_fetcher(score_name: Optional[str] = None) -> Callable[[datetime, datetime, int], Tuple]:
+    """Page fetcher for fetch_window over scores.get_many (optionally one score name)."""
+    client = get_langfuse_client()
+    name_filter = {"name": score_name} if score_name else {}
+
+    def fetch_page(start: datetime, end: datetime, page: int) -> Tuple[List[Any], Optional[int]]:
+        response = call_with_retry(client.api.scores.get_many, from_timestamp=start, to_timestamp=end,
+                                   limit=PAGE_SIZE, page=page, **name_filter)
+        data = list(response.data or []) if hasattr(response, 'data') else []
+        return data, getattr(getattr(response, 'meta', None), 'total_items', None)
+
+    return fetch_page
+
+
+def _fetch_bulk_scores(
+    trace_ids: set,
+    from_time: datetime,
+    to_time: datetime,
+    slices: int
+) -> Dict[str, List[Any]]:
+    """Scores of the given traces from one sweep over [from_time, to_time) in parallel time slices."""
+    def keep_session(scores: List[Any]) -> List[Any]:
+        return [score for score in scores if getattr(score, 'trace_id', None) in trace_ids]
+
+    by_trace = defaultdict(list)
+    for scores in fetch_window(_score_page_fetcher(), from_time, to_time, slices, PAGE_SIZE, transform=keep_session):
+        for score in scores:
+            by_trace[score.trace_id].append(score)
+    return by_trace
+
+
+def fetch_session_scores(
+    traces: List[Any],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    strategy: str = "auto"
+) -> Tuple[Dict[str, List[Any]], List[Dict[str, str]]]:
+    """
+    Fetch the scores of all traces in a session.
+
+    Strategies:
+        bulk: list every score from the session's first trace until now with
+            the fetch planner and keep those of the session's traces
+        per-trace: one query per trace, `concurrency` at a time
+        auto: count the bulk window's scores with a one-item request and use
+            bulk if it needs no more pages than there are traces (sliced to
+            the count, so a quiet window costs the probe plus one page)
+
+    A failed bulk sweep falls back to per-trace queries.
+
+    Returns:
+        tuple: (trace_id -> score objects, list of {"trace_id" or "scope",
+        "error"} for requests that failed)
+    """
+    client = get_langfuse_client()
+    trace_ids = {trace.id for trace in traces}
+    errors = []
+    if not trace_ids:
+        return {}, errors
+
+    timestamps = [ts for ts in (_parse_timestamp(getattr(trace, 'timestamp', None)) for trace in traces) if ts]
+    if strategy != "per-trace" and timestamps:
+        from_time, to_time = min(timestamps), datetime.now(timezone.utc)
+        try:
+            use_bulk, slices = strategy == "bulk", concurrency
+            if not use_bulk:
+                probe = call_with_retry(client.api.scores.get_many, from_timestamp=from_time,
+                                        to_timestamp=to_time, limit=1)
+                total = getattr(getattr(probe, 'meta', None), 'total_items', None)
+                # Pages the planner needs, allowing for uneven density across slices
+                pages = math.ceil(total / (PAGE_SIZE * SPLIT_FILL)) if total is not None else None
+                use_bulk = pages is not None and pages <= len(trace_ids)
+                if use_bulk:
+                    slices = min(concurrency, max(1, pages))
+            if use_bulk:
+                return _fetch_bulk_scores(trace_ids, from_time, to_time, slices), errors
+        except Exception as e:
+            errors.append({"scope": "bulk", "error": str(e)})
+
+    def lookup(trace_id: str) -> Tuple[str, Any]:
+        try:
+            return trace_id, _fetch_trace_scores(trace_id)
+        except Exception as e:
+            return trace_id, e
+
+    by_trace = {}
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as executor:
+        for trace_id, result in executor.map(lookup, sorted(trace_ids)):
+            if isinstance(result, Exception):
+                errors.append({"trace_id": trace_id, "error": str(result)})
+            else:
+                by_trace[trace_id] = result
+    return by_trace, errors
+
+
+def analyze_session(
+    session_id: str,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    score_fetch: str = "auto"
+) -> Dict[str, Any]:
+    """
+    Deep analysis of session quality and metrics.
+
+    Scores for all traces are fetched together (see fetch_session_scores);
+    requests that failed are listed in "score_errors".
+    """
     client = get_langfuse_client()
 
     try:
-        session = client.api.sessions.get(session_id)
+        session = call_with_retry(client.api.sessions.get, session_id)
 
         if not session:
             return {"error": f"Session '{session_id}' not found"}
@@ -133,6 +360,7 @@ def analyze_session(session_id: str) -> Dict[str, Any]:
                 "total_cost": 0.0,
             },
             "scores": {},
+            "score_errors": [],
             "has_errors": False,
             "error_count": 0,
             "traces": []
@@ -144,54 +372,28 @@ def analyze_session(session_id: str) -> Dict[str, Any]:
         if not traces:
             return result
 
-        # Parse timestamps and calculate duration
-        timestamps = []
-        for trace in traces:
-            if hasattr(trace, 'timestamp'):
-                ts = trace.timestamp
-                if isinstance(ts, str):
-                    ts = datetime.fromisoformat(ts.replace('Z', '+00:00'))
-                timestamps.append(ts)
-
-            # Accumulate metrics
-            if hasattr(trace, 'total_cost') and trace.total_cost:
-                result["metrics"]["total_cost"] += trace.total_cost
-
-            if hasattr(trace, 'usage') and trace.usage:
-                if isinstance(trace.usage, dict):
-                    result["metrics"]["total_tokens"] += trace.usage.get('total', 0)
-
-            # Check for errors
-            status = getattr(trace, 'status', None)
-            if status and status.lower() == 'error':
-                result["has_errors"] = True
-                result["error_count"] += 1
-
-            # Get trace info for summary
-            result["traces"].append({
-                "id": trace.id,
-                "name": getattr(trace, 'name', None),
-                "status": status
-            })
+        metrics = session_metrics(traces)
+        for key in ("duration_seconds", "total_tokens", "total_cost"):
+            result["metrics"][key] = metrics[key]
+        result["error_count"] = metrics["error_count"]
+        result["has_errors"] = metrics["error_count"] > 0
 
-        # Calculate duration
-        if len(timestamps) >= 2:
-            timestamps.sort()
-            duration = timestamps[-1] - timestamps[0]
-            result["metrics"]["duration_seconds"] = duration.total_seconds()
+        # Get trace info for summary
+        result["traces"] = [
+            {"id": trace.id, "name": getattr(trace, 'name', None), "status": getattr(trace, 'status', None)}
+            for trace in traces
+        ]
 
         # Aggregate scores across traces
+        scores_by_trace, result["score_errors"] = fetch_session_scores(traces, concurrency, score_fetch)
         score_values = defaultdict(list)
         for trace in traces:
-            trace_id = trace.id
-            try:
-                scores = client.api.scores.get_many(trace_id=trace_id, limit=100)
-                if hasattr(scores, 'data'):
-                    for score in scores.data:
-                        if hasattr(score, 'value') and score.value is not None:
-                            score_values[score.name].append(float(score.value))
-            except:
-                pass
+            for score in scores_by_trace.get(trace.id, []):
+                try:
+                    value = float(score.value)
+                except (AttributeError, TypeError, ValueError):
+                    continue
+                score_values[score.name].append(value)
 
         # Calculate average for each score
         for name, values in score_values.items():
@@ -208,91 +410,613 @@ def analyze_session(session_id: str) -> Dict[str, Any]:
         return {"error": str(e)}
 
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _session_page_fetcher() -> Callable[[datetime, datetime, int], Tuple]:
+    """Page fetcher for fetch_window over sessions.list (by creation time)."""
+    client = get_langfuse_client()
+
+    def fetch_page(start: datetime, end: datetime, page: int) -> Tuple[List[Any], Optional[int]]:
+        response = call_with_retry(client.api.sessions.list, from_timestamp=start, to_timestamp=end,
+                                   limit=PAGE_SIZE, page=page)
+        data = list(response.data or []) if hasattr(response, 'data') else []
+        return data, getattr(getattr(response, 'meta', None), 'total_items', None)
+
+    return fetch_page
+
+
+def iter_sessions(from_time: str, to_time: str, workers: int = DEFAULT_CONCURRENCY) -> Iterator[Any]:
+    """Stream every session created in a window, newest first (time slices fetched in parallel)."""
+    pages = fetch_window(_session_page_fetcher(), from_time, to_time, workers, PAGE_SIZE,
+                         sort_key=lambda session: _parse_timestamp(getattr(session, 'created_at', None)) or _EPOCH,
+                         newest_first=True)
+    try:
+        for sessions in pages:
+            yield from sessions
+    finally:
+        pages.close()
+
+
+def build_score_index(
+    score_name: str,
+    from_time: str,
+    to_time: str,
+    workers: int = DEFAULT_CONCURRENCY
+) -> Dict[str, List[float]]:
+    """trace_id -> numeric values of a score, from one sweep over the window."""
+    def compact(scores: List[Any]) -> List[Tuple[str, float]]:
+        rows = []
+        for score in scores:
+            try:
+                rows.append((score.trace_id, float(score.value)))
+            except (AttributeError, TypeError, ValueError):
+                continue
+        return rows
+
+    index = defaultdict(list)
+    for rows in fetch_window(_score_page_fetcher(score_name), from_time, to_time, workers, PAGE_SIZE,
+                             transform=compact):
+        for trace_id, value in rows:
+            index[trace_id].append(value)
+    return index
+
+
+def _evaluate_session(
+    session: Any,
+    has_errors: bool,
+    min_turns: Optional[int],
+    min_score: Optional[float],
+    score_index: Callable[[], Dict[str, List[float]]]
+) -> Optional[Dict[str, Any]]:
+    """
+    Apply the find-issues filters to one session, cheapest first.
+
+    Returns:
+        dict: the match, {"error": ...} if the session could not be loaded,
+        or None if it was filtered out
+    """
+    client = get_langfuse_client()
+    try:
+        details = call_with_retry(client.api.sessions.get, session.id)
+    except Exception as e:
+        return {"id": session.id, "error": str(e)}
+
+    traces = details.traces if hasattr(details, 'traces') else []
+    turn_count = len(traces)
+
+    # Check min turns filter
+    if min_turns and turn_count < min_turns:
+        return None
+
+    # Check for errors
+    session_has_errors = any(_trace_has_error(trace) for trace in traces)
+
+    if has_errors and not session_has_errors:
+        return None
+
+    match = {
+        "id": session.id,
+        "user_id": getattr(session, 'user_id', None),
+        "turn_count": turn_count,
+        "has_errors": session_has_errors,
+        "created_at": str(session.created_at) if hasattr(session, 'created_at') else None
+    }
+
+    # Check score threshold (sessions without scores are skipped)
+    if min_score is not None:
+        index = score_index()
+        session_scores = [value for trace in traces for value in index.get(trace.id, ())]
+        if not session_scores:
+            return None
+        avg_score = sum(session_scores) / len(session_scores)
+        if avg_score >= min_score:
+            return None
+        match["avg_score"] = avg_score
+
+    return match
+
+
+def iter_problematic_sessions(
+    days: int,
+    has_errors: bool = False,
+    min_turns: Optional[int] = None,
+    min_score: Optional[float] = None,
+    score_name: Optional[str] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    errors: Optional[List[Dict[str, str]]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream sessions with issues, newest first.
+
+    Sessions created in the window are paged with the fetch planner and
+    evaluated `concurrency` at a time (see _evaluate_session); matches are
+    yielded in session order as soon as they are ready. The score index for
+    --min-score is built once, by the first session that passes the cheaper
+    filters. Closing the generator stops the scan and cancels pending work.
+
+    Args:
+        errors: Optional list collecting {"id", "error"} for sessions that
+            could not be loaded
+
+    Raises:
+        Exception: If sessions cannot be listed or the score index fails
+    """
+    from_time, to_time = get_time_range(days)
+    if not score_name:
+        min_score = None
+
+    index_lock = threading.Lock()
+    index = {}
+
+    def score_index() -> Dict[str, List[float]]:
+        with index_lock:
+            if "values" not in index:
+                index["values"] = build_score_index(score_name, from_time, to_time, concurrency)
+        return index["values"]
+
+    def take(future: Future) -> Optional[Dict[str, Any]]:
+        result = future.result()
+        if result and "error" in result:
+            if errors is not None:
+                errors.append(result)
+            return None
+        return result
+
+    sessions = iter_sessions(from_time, to_time, concurrency)
+    executor = ThreadPoolExecutor(max_workers=max(concurrency, 1))
+    pending = deque()
+    try:
+        for session in sessions:
+            pending.append(executor.submit(_evaluate_session, session, has_errors, min_turns, min_score, score_index))
+            # Bounded read-ahead keeps early stops cheap
+            if len(pending) > 2 * concurrency:
+                match = take(pending.popleft())
+                if match:
+                    yield match
+        while pending:
+            match = take(pending.popleft())
+            if match:
+                yield match
+    finally:
+        sessions.close()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
 def find_problematic_sessions(
     days: int,
     has_errors: bool = False,
     min_turns: Optional[int] = None,
     min_score: Optional[float] = None,
     score_name: Optional[str] = None,
-    limit: int = 20
+    limit: int = 20,
+    concurrency: int = DEFAULT_CONCURRENCY
 ) -> List[Dict[str, Any]]:
-    """Find sessions with issues."""
+    """Find sessions with issues (first `limit` matches of iter_problematic_sessions)."""
+    problematic = []
+    matches = iter_problematic_sessions(days, has_errors, min_turns, min_score, score_name, concurrency)
+    try:
+        for match in matches:
+            problematic.append(match)
+            if len(problematic) >= limit:
+                break
+    except Exception as e:
+        print(f"Error finding problematic sessions: {e}", file=sys.stderr)
+    finally:
+        matches.close()
+    return problematic
+
+
+# =============================================================================
+# SESSION FEATURES
+# =============================================================================
+
+# Sessions created this recently are re-built on the next run (may still be active)
+FEATURE_SETTLE = timedelta(hours=2)
+
+# Feature rows written per transaction while sessions load
+FEATURE_BATCH = 200
+
+# Builds a failing session is attempted in before it is given up on
+FEATURE_MAX_ATTEMPTS = 3
+
+
+def _session_features(session: Any) -> Tuple[Dict[str, Any], List[str]]:
+    """Feature row of one session and its trace IDs (loads the session's traces)."""
     client = get_langfuse_client()
-    from_time, to_time = get_time_range(days)
+    details = call_with_retry(client.api.sessions.get, session.id)
+    traces = details.traces if hasattr(details, 'traces') else []
+    metrics = session_metrics(traces)
 
+    user_id = getattr(session, 'user_id', None) or next(
+        (trace.user_id for trace in traces if getattr(trace, 'user_id', None)), None
+    )
+    row = {
+        "session_id": session.id,
+        "created_at": to_utc_iso(getattr(session, 'created_at', None)),
+        "user_id": user_id,
+        "turns": metrics["turn_count"],
+        "duration_seconds": metrics["duration_seconds"],
+        "total_tokens": metrics["total_tokens"],
+        "total_cost": metrics["total_cost"],
+        "error_count": metrics["error_count"],
+        "first_trace_name": metrics["first_trace_name"],
+        "last_trace_name": metrics["last_trace_name"],
+    }
+    return row, [trace.id for trace in traces]
+
+
+def _store_session_features(
+    sessions: Iterator[Any],
+    scores_from: datetime,
+    concurrency: int
+) -> Tuple[int, List[Tuple[Any, str]]]:
+    """
+    Build and store features of the given sessions.
+
+    Sessions are loaded `concurrency` at a time with bounded read-ahead and
+    written every FEATURE_BATCH rows, so a failure later on keeps what was
+    built. Score means come from one sweep over all scores written since
+    scores_from, matched by trace ID, and are stored once the sweep completes.
+
+    Returns:
+        tuple: (sessions stored, [(session, error) of sessions that failed to load])
+
+    Raises:
+        Exception: If sessions or scores cannot be listed
+    """
+    def load(session: Any) -> Any:
+        try:
+            return _session_features(session)
+        except Exception as e:
+            return e
+
+    built_ids = []
+    failed = []
+    batch = []
+    trace_sessions = {}
+
+    def take(session: Any, result: Any) -> None:
+        if isinstance(result, Exception):
+            failed.append((session, str(result)))
+            return
+        row, trace_ids = result
+        batch.append(row)
+        built_ids.append(row["session_id"])
+        for trace_id in trace_ids:
+            trace_sessions[trace_id] = row["session_id"]
+        if len(batch) >= FEATURE_BATCH:
+            put_session_features(batch)
+            batch.clear()
+
+    executor = ThreadPoolExecutor(max_workers=max(concurrency, 1))
+    pending = deque()
     try:
-        # Fetch recent sessions
-        response = client.api.sessions.list(limit=100)
-
-        problematic = []
-        if hasattr(response, 'data'):
-            for session in response.data:
-                session_id = session.id
+        for session in sessions:
+            pending.append((session, executor.submit(load, session)))
+            if len(pending) > 2 * concurrency:
+                session, future = pending.popleft()
+                take(session, future.result())
+        while pending:
+            session, future = pending.popleft()
+            take(session, future.result())
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        if batch:
+            put_session_features(batch)
+
+    def keep_mapped(scores: List[Any]) -> List[Tuple[str, str, float]]:
+        kept = []
+        for score in scores:
+            session_id = trace_sessions.get(getattr(score, 'trace_id', None))
+            if session_id is None:
+                continue
+            try:
+                kept.append((session_id, score.name, float(score.value)))
+            except (AttributeError, TypeError, ValueError):
+                continue
+        return kept
+
+    sums = defaultdict(lambda: defaultdict(lambda: [0.0, 0]))
+    if trace_sessions:
+        for scores in fetch_window(_score_page_fetcher(), scores_from, datetime.now(timezone.utc), concurrency,
+                                   PAGE_SIZE, transform=keep_mapped):
+            for session_id, name, value in scores:
+                acc = sums[session_id][name]
+                acc[0] += value
+                acc[1] += 1
+
+    put_session_scores(built_ids, {
+        session_id: {name: (total / count, count) for name, (total, count) in by_name.items()}
+        for session_id, by_name in sums.items()
+    })
+    return len(built_ids), failed
+
+
+def sync_session_features(days: int, concurrency: int = DEFAULT_CONCURRENCY, rebuild: bool = False) -> Dict[str, Any]:
+    """
+    Build or update the feature table for sessions created in the last `days`.
+
+    Only sessions created after the last build (minus FEATURE_SETTLE, as they
+    may still have been active) or before the oldest built session are
+    loaded, plus sessions that failed to load in earlier builds; rebuild
+    reloads the whole window. Failed sessions do not hold back the built
+    range: they are kept in the store and retried on the next runs, up to
+    FEATURE_MAX_ATTEMPTS times.
+
+    Raises:
+        Exception: If sessions or scores cannot be listed
+    """
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    start = now - timedelta(days=days)
+
+    built_from, built_to = (None, None) if rebuild else get_feature_range()
+    if built_from is None or built_to is None or built_to - FEATURE_SETTLE < start:
+        windows = [(start, now)]
+        new_from = start
+    else:
+        windows = []
+        if start < built_from:
+            windows.append((start, built_from))
+        windows.append((built_to - FEATURE_SETTLE, now))
+        new_from = min(start, built_from)
+
+    retries = {} if rebuild else {entry["id"]: entry for entry in get_failed_sessions()}
+    scores_from = min([window_start for window_start, _ in windows] + [
+        _parse_timestamp(entry["created_at"]) for entry in retries.values() if entry.get("created_at")
+    ])
+
+    def sessions() -> Iterator[Any]:
+        seen = set()
+        for window_start, window_end in windows:
+            listed = iter_sessions(window_start.isoformat(), window_end.isoformat(), concurrency)
+            try:
+                for session in listed:
+                    if session.id not in seen:
+                        seen.add(session.id)
+                        yield session
+            finally:
+                listed.close()
+        for entry in retries.values():
+            if entry["id"] not in seen:
+                yield SimpleNamespace(id=entry["id"], created_at=entry.get("created_at"), user_id=entry.get("user_id"))
+
+    built, failed = _store_session_features(sessions(), scores_from, concurrency)
+
+    still_failing = []
+    dropped = []
+    for session, error in failed:
+        attempts = retries.get(session.id, {}).get("attempts", 0) + 1
+        entry = {
+            "id": session.id,
+            "created_at": to_utc_iso(getattr(session, 'created_at', None)),
+            "user_id": getattr(session, 'user_id', None),
+            "attempts": attempts,
+            "error": error,
+        }
+        (still_failing if attempts < FEATURE_MAX_ATTEMPTS else dropped).append(entry)
+    set_failed_sessions(still_failing)
+    set_feature_range(new_from, now)
+
+    return {
+        "days": days,
+        "windows": [(window_start.isoformat(), window_end.isoformat()) for window_start, window_end in windows],
+        "retried": len(retries),
+        "sessions_built": built,
+        "errors": still_failing,
+        "dropped": dropped,
+        "store": get_feature_stats(),
+    }
+
+
+def session_cohorts(
+    by: str,
+    metric: Optional[str] = None,
+    edges: Optional[List[float]] = None,
+    days: Optional[int] = None,
+    limit: int = 20
+) -> Dict[str, Any]:
+    """Cohort comparison over the local feature table (see session_features.query_cohorts)."""
+    try:
+        from_time = datetime.now(timezone.utc) - timedelta(days=days) if days else None
+        result = query_cohorts(by, metric, sorted(edges) if edges else None, from_time, limit)
+        result["days"] = days
+        return result
+    except Exception as e:
+        print(f"Error querying cohorts: {e}", file=sys.stderr)
+        return {"error": str(e)}
 
-                # Get session details
-                try:
-                    details = client.api.sessions.get(session_id)
-                except:
-                    continue
 
-                traces = details.traces if hasattr(details, 'traces') else []
-                turn_count = len(traces)
+# =============================================================================
+# CONVERSATION FLOWS
+# =============================================================================
 
-                # Check min turns filter
-                if min_turns and turn_count < min_turns:
-                    continue
+# Pseudo-nodes of the transition graph (integer IDs 0 and 1)
+FLOW_START = "(start)"
+FLOW_EXIT = "(exit)"
 
-                # Check for errors
-                session_has_errors = False
-                for trace in traces:
-                    status = getattr(trace, 'status', None)
-                    if status and status.lower() == 'error':
-                        session_has_errors = True
-                        break
+# Longest repeated step sequence counted as a loop
+DEFAULT_MAX_LOOP = 3
 
-                if has_errors and not session_has_errors:
-                    continue
 
-                # Check score threshold
-                if min_score and score_name:
-                    session_scores = []
-                    for trace in traces:
-                        try:
-                            scores = client.api.scores.get_many(
-                                trace_id=trace.id,
-                                name=score_name,
-                                limit=10
-                            )
-                            if hasattr(scores, 'data'):
-                                for score in scores.data:
-                                    if hasattr(score, 'value') and score.value is not None:
-                                        session_scores.append(float(score.value))
-                        except:
-                            pass
-
-                    if session_scores:
-                        avg_score = sum(session_scores) / len(session_scores)
-                        if avg_score >= min_score:
-                            continue
-                    else:
-                        continue  # No scores found, skip
-
-                # Session matches filters
-                problematic.append({
-                    "id": session_id,
-                    "user_id": getattr(session, 'user_id', None),
-                    "turn_count": turn_count,
-                    "has_errors": session_has_errors,
-                    "created_at": str(session.created_at) if hasattr(session, 'created_at') else None
-                })
+def _session_path(session: Any) -> Any:
+    """Trace names and error flags of a session's turns in timestamp order (or the exception)."""
+    try:
+        client = get_langfuse_client()
+        details = call_with_retry(client.api.sessions.get, session.id)
+        traces = details.traces if hasattr(details, 'traces') else []
+        timed = []
+        for trace in traces:
+            ts = _parse_timestamp(getattr(trace, 'timestamp', None))
+            if ts:
+                timed.append((ts, getattr(trace, 'name', None) or 'Unnamed', _trace_has_error(trace)))
+        timed.sort(key=lambda item: item[0])
+        return [(name, failed) for _, name, failed in timed]
+    except Exception as e:
+        return e
+
+
+def mine_flows(
+    days: int = 7,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    max_loop: int = DEFAULT_MAX_LOOP,
+    max_sessions: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Build a trace-name transition graph across all sessions in a window.
+
+    Each session is a path (start) -> first trace name -> ... -> (exit).
+    Names are encoded to integer IDs as they appear and transitions are
+    counted in sparse rows (source ID -> Counter of target IDs), so memory
+    grows with distinct transitions rather than sessions. A loop is a
+    return to a name seen at most `max_loop` turns earlier (A -> A, or
+    A -> B -> A), counted by the steps in between; rotations of the same
+    cycle (A -> B -> A, B -> A -> B) count as one loop.
+
+    Args:
+        days: Sessions created in the last N days
+        concurrency: Sessions loaded in parallel
+        max_loop: Longest loop counted
+        max_sessions: Stop after this many sessions (newest first)
+
+    Returns:
+        dict: nodes (visits, starts, exits, error exits and trace errors
+        per name), edges (count and share of the source's outgoing
+        transitions), loops (path, count, sessions), session/turn totals
+        and sessions that could not be loaded
+    """
+    from_time, to_time = get_time_range(days)
 
-                if len(problematic) >= limit:
+    names = [FLOW_START, FLOW_EXIT]
+    name_ids = {FLOW_START: 0, FLOW_EXIT: 1}
+    transitions = defaultdict(Counter)
+    visits = Counter()
+    exits_on_error = Counter()
+    trace_errors = Counter()
+    loops = Counter()
+    loop_sessions = Counter()
+    errors = []
+    counted = {"sessions": 0, "turns": 0}
+
+    def encode(name: str) -> int:
+        node = name_ids.get(name)
+        if node is None:
+            node = name_ids[name] = len(names)
+            names.append(name)
+        return node
+
+    def add(session: Any, path: Any) -> None:
+        if isinstance(path, Exception):
+            errors.append({"id": session.id, "error": str(path)})
+            return
+        if not path:
+            return
+        counted["sessions"] += 1
+        counted["turns"] += len(path)
+
+        ids = [encode(name) for name, _ in path]
+
+        previous = 0
+        for node, (_, failed) in zip(ids, path):
+            transitions[previous][node] += 1
+            visits[node] += 1
+            if failed:
+                trace_errors[node] += 1
+            previous = node
+        transitions[previous][1] += 1
+        if path[-1][1]:
+            exits_on_error[previous] += 1
+
+        # Loops: nearest earlier occurrence of the same name within max_loop turns
+        seen = set()
+        for j, node in enumerate(ids):
+            for i in range(j - 1, max(j - max_loop, 0) - 1, -1):
+                if ids[i] == node:
+                    # Canonical rotation (from the lowest ID) so A->B->A and B->A->B count as one loop
+                    cycle = ids[i:j]
+                    first = cycle.index(min(cycle))
+                    loop = tuple(cycle[first:] + cycle[:first])
+                    loops[loop] += 1
+                    if loop not in seen:
+                        seen.add(loop)
+                        loop_sessions[loop] += 1
                     break
 
-        return problematic
-    except Exception as e:
-        print(f"Error finding problematic sessions: {e}", file=sys.stderr)
-        return []
+    sessions = iter_sessions(from_time, to_time, concurrency)
+    executor = ThreadPoolExecutor(max_workers=max(concurrency, 1))
+    pending = deque()
+    submitted = 0
+    try:
+        for session in sessions:
+            if max_sessions is not None and submitted >= max_sessions:
+                break
+            pending.append((session, executor.submit(_session_path, session)))
+            submitted += 1
+            # Bounded read-ahead keeps memory flat on large windows
+            if len(pending) > 2 * concurrency:
+                session, future = pending.popleft()
+                add(session, future.result())
+        while pending:
+            session, future = pending.popleft()
+            add(session, future.result())
+    finally:
+        sessions.close()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    nodes = []
+    for node in range(2, len(names)):
+        exits = transitions[node][1]
+        nodes.append({
+            "name": names[node],
+            "visits": visits[node],
+            "starts": transitions[0][node],
+            "exits": exits,
+            "exit_rate": exits / visits[node] if visits[node] else 0.0,
+            "error_exits": exits_on_error[node],
+            "errors": trace_errors[node],
+        })
+    nodes.sort(key=lambda n: (-n["visits"], n["name"]))
+
+    edges = []
+    for source, row in transitions.items():
+        total = sum(row.values())
+        for target, count in row.items():
+            edges.append({
+                "from": names[source],
+                "to": names[target],
+                "count": count,
+                "share": count / total,
+            })
+    edges.sort(key=lambda e: (-e["count"], e["from"], e["to"]))
+
+    return {
+        "days": days,
+        "sessions": counted["sessions"],
+        "turns": counted["turns"],
+        "nodes": nodes,
+        "edges": edges,
+        "loops": [
+            {"path": [names[node] for node in loop], "count": count, "sessions": loop_sessions[loop]}
+            for loop, count in sorted(loops.items(), key=lambda item: (-item[1], item[0]))
+        ],
+        "errors": errors,
+    }
+
+
+def tail_sessions(
+    min_interval: float = DEFAULT_MIN_INTERVAL,
+    max_interval: float = DEFAULT_MAX_INTERVAL
+) -> Iterator[Dict[str, Any]]:
+    """Follow newly created sessions, oldest first (polling as in live_tail.py)."""
+    for records in tail_endpoint("/api/public/sessions", "createdAt",
+                                 min_interval=min_interval, max_interval=max_interval):
+        for record in records:
+            yield {
+                "id": record.get("id"),
+                "created_at": record.get("createdAt"),
+                "user_id": record.get("userId"),
+                "environment": record.get("environment"),
+            }
 
 
 def get_session_timeline(session_id: str) -> str:
@@ -300,7 +1024,7 @@ def get_session_timeline(session_id: str) -> str:
     client = get_langfuse_client()
 
     try:
-        session = client.api.sessions.get(session_id)
+        session = call_with_retry(client.api.sessions.get, session_id)
 
         if not session:
             return f"Session '{session_id}' not found"
@@ -462,6 +1186,15 @@ def format_analysis(analysis: Dict[str, Any]) -> str:
         for name, stats in scores.items():
             lines.append(f"| {name} | {stats['count']} | {stats['mean']:.3f} | {stats['min']:.3f} | {stats['max']:.3f} |")
 
+    score_errors = analysis.get('score_errors', [])
+    failed = [err for err in score_errors if 'trace_id' in err]
+    if score_errors:
+        lines.append("\n## Score Fetch Errors\n")
+        if failed:
+            lines.append(f"Scores are incomplete: {len(failed)} of {metrics.get('turn_count', 0)} trace request(s) failed\n")
+        for err in score_errors[:5]:
+            lines.append(f"- `{err.get('trace_id') or err.get('scope')}`: {err['error']}")
+
     # Trace summary
     traces = analysis.get('traces', [])
     if traces:
@@ -473,31 +1206,176 @@ def format_analysis(analysis: Dict[str, Any]) -> str:
     return "\n".join(lines)
 
 
+def format_problematic_header(with_score: bool = False) -> str:
+    """Header of the problematic sessions table."""
+    if with_score:
+        return ("# Problematic Sessions\n\n| ID | User | Turns | Errors | Avg Score | Created |\n"
+                "|----|------|-------|--------|-----------|---------|")
+    return "# Problematic Sessions\n\n| ID | User | Turns | Errors | Created |\n|----|------|-------|--------|---------|"
+
+
+def format_problematic_row(s: Dict[str, Any]) -> str:
+    """One problematic session as a table row."""
+    session_id = s.get('id', '?')[:20]
+    user_id = s.get('user_id', '-') or '-'
+    if len(user_id) > 12:
+        user_id = user_id[:12] + "..."
+    turns = s.get('turn_count', 0)
+    errors = "Yes" if s.get('has_errors') else "No"
+    created = s.get('created_at', '-')
+    if created and len(created) > 16:
+        created = created[:16]
+
+    if "avg_score" in s:
+        return f"| {session_id} | {user_id} | {turns} | {errors} | {s['avg_score']:.3f} | {created} |"
+    return f"| {session_id} | {user_id} | {turns} | {errors} | {created} |"
+
+
 def format_problematic(sessions: List[Dict[str, Any]]) -> str:
     """Format problematic sessions for display."""
     if not sessions:
         return "No problematic sessions found"
 
-    lines = ["# Problematic Sessions\n"]
-    lines.append("| ID | User | Turns | Errors | Created |")
-    lines.append("|----|------|-------|--------|---------|")
+    lines = [format_problematic_header(any("avg_score" in s for s in sessions))]
+    lines.extend(format_problematic_row(s) for s in sessions)
+    return "\n".join(lines)
 
-    for s in sessions:
-        session_id = s.get('id', '?')[:20]
-        user_id = s.get('user_id', '-') or '-'
-        if len(user_id) > 12:
-            user_id = user_id[:12] + "..."
-        turns = s.get('turn_count', 0)
-        errors = "Yes" if s.get('has_errors') else "No"
-        created = s.get('created_at', '-')
-        if created and len(created) > 16:
-            created = created[:16]
 
-        lines.append(f"| {session_id} | {user_id} | {turns} | {errors} | {created} |")
+def format_tail_row(session: Dict[str, Any]) -> str:
+    """Format one live session as a table row (see format_tail_header)."""
+    return f"| {session['created_at'] or '-'} | {session['id']} | {session['user_id'] or '-'} | {session['environment'] or '-'} |"
+
+
+def format_tail_header() -> str:
+    return "| Created | Session ID | User | Environment |\n|---------|------------|------|-------------|"
+
+
+def format_feature_build(result: Dict[str, Any]) -> str:
+    """Format a feature table build for display."""
+    store = result["store"]
+    lines = ["# Session Features\n"]
+    retried = f", {result['retried']} retried" if result["retried"] else ""
+    lines.append(f"**Built:** {result['sessions_built']} session(s) in {len(result['windows'])} window(s){retried}")
+    lines.append(f"**Table:** {store['sessions']} sessions, created {store['oldest'] or '-'} to {store['newest'] or '-'}")
+    lines.append(f"**Scores:** {store['score_names'] or '-'}")
+    lines.append(f"**Path:** {store['path']}")
+
+    if result["errors"]:
+        lines.append(f"\n**Note:** {len(result['errors'])} session(s) could not be loaded; "
+                     "they are retried on the next run")
+        for err in result["errors"][:5]:
+            lines.append(f"- `{err['id']}`: {err['error']}")
+    if result["dropped"]:
+        lines.append(f"\n**Note:** gave up on {len(result['dropped'])} session(s) after "
+                     f"{FEATURE_MAX_ATTEMPTS} failed builds")
+        for err in result["dropped"][:5]:
+            lines.append(f"- `{err['id']}`: {err['error']}")
 
     return "\n".join(lines)
 
 
+def format_cohorts(result: Dict[str, Any]) -> str:
+    """Format a cohort comparison for display."""
+    if "error" in result:
+        return f"Error: {result['error']}"
+
+    overall = result["overall"]
+    if not overall["sessions"]:
+        return "No sessions in the feature table; run the features command first"
+
+    metric = result["metric"]
+    lines = [f"# Session Cohorts by {result['by']}\n"]
+    if result.get("days"):
+        lines.append(f"**Period:** Sessions created in the last {result['days']} days")
+    if metric:
+        lines.append(f"**Metric:** mean {metric} per session")
+    if len(lines) > 1:
+        lines.append("")
+
+    if metric:
+        lines.append(f"| Cohort | Sessions | With {metric} | Mean | vs Overall |")
+        lines.append("|--------|----------|------|------|------------|")
+        for c in result["cohorts"]:
+            mean = f"{c['mean']:.4f}" if c["mean"] is not None else "-"
+            ratio = f"{c['ratio']:.2f}x" if c["ratio"] is not None else "-"
+            lines.append(f"| {c['cohort']} | {c['sessions']} | {c['with_metric']} | {mean} | {ratio} |")
+        mean = f"{overall['mean']:.4f}" if overall["mean"] is not None else "-"
+        lines.append(f"| **All** | {overall['sessions']} | {overall['with_metric']} | {mean} | 1.00x |")
+    else:
+        lines.append("| Cohort | Sessions | Share |")
+        lines.append("|--------|----------|-------|")
+        for c in result["cohorts"]:
+            lines.append(f"| {c['cohort']} | {c['sessions']} | {c['sessions'] / overall['sessions'] * 100:.1f}% |")
+        lines.append(f"| **All** | {overall['sessions']} | 100.0% |")
+
+    return "\n".join(lines)
+
+
+def _filter_flow_edges(flows: Dict[str, Any], min_count: int) -> List[Dict[str, Any]]:
+    return [e for e in flows["edges"] if e["count"] >= min_count]
+
+
+def format_flows(flows: Dict[str, Any], top: int = 20, min_count: int = 1) -> str:
+    """Format a conversation flow graph as markdown tables."""
+    lines = ["# Conversation Flows\n"]
+    lines.append(f"**Period:** Last {flows['days']} days")
+    lines.append(f"**Sessions:** {flows['sessions']} ({flows['turns']} turns, {len(flows['nodes'])} trace names)")
+    if flows["errors"]:
+        lines.append(f"**Note:** {len(flows['errors'])} session(s) could not be loaded and were skipped")
+
+    if not flows["sessions"]:
+        lines.append("\nNo sessions with traces found")
+        return "\n".join(lines)
+
+    lines.append("\n## Top Transitions\n")
+    lines.append("| From | To | Count | Share of From |")
+    lines.append("|------|----|-------|---------------|")
+    for e in _filter_flow_edges(flows, min_count)[:top]:
+        lines.append(f"| {e['from']} | {e['to']} | {e['count']} | {e['share'] * 100:.1f}% |")
+
+    lines.append("\n## Exits\n")
+    lines.append("Where sessions end (last turn), and how often on an error.\n")
+    lines.append("| Trace Name | Visits | Exits | Exit Rate | Error Exits | Trace Errors |")
+    lines.append("|------------|--------|-------|-----------|-------------|--------------|")
+    exiting = sorted((n for n in flows["nodes"] if n["exits"]), key=lambda n: (-n["exits"], n["name"]))
+    for n in exiting[:top]:
+        lines.append(f"| {n['name']} | {n['visits']} | {n['exits']} | {n['exit_rate'] * 100:.1f}% | "
+                     f"{n['error_exits']} | {n['errors']} |")
+
+    if flows["loops"]:
+        lines.append("\n## Loops\n")
+        lines.append("| Loop | Occurrences | Sessions |")
+        lines.append("|------|-------------|----------|")
+        for loop in flows["loops"][:top]:
+            path = " -> ".join(loop["path"] + loop["path"][:1])
+            lines.append(f"| {path} | {loop['count']} | {loop['sessions']} |")
+
+    return "\n".join(lines)
+
+
+def format_flows_dot(flows: Dict[str, Any], min_count: int = 1) -> str:
+    """Render a conversation flow graph in Graphviz DOT (edge width by count, error exits in red)."""
+    edges = _filter_flow_edges(flows, min_count)
+    peak = max((e["count"] for e in edges), default=1)
+
+    lines = ["digraph flows {", "  rankdir=LR;", "  node [shape=box, style=rounded];"]
+    lines.append(f"  {json.dumps(FLOW_START)} [shape=circle, label=\"start\"];")
+    lines.append(f"  {json.dumps(FLOW_EXIT)} [shape=doublecircle, label=\"exit\"];")
+    for n in flows["nodes"]:
+        # json.dumps quotes and escapes the line breaks as DOT expects
+        label = f"{n['name']}\n{n['visits']} visits, {n['exit_rate'] * 100:.0f}% exit"
+        if n["errors"]:
+            label += f"\n{n['errors']} errors"
+        color = ", color=red" if n["error_exits"] else ""
+        lines.append(f"  {json.dumps(n['name'])} [label={json.dumps(label)}{color}];")
+    for e in edges:
+        width = 1 + 4 * e["count"] / peak
+        lines.append(f"  {json.dumps(e['from'])} -> {json.dumps(e['to'])} "
+                     f"[label=\"{e['count']}\", penwidth={width:.1f}];")
+    lines.append("}")
+    return "\n".join(lines)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Langfuse Session Analyzer",
@@ -518,6 +1396,10 @@ def main():
     # Analyze command
     analyze_parser = subparsers.add_parser("analyze", help="Analyze session")
     analyze_parser.add_argument("--session-id", required=True, help="Session ID")
+    analyze_parser.add_argument("--score-fetch", default="auto", choices=SCORE_FETCH_STRATEGIES,
+                                help="Fetch scores in one bulk sweep, per trace, or whichever is cheaper (default: auto)")
+    analyze_parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                                help=f"Parallel score requests (default: {DEFAULT_CONCURRENCY})")
 
     # Find issues command
     issues_parser = subparsers.add_parser("find-issues", help="Find problematic sessions")
@@ -527,13 +1409,56 @@ def main():
     issues_parser.add_argument("--min-score", type=float, help="Score threshold (find below)")
     issues_parser.add_argument("--score-name", help="Score name for threshold")
     issues_parser.add_argument("--limit", type=int, default=20, help="Max results")
+    issues_parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                               help=f"Sessions evaluated in parallel (default: {DEFAULT_CONCURRENCY})")
 
     # Timeline command
     timeline_parser = subparsers.add_parser("timeline", help="Show session timeline")
     timeline_parser.add_argument("--session-id", required=True, help="Session ID")
 
+    # Features command
+    features_parser = subparsers.add_parser("features", help="Build/update the local session feature table")
+    features_parser.add_argument("--days", type=int, default=30, help="Sessions created in the last N days (default: 30)")
+    features_parser.add_argument("--rebuild", action="store_true", help="Reload every session in the window")
+    features_parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                                 help=f"Sessions loaded in parallel (default: {DEFAULT_CONCURRENCY})")
+
+    # Cohort command
+    cohort_parser = subparsers.add_parser("cohort", help="Compare session cohorts from the feature table")
+    cohort_parser.add_argument("--by", required=True, choices=NUMERIC_FEATURES + list(CATEGORICAL_FEATURES),
+                               help="Feature defining the cohorts")
+    cohort_parser.add_argument("--edges", type=float, nargs="+",
+                               help="Bin edges for numeric features (e.g. --edges 5 10 20)")
+    cohort_parser.add_argument("--metric",
+                               help="Score name or numeric feature to compare (default: session counts)")
+    cohort_parser.add_argument("--days", type=int, help="Only sessions created in the last N days")
+    cohort_parser.add_argument("--limit", type=int, default=20, help="Max cohorts for categorical features")
+
+    # Flows command
+    flows_parser = subparsers.add_parser("flows", help="Trace-name transition graph across sessions")
+    flows_parser.add_argument("--days", type=int, default=7, help="Days to look back")
+    flows_parser.add_argument("--format", default="markdown", choices=["markdown", "json", "dot"],
+                              help="Output format (default: markdown)")
+    flows_parser.add_argument("--min-count", type=int, default=1, help="Hide transitions seen fewer times")
+    flows_parser.add_argument("--top", type=int, default=20, help="Rows per markdown table")
+    flows_parser.add_argument("--max-loop", type=int, default=DEFAULT_MAX_LOOP,
+                              help=f"Longest repeated step sequence counted as a loop (default: {DEFAULT_MAX_LOOP})")
+    flows_parser.add_argument("--max-sessions", type=int, help="Only the newest N sessions")
+    flows_parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                              help=f"Sessions loaded in parallel (default: {DEFAULT_CONCURRENCY})")
+
+    # Tail command
+    tail_parser = subparsers.add_parser("tail", help="Follow new sessions as they are created")
+    tail_parser.add_argument("--poll-interval", type=float, default=DEFAULT_MIN_INTERVAL,
+                             help=f"Shortest poll interval in seconds (default: {DEFAULT_MIN_INTERVAL:g})")
+    tail_parser.add_argument("--max-poll-interval", type=float, default=DEFAULT_MAX_INTERVAL,
+                             help=f"Longest poll interval while idle (default: {DEFAULT_MAX_INTERVAL:g})")
+
     args = parser.parse_args()
 
+    if args.command == "cohort" and args.edges and args.by in CATEGORICAL_FEATURES:
+        parser.error("--edges only applies to numeric features")
+
     if args.command == "list":
         sessions = list_sessions(args.limit, args.user_id)
         print(format_session_list(sessions))
@@ -543,24 +1468,81 @@ def main():
         print(format_session_detail(session))
 
     elif args.command == "analyze":
-        analysis = analyze_session(args.session_id)
+        analysis = analyze_session(args.session_id, args.concurrency, args.score_fetch)
         print(format_analysis(analysis))
 
     elif args.command == "find-issues":
-        sessions = find_problematic_sessions(
+        # Stream matches as they are found
+        errors = []
+        found = 0
+        matches = iter_problematic_sessions(
             days=args.days,
             has_errors=args.has_errors,
             min_turns=args.min_turns,
             min_score=args.min_score,
             score_name=args.score_name,
-            limit=args.limit
+            concurrency=args.concurrency,
+            errors=errors
         )
-        print(format_problematic(sessions))
+        try:
+            for match in matches:
+                if not found:
+                    print(format_problematic_header("avg_score" in match))
+                print(format_problematic_row(match), flush=True)
+                found += 1
+                if found >= args.limit:
+                    break
+        except Exception as e:
+            print(f"Error finding problematic sessions: {e}", file=sys.stderr)
+        finally:
+            matches.close()
+        if not found:
+            print("No problematic sessions found")
+        if errors:
+            print(f"\n**Note:** {len(errors)} session(s) could not be loaded and were skipped")
 
     elif args.command == "timeline":
         timeline = get_session_timeline(args.session_id)
         print(timeline)
 
+    elif args.command == "features":
+        try:
+            result = sync_session_features(args.days, args.concurrency, args.rebuild)
+        except Exception as e:
+            print(f"Error building session features: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(format_feature_build(result))
+
+    elif args.command == "cohort":
+        result = session_cohorts(args.by, args.metric, args.edges, args.days, args.limit)
+        print(format_cohorts(result))
+        if "error" in result:
+            sys.exit(1)
+
+    elif args.command == "flows":
+        try:
+            flows = mine_flows(args.days, args.concurrency, args.max_loop, args.max_sessions)
+        except Exception as e:
+            print(f"Error mining conversation flows: {e}", file=sys.stderr)
+            sys.exit(1)
+        if args.format == "json":
+            flows["edges"] = _filter_flow_edges(flows, args.min_count)
+            print(json.dumps(flows, indent=2))
+        elif args.format == "dot":
+            print(format_flows_dot(flows, args.min_count))
+        else:
+            print(format_flows(flows, args.top, args.min_count))
+
+    elif args.command == "tail":
+        print("# Live Sessions\n")
+        print(f"Following new sessions, polling every {args.poll_interval:g}-{args.max_poll_interval:g}s (Ctrl-C to stop)\n")
+        print(format_tail_header(), flush=True)
+        try:
+            for session in tail_sessions(args.poll_interval, args.max_poll_interval):
+                print(format_tail_row(session), flush=True)
+        except KeyboardInterrupt:
+            print("Stopped tailing", file=sys.stderr)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Session Feature Store
+
+Local SQLite table with one row of features per session (turns, duration,
+tokens, cost, error count, user, first/last trace name) plus the mean of each
+score over the session's traces, kept next to the trace cache. Columns are
+typed and indexed by creation time, so cohort questions ("do sessions with
+more than 10 turns score lower?") are answered with a single GROUP BY instead
+of re-analyzing sessions through the API.
+
+Rows are written by session_analyzer.py (`features`), which only re-builds
+sessions created after the last build (minus a settle window) or before the
+oldest one, plus sessions that failed to load last time; `cohort` queries
+the table.
+
+Environment Variables:
+    LANGFUSE_CACHE_DIR: Cache directory (default: ~/.cache/langfuse-analyzer)
+
+USAGE:
+    python session_features.py stats
+    python session_features.py clear
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Add parent directories to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "data-retrieval" / "helpers"))
+from trace_cache import CACHE_DIR
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS session_features (
+    session_id TEXT PRIMARY KEY,
+    created_at TEXT,
+    user_id TEXT,
+    turns INTEGER NOT NULL,
+    duration_seconds REAL,
+    total_tokens INTEGER NOT NULL,
+    total_cost REAL NOT NULL,
+    error_count INTEGER NOT NULL,
+    first_trace_name TEXT,
+    last_trace_name TEXT,
+    built_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS session_features_created ON session_features (created_at);
+CREATE TABLE IF NOT EXISTS session_scores (
+    session_id TEXT NOT NULL,
+    score_name TEXT NOT NULL,
+    mean REAL NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (score_name, session_id)
+);
+CREATE TABLE IF NOT EXISTS feature_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Numeric feature columns (cohorts by exact value or --edges bins; cohort metrics)
+NUMERIC_FEATURES = ["turns", "duration_seconds", "total_tokens", "total_cost", "error_count"]
+
+# Categorical features; has_errors is derived from error_count
+CATEGORICAL_FEATURES = {
+    "user_id": "f.user_id",
+    "first_trace_name": "f.first_trace_name",
+    "last_trace_name": "f.last_trace_name",
+    "has_errors": "CASE WHEN f.error_count > 0 THEN 'yes' ELSE 'no' END",
+}
+
+# Singleton connection (shared across threads, serialized by _lock)
+_conn = None
+_lock = threading.RLock()
+
+
+def get_feature_connection() -> sqlite3.Connection:
+    """Get or create the feature store connection."""
+    global _conn
+
+    with _lock:
+        if _conn is not None:
+            return _conn
+
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _conn = sqlite3.connect(str(CACHE_DIR / "session_features.sqlite3"), check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.executescript(_SCHEMA)
+        return _conn
+
+
+# =============================================================================
+# BUILD STATE
+# =============================================================================
+
+def get_feature_range() -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Return the (from, to) session creation window already built."""
+    with _lock:
+        rows = dict(get_feature_connection().execute(
+            "SELECT key, value FROM feature_state WHERE key IN ('built_from', 'built_to')"
+        ).fetchall())
+    return tuple(
+        datetime.fromisoformat(rows[key]) if rows.get(key) else None for key in ("built_from", "built_to")
+    )
+
+
+def set_feature_range(built_from: datetime, built_to: datetime) -> None:
+    """Record the session creation window built."""
+    with _lock:
+        conn = get_feature_connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO feature_state (key, value) VALUES (?, ?)",
+                [("built_from", built_from.isoformat()), ("built_to", built_to.isoformat())]
+            )
+
+
+def get_failed_sessions() -> List[Dict[str, Any]]:
+    """Sessions that failed to load in earlier builds ({id, created_at, user_id, attempts, error})."""
+    with _lock:
+        row = get_feature_connection().execute(
+            "SELECT value FROM feature_state WHERE key = 'failed_sessions'"
+        ).fetchone()
+    return json.loads(row[0]) if row and row[0] else []
+
+
+def set_failed_sessions(sessions: List[Dict[str, Any]]) -> None:
+    """Replace the list of sessions to retry on the next build."""
+    with _lock:
+        conn = get_feature_connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO feature_state (key, value) VALUES ('failed_sessions', ?)",
+                (json.dumps(sessions),)
+            )
+
+
+# =============================================================================
+# FEATURES
+# =============================================================================
+
+def put_session_features(rows: List[Dict[str, Any]]) -> None:
+    """
+    Insert or replace a batch of feature rows (stored score means are kept).
+
+    Args:
+        rows: Feature dicts with session_id, created_at (UTC ISO string) and
+            the NUMERIC_FEATURES / categorical columns
+    """
+    built_at = datetime.now().astimezone().isoformat()
+    with _lock:
+        conn = get_feature_connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO session_features (session_id, created_at, user_id, turns, duration_seconds, "
+                "total_tokens, total_cost, error_count, first_trace_name, last_trace_name, built_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(r["session_id"], r["created_at"], r["user_id"], r["turns"], r["duration_seconds"],
+                  r["total_tokens"], r["total_cost"], r["error_count"], r["first_trace_name"],
+                  r["last_trace_name"], built_at) for r in rows]
+            )
+
+
+def put_session_scores(session_ids: List[str], scores: Dict[str, Dict[str, Tuple[float, int]]]) -> None:
+    """
+    Replace the score means of the given sessions in one transaction.
+
+    Args:
+        session_ids: Sessions whose stored scores are replaced
+        scores: session_id -> score name -> (mean, count)
+    """
+    with _lock:
+        conn = get_feature_connection()
+        with conn:
+            conn.executemany("DELETE FROM session_scores WHERE session_id = ?", [(sid,) for sid in session_ids])
+            conn.executemany(
+                "INSERT INTO session_scores (session_id, score_name, mean, count) VALUES (?, ?, ?, ?)",
+                [(session_id, name, mean, count)
+                 for session_id, by_name in scores.items() for name, (mean, count) in by_name.items()]
+            )
+
+
+def _cohort_key(by: str, edges: Optional[Sequence[float]]) -> Tuple[str, List[Any]]:
+    """SQL expression (and parameters) grouping sessions into cohorts."""
+    if by in CATEGORICAL_FEATURES:
+        return CATEGORICAL_FEATURES[by], []
+    if by not in NUMERIC_FEATURES:
+        raise ValueError(f"Unknown feature '{by}'; use one of {', '.join(NUMERIC_FEATURES + list(CATEGORICAL_FEATURES))}")
+    if not edges:
+        return f"f.{by}", []
+    # Bin index: 0 below the first edge, len(edges) at or above the last
+    cases = " ".join(f"WHEN f.{by} < ? THEN {i}" for i in range(len(edges)))
+    return f"CASE WHEN f.{by} IS NULL THEN NULL {cases} ELSE {len(edges)} END", list(edges)
+
+
+def _bin_label(index: Optional[int], edges: Sequence[float]) -> str:
+    if index is None:
+        return "-"
+    if index == 0:
+        return f"< {edges[0]:g}"
+    if index == len(edges):
+        return f">= {edges[-1]:g}"
+    return f"{edges[index - 1]:g} - {edges[index]:g}"
+
+
+def query_cohorts(
+    by: str,
+    metric: Optional[str] = None,
+    edges: Optional[Sequence[float]] = None,
+    from_time: Optional[datetime] = None,
+    limit: int = 20
+) -> Dict[str, Any]:
+    """
+    Group sessions into cohorts and compare a metric across them.
+
+    Args:
+        by: Feature to group by (NUMERIC_FEATURES or CATEGORICAL_FEATURES)
+        metric: Numeric feature or score name to average per cohort (None:
+            session counts only)
+        edges: Bin edges for a numeric `by` (default: one cohort per value)
+        from_time: Only sessions created at or after this time
+        limit: Most cohorts returned for categorical features (largest first)
+
+    Returns:
+        dict: "cohorts" (cohort, sessions, with_metric, mean, ratio to the
+        overall mean) and "overall" ({sessions, with_metric, mean})
+    """
+    key, key_params = _cohort_key(by, edges)
+    join_params = []
+    if metric is None:
+        value, join = "NULL", ""
+    elif metric in NUMERIC_FEATURES:
+        value, join = f"f.{metric}", ""
+    else:
+        # Any other metric is a score name (mean of session score means)
+        value, join = "s.mean", "LEFT JOIN session_scores s ON s.session_id = f.session_id AND s.score_name = ?"
+        join_params = [metric]
+
+    where, where_params = "", []
+    if from_time is not None:
+        where, where_params = "WHERE f.created_at >= ?", [from_time.isoformat()]
+
+    if by in CATEGORICAL_FEATURES:
+        order = f"ORDER BY sessions DESC, cohort LIMIT {int(limit)}"
+    else:
+        order = "ORDER BY cohort"
+
+    with _lock:
+        conn = get_feature_connection()
+        rows = conn.execute(
+            f"SELECT {key} AS cohort, COUNT(*) AS sessions, COUNT({value}), AVG({value}) "
+            f"FROM session_features f {join} {where} GROUP BY cohort {order}",
+            key_params + join_params + where_params
+        ).fetchall()
+        overall = conn.execute(
+            f"SELECT COUNT(*), COUNT({value}), AVG({value}) FROM session_features f {join} {where}",
+            join_params + where_params
+        ).fetchone()
+
+    overall_mean = overall[2]
+    cohorts = []
+    for cohort, sessions, with_metric, mean in rows:
+        label = _bin_label(cohort, edges) if edges else ("-" if cohort is None else cohort)
+        cohorts.append({
+            "cohort": label,
+            "sessions": sessions,
+            "with_metric": with_metric,
+            "mean": mean,
+            "ratio": mean / overall_mean if mean is not None and overall_mean else None,
+        })
+
+    return {
+        "by": by,
+        "metric": metric,
+        "cohorts": cohorts,
+        "overall": {"sessions": overall[0], "with_metric": overall[1], "mean": overall_mean},
+    }
+
+
+def get_feature_stats() -> Dict[str, Any]:
+    """Summarize feature store contents."""
+    with _lock:
+        conn = get_feature_connection()
+        sessions, oldest, newest = conn.execute(
+            "SELECT COUNT(*), MIN(created_at), MAX(created_at) FROM session_features"
+        ).fetchone()
+        score_names = [row[0] for row in conn.execute(
+            "SELECT DISTINCT score_name FROM session_scores ORDER BY score_name"
+        )]
+    built_from, built_to = get_feature_range()
+    return {
+        "path": str(CACHE_DIR / "session_features.sqlite3"),
+        "sessions": sessions,
+        "oldest": oldest,
+        "newest": newest,
+        "built_from": built_from.isoformat() if built_from else None,
+        "built_to": built_to.isoformat() if built_to else None,
+        "failed_sessions": len(get_failed_sessions()),
+        "score_names": ", ".join(score_names) or None,
+    }
+
+
+def clear_features() -> None:
+    """Delete all session features and build state."""
+    with _lock:
+        conn = get_feature_connection()
+        with conn:
+            conn.executescript("DELETE FROM session_features; DELETE FROM session_scores; DELETE FROM feature_state;")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local session feature store maintenance")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("stats", help="Show feature store statistics")
+    subparsers.add_parser("clear", help="Delete all session features")
+
+    args = parser.parse_args()
+
+    if args.command == "stats":
+        stats = get_feature_stats()
+        print("# Session Features\n")
+        print("| Field | Value |")
+        print("|-------|-------|")
+        for key, value in stats.items():
+            print(f"| {key} | {value if value is not None else '-'} |")
+
+    elif args.command == "clear":
+        clear_features()
+        print(f"Cleared session features at {CACHE_DIR}")
+
+
+if __name__ == "__main__":
+    main()